@@ -1,15 +1,56 @@
+import os
+import sys
 from argparse import ArgumentError
-from .parsers import MainParser
+from .timing_handling import ImportTimer, QueryExplainer
+from .client_handling import forward
 
 
 def main():
-    main_parser = MainParser.get()
-    args = main_parser.parse_args()
+    argv = sys.argv[1:]
+    # Installed before anything else is imported so every module is measured
+    import_timer = ImportTimer() if "--import-times" in argv else None
+    if import_timer is not None:
+        import_timer.install()
+    elif "--explain" not in argv:
+        # Hand the command to a running 'cons serve' when there is one
+        exit_code = forward(argv)
+        if exit_code is not None:
+            return exit_code
+    import sqlite3
+    from .parsers import MainParser
+
+    main_parser = MainParser.get(argv)
+    args = main_parser.parse_args(argv)
+    if getattr(args, "explain", False):
+        QueryExplainer.enable()
     try:
-        print(getattr(args, "handler").handle(args))
+        output = getattr(args, "handler").handle(args)
+        if output:
+            print(output)
         return 0
     except ArgumentError as e:
         main_parser.error(e.message)
+    except sqlite3.OperationalError as e:
+        # Another process, e.g. a long batch, kept the database locked past
+        # the backend's busy timeout
+        if "locked" not in str(e):
+            raise
+        print(
+            "The database is locked by another cons process, "
+            + "try again once it has finished.",
+            file=sys.stderr,
+        )
+        return 1
+    except BrokenPipeError:
+        # Streamed output cut short by the reader, e.g. head
+        os.dup2(os.open(os.devnull, os.O_WRONLY), sys.stdout.fileno())
+        return 1
+    finally:
+        if import_timer is not None:
+            import_timer.uninstall()
+            print(import_timer.report(), file=sys.stderr)
+        if QueryExplainer.ENABLED:
+            print(QueryExplainer.report(), file=sys.stderr)
     # except Exception as e:
     # main_parser.error(f"Unexpected Error: {e}")
 
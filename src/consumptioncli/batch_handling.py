@@ -0,0 +1,113 @@
+# General Imports
+import io
+import sys
+import shlex
+from time import perf_counter
+from argparse import ArgumentError, ArgumentParser, Namespace
+from collections.abc import Sequence
+from contextlib import redirect_stderr
+
+# Consumption Imports
+from .db_handling import deferred_commits, abort_triggers, restore_triggers
+from .utils import redirect_input
+
+
+def _no_input(request: str) -> str:
+    raise ArgumentError(
+        None, f"Input requested ({request.strip()}), provide all values or --force."
+    )
+
+
+class BatchHandler:
+    # Never run by a server on behalf of a client
+    LOCAL_ONLY: bool = True
+
+    def __init__(self) -> None:
+        raise RuntimeError("Class cannot be used outside of a static context.")
+
+    @classmethod
+    def handle(cls, args: Namespace) -> str:
+        # Imported here as the parsers depend on this module
+        from .parsers import MainParser
+
+        main_parser = MainParser.get()
+        commit_every = getattr(args, "commit_every")
+        quiet = getattr(args, "quiet")
+        succeeded, failed = 0, 0
+        # Lines run since the last commit
+        pending = 0
+        # Triggers swapped to only fail the line, see abort_triggers
+        triggers: Sequence[tuple[str, str]] = []
+        start = perf_counter()
+        with deferred_commits() as connection, redirect_input(_no_input):
+            try:
+                for line_number, line in enumerate(getattr(args, "file"), 1):
+                    argv = shlex.split(line, comments=True)
+                    if len(argv) > 0 and argv[0] == "cons":
+                        argv = argv[1:]
+                    if len(argv) == 0:
+                        continue
+                    if not connection.in_transaction:
+                        connection.execute("BEGIN")
+                        triggers = abort_triggers(connection)
+                    connection.execute("SAVEPOINT batch_line")
+                    try:
+                        output = cls._run(main_parser, argv)
+                    except Exception as e:
+                        failed += 1
+                        print(f"Line {line_number}: {e}", file=sys.stderr)
+                        if not connection.in_transaction:
+                            # Ended by SQLite itself, e.g. on running out of disk
+                            raise
+                        connection.execute("ROLLBACK TO batch_line")
+                        connection.execute("RELEASE batch_line")
+                        continue
+                    connection.execute("RELEASE batch_line")
+                    succeeded += 1
+                    pending += 1
+                    if not quiet and output:
+                        print(output)
+                    if commit_every > 0 and pending >= commit_every:
+                        restore_triggers(connection, triggers)
+                        connection.commit()
+                        pending = 0
+                if connection.in_transaction:
+                    restore_triggers(connection, triggers)
+                connection.commit()
+            except BaseException:
+                connection.rollback()
+                print(
+                    f"Batch aborted, {pending} uncommitted line(s) rolled back.",
+                    file=sys.stderr,
+                )
+                raise
+        elapsed = perf_counter() - start
+        rate = (succeeded + failed) / elapsed if elapsed > 0 else 0
+        return (
+            f"{succeeded} line(s) succeeded, {failed} failed "
+            + f"in {elapsed:.2f}s ({rate:.0f} lines/s)."
+        )
+
+    @classmethod
+    def _run(cls, main_parser: ArgumentParser, argv: Sequence[str]) -> str:
+        errors = io.StringIO()
+        try:
+            with redirect_stderr(errors):
+                args = main_parser.parse_args(argv)
+        except SystemExit as e:
+            if e.code == 0:
+                return ""
+            # Only keep the message, not the usage argparse prints before it
+            message = errors.getvalue().strip().split("\n")[-1]
+            raise ArgumentError(None, message.split("error: ", 1)[-1])
+        handler = getattr(args, "handler")
+        if getattr(handler, "LOCAL_ONLY", False):
+            raise ArgumentError(None, "Command cannot be used within a batch.")
+        if (
+            getattr(args, "mode", None) == "list"
+            and not getattr(args, "static", False)
+            and getattr(args, "format", "table") == "table"
+        ):
+            # Other formats are written without the interactive list
+            raise ArgumentError(None, "Interactive lists require --static in a batch.")
+        return handler.handle(args)
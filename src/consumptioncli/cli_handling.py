@@ -1,9 +1,11 @@
 # General Imports
+from __future__ import annotations
+import sys
+import shlex
 from argparse import ArgumentError, Namespace
 from datetime import datetime
 from collections.abc import Sequence, Mapping
 from abc import abstractmethod, ABC
-from sqlite3 import IntegrityError
 
 # Consumption Imports
 from consumptionbackend.Database import DatabaseEntity
@@ -11,8 +13,22 @@ from consumptionbackend.Consumable import Consumable
 from consumptionbackend.Status import Status
 from consumptionbackend.Series import Series
 from consumptionbackend.Personnel import Personnel
-from .list_handling import ConsumableList, SeriesList, PersonnelList
-from .utils import request_input, confirm_action, UNCHANGED_SENTINEL
+from .db_handling import (
+    bulk_update,
+    bulk_delete,
+    bulk_tag,
+    bulk_untag,
+    split_tags,
+    bulk_add_personnel,
+    bulk_remove_personnel,
+)
+from .query_handling import Query, PagedInstances
+from .stats_handling import ConsumableStats, FIELDS as STATS_FIELDS
+from .output_handling import write_table, write_records
+from .utils import request_input, confirm_action, lazy_import, UNCHANGED_SENTINEL
+
+# Deferred until output is tabulated
+list_handling = lazy_import(f"{__package__}.list_handling")
 
 
 class CLIHandler(ABC):
@@ -64,7 +80,9 @@ class CLIHandler(ABC):
 
     @classmethod
     @abstractmethod
-    def do_delete(cls, instances: Sequence[DatabaseEntity], force: bool = False) -> int:
+    def do_delete(
+        cls, instances: Sequence[DatabaseEntity], force: bool = False
+    ) -> Sequence[DatabaseEntity]:
         pass
 
     @classmethod
@@ -72,6 +90,74 @@ class CLIHandler(ABC):
     def no_action(cls, args: Namespace) -> str:
         pass
 
+    @classmethod
+    def _list_query(
+        cls, entity: type[DatabaseEntity], args: Namespace, where: Namespace
+    ) -> Query:
+        query = Query(entity, vars(where)).order_by(
+            getattr(args, "order"), getattr(args, "reverse")
+        )
+        try:
+            query.page(getattr(args, "limit", None), getattr(args, "offset", 0))
+        except ValueError:
+            raise ArgumentError(None, "Limit and offset must not be negative.")
+        after = getattr(args, "after", None)
+        if after is not None:
+            try:
+                query.after(after)
+            except ValueError:
+                raise ArgumentError(
+                    None, "Invalid key for --after, use one printed by a listing."
+                )
+        return query
+
+    @classmethod
+    def _output(
+        cls, instance_list: list_handling.BaseInstanceList, args: Namespace
+    ) -> str:
+        # Tables are returned, other formats are written out as they are made
+        output_format = getattr(args, "format", "table")
+        if output_format == "table":
+            return instance_list.tabulate_str()
+        instance_list.write_records(instance_list.state.instances, output_format)
+        return ""
+
+    @classmethod
+    def _streamed(cls, args: Namespace) -> bool:
+        # Machine readable listings are never interactive
+        return (
+            getattr(args, "static", False)
+            or getattr(args, "format", "table") != "table"
+        )
+
+    @classmethod
+    def _write_static(
+        cls,
+        instance_list: list_handling.BaseInstanceList,
+        query: Query,
+        args: Namespace,
+    ) -> str:
+        output_format = getattr(args, "format", "table")
+        if output_format == "table":
+            results = instance_list.write_static(query)
+        else:
+            results = instance_list.write_records(query, output_format)
+        # A full page may be followed by another
+        limit, _ = query.bounds
+        key = None
+        if limit is not None and results == limit and results > 0:
+            key = shlex.quote(query.key_of(query.last))
+        if output_format != "table":
+            # Keep stdout parseable, the key is only a hint
+            if key is not None:
+                print(f"Continue with --after {key}", file=sys.stderr)
+            return ""
+        if results == 0:
+            return "0 Results..."
+        if key is not None:
+            return f"{results} Result(s)... Continue with --after {key}"
+        return f"{results} Result(s)..."
+
 
 class ConsumableHandler(CLIHandler):
     ORDER_LIST = [
@@ -97,6 +183,8 @@ class ConsumableHandler(CLIHandler):
                 return cls.cli_update(args)
             case "delete":
                 return cls.cli_delete(args)
+            case "stats":
+                return cls.cli_stats(args)
             case "tag":
                 return cls.cli_tag(args)
             case "untag":
@@ -128,29 +216,62 @@ class ConsumableHandler(CLIHandler):
         cls._prepare_args(args, new)
         consumable = Consumable.new(**vars(new))
         # Create String
-        return ConsumableList([consumable], getattr(args, "date_format")).tabulate_str()
+        return cls._output(
+            list_handling.ConsumableList([consumable], getattr(args, "date_format")),
+            args,
+        )
 
     @classmethod
     def cli_list(cls, args: Namespace) -> str:
         where = getattr(args, "where", Namespace())
         # Prepare Arguments
         cls._prepare_args(args, where)
-        # Get Consumables
-        consumables = Consumable.find(**vars(where))
+        query = cls._list_query(Consumable, args, where)
+        # Static listings are streamed in order straight from the query
+        if cls._streamed(args):
+            return cls._write_static(
+                list_handling.ConsumableList([], getattr(args, "date_format")),
+                query,
+                args,
+            )
+        # Page in Consumables as they are shown
+        consumables = PagedInstances(query)
         results = len(consumables)
-        # Static vs. Dynamic
-        static = getattr(args, "static", False)
+        # Interactive
         if results > 0:
-            consumable_list = ConsumableList(consumables, getattr(args, "date_format"))
-            consumable_list.order_by(getattr(args, "order"), getattr(args, "reverse"))
-            if static:
-                return consumable_list.tabulate_str() + f"\n{results} Result(s)..."
-            else:
-                consumable_list.init_run()
-                return ""
+            consumable_list = list_handling.ConsumableList(
+                consumables, getattr(args, "date_format")
+            )
+            consumable_list.init_run()
+            return ""
         else:
             return "0 Results..."
 
+    @classmethod
+    def cli_stats(cls, args: Namespace) -> str:
+        where = getattr(args, "where", Namespace())
+        # Prepare Arguments
+        cls._prepare_args(args, where)
+        by = getattr(args, "by")
+        rows = ConsumableStats.rows(Query(Consumable, vars(where)), by)
+        output_format = getattr(args, "format", "table")
+        if output_format != "table":
+            write_records(output_format, STATS_FIELDS, rows)
+            return ""
+        headers = [
+            by.title() if by is not None else "",
+            "Count",
+            "Completed",
+            "Parts",
+            "Progress %",
+            "Completions",
+            "Avg Rating",
+            "Median Rating",
+        ]
+        if write_table(headers, rows) == 0:
+            return "0 Results..."
+        return ""
+
     @classmethod
     def cli_update(cls, args: Namespace) -> str:
         where_mapping = getattr(args, "where", Namespace())
@@ -164,7 +285,7 @@ class ConsumableHandler(CLIHandler):
         cls._prepare_args(args, where_mapping)
         cls._prepare_args(args, set_mapping)
         # Find
-        consumables = Consumable.find(**vars(where_mapping))
+        consumables = Query(Consumable, vars(where_mapping)).all()
         if len(consumables) == 0:
             return "No Consumables found."
         # Update
@@ -172,9 +293,12 @@ class ConsumableHandler(CLIHandler):
         updated_consumables = cls.do_update(consumables, vars(set_mapping), force)
         # Create String
         if len(updated_consumables) > 0:
-            return ConsumableList(
-                updated_consumables, getattr(args, "date_format")
-            ).tabulate_str()
+            return cls._output(
+                list_handling.ConsumableList(
+                    updated_consumables, getattr(args, "date_format")
+                ),
+                args,
+            )
         else:
             return "No Consumable(s) updated."
 
@@ -185,15 +309,15 @@ class ConsumableHandler(CLIHandler):
         set_mapping: Mapping,
         force: bool = False,
     ) -> Sequence[Consumable]:
-        updated_consumables = []
-        for consumable in instances:
-            if (
-                force
-                or len(instances) == 1
-                or confirm_action(f"update of {str(consumable)}")
-            ):
-                updated_consumables.append(consumable.update_self(set_mapping))
-        return updated_consumables
+        # Confirm first, then update everything selected at once
+        selected = [
+            consumable
+            for consumable in instances
+            if force
+            or len(instances) == 1
+            or confirm_action(f"update of {str(consumable)}")
+        ]
+        return bulk_update(Consumable, selected, set_mapping)
 
     @classmethod
     def update_fields(
@@ -256,27 +380,35 @@ class ConsumableHandler(CLIHandler):
         # Prepare Arguments
         cls._prepare_args(args, where)
         # Find
-        consumables = Consumable.find(**vars(where))
+        consumables = Query(Consumable, vars(where)).all()
         if len(consumables) == 0:
             return "No Consumables found."
         # Delete
         force = getattr(args, "force")
         deleted = cls.do_delete(consumables, force)
         # Create String
-        return f"{deleted} Consumable(s) deleted."
+        if len(deleted) > 0:
+            return (
+                list_handling.ConsumableList(
+                    deleted, getattr(args, "date_format")
+                ).tabulate_str()
+                + f"\n{len(deleted)} Consumable(s) deleted."
+            )
+        else:
+            return "No Consumable(s) deleted."
 
     @classmethod
-    def do_delete(cls, instances: Sequence[Consumable], force: bool = False) -> int:
-        deleted = 0
-        for consumable in instances:
-            if (
-                force
-                or len(instances) == 1
-                or confirm_action(f"deletion of {str(consumable)}")
-            ):
-                consumable.delete_self()
-                deleted += 1
-        return deleted
+    def do_delete(
+        cls, instances: Sequence[Consumable], force: bool = False
+    ) -> Sequence[Consumable]:
+        selected = [
+            consumable
+            for consumable in instances
+            if force
+            or len(instances) == 1
+            or confirm_action(f"deletion of {str(consumable)}")
+        ]
+        return bulk_delete(Consumable, selected)
 
     @classmethod
     def cli_start(cls, args: Namespace) -> str:
@@ -296,32 +428,33 @@ class ConsumableHandler(CLIHandler):
         # Prepare Arguments
         cls._prepare_args(args, where)
         # Find
-        consumables = Consumable.find(**vars(where))
+        consumables = Query(Consumable, vars(where)).all()
         if len(consumables) == 0:
             return "No Consumables found."
         # Tag
         force = getattr(args, "force")
         tagged = cls.do_tag(consumables, getattr(args, "tag", None), force)
-        return f"{tagged} Consumable(s) tagged."
+        return f"{tagged} tag(s) added to Consumable(s)."
 
     @classmethod
     def do_tag(
         cls, consumables: Sequence[Consumable], tag: str = None, force: bool = False
     ) -> int:
-        # Get tag
+        # Get tags
         if tag is None:
-            tag = request_input("tag")
+            tag = request_input("tag(s)", validator=lambda x: len(split_tags(x)))
+        tags = split_tags(tag)
+        if len(tags) == 0:
+            raise ArgumentError(None, "Tags must be non-empty. e.g. --tag tag1,tag2")
         # Tag
-        tagged = 0
-        for consumable in consumables:
-            if (
-                force
-                or len(consumables) == 1
-                or confirm_action(f"tagging of {str(consumable)} with '{tag}'")
-            ):
-                if consumable.add_tag(tag):
-                    tagged += 1
-        return tagged
+        selected = [
+            consumable
+            for consumable in consumables
+            if force
+            or len(consumables) == 1
+            or confirm_action(f"tagging of {str(consumable)} with {tags}")
+        ]
+        return bulk_tag(selected, tags)
 
     @classmethod
     def cli_untag(cls, args: Namespace) -> str:
@@ -329,33 +462,34 @@ class ConsumableHandler(CLIHandler):
         # Prepare Arguments
         cls._prepare_args(args, where)
         # Find
-        consumables = Consumable.find(**vars(where))
+        consumables = Query(Consumable, vars(where)).all()
         if len(consumables) == 0:
             return "No Consumables found."
         # Untag
         force = getattr(args, "force")
         untagged = cls.do_untag(consumables, getattr(args, "tag", None), force)
         # Create string
-        return f"{untagged} Consumable(s) untagged."
+        return f"{untagged} tag(s) removed from Consumable(s)."
 
     @classmethod
     def do_untag(
         cls, consumables: Sequence[Consumable], tag: str = None, force: bool = False
     ) -> int:
-        # Get tag
+        # Get tags
         if tag is None:
-            tag = request_input("tag")
+            tag = request_input("tag(s)", validator=lambda x: len(split_tags(x)))
+        tags = split_tags(tag)
+        if len(tags) == 0:
+            raise ArgumentError(None, "Tags must be non-empty. e.g. --tag tag1,tag2")
         # Untag
-        untagged = 0
-        for consumable in consumables:
-            if (
-                force
-                or len(consumables) == 1
-                or confirm_action(f"removal of tag '{tag}' from {str(consumable)}")
-            ):
-                if consumable.remove_tag(tag):
-                    untagged += 1
-        return untagged
+        selected = [
+            consumable
+            for consumable in consumables
+            if force
+            or len(consumables) == 1
+            or confirm_action(f"removal of tags {tags} from {str(consumable)}")
+        ]
+        return bulk_untag(selected, tags)
 
     @classmethod
     def cli_series(cls, args: Namespace) -> str:
@@ -370,7 +504,7 @@ class ConsumableHandler(CLIHandler):
                 "Series to set must be specified e.g. cons consumable series set --name S",
             )
         # Get Series
-        series = Series.find(**vars(series_where))
+        series = Query(Series, vars(series_where)).all()
         set_series = None
         if len(series) == 0:
             return "No Series found."
@@ -388,7 +522,7 @@ class ConsumableHandler(CLIHandler):
         else:
             set_series = series[0]
         # Set Series
-        consumables = Consumable.find(**vars(where))
+        consumables = Query(Consumable, vars(where)).all()
         consumables_altered = 0
         if len(consumables) == 0:
             return "No Consumables found."
@@ -416,10 +550,9 @@ class ConsumableHandler(CLIHandler):
         else:
             role = request_input("Personnel role")
         # Get Personnel/Consumables
-        personnel = Personnel.find(**vars(personnel_where))
+        personnel = Query(Personnel, vars(personnel_where)).all()
         selected_personnel = []
-        consumables = Consumable.find(**vars(where))
-        consumables_altered = 0
+        consumables = Query(Consumable, vars(where)).all()
         if len(personnel) == 0:
             return "No Personnel found."
         if len(consumables) == 0:
@@ -434,19 +567,20 @@ class ConsumableHandler(CLIHandler):
             personnel[0].role = role
             selected_personnel = personnel
         # Add to Consumables
-        if len(consumables) > 1:
-            for consumable in consumables:
-                if force or confirm_action(
-                    f"adding selected Personnel to {str(consumable)} as '{role}'"
-                ):
-                    for pers_add in selected_personnel:
-                        if consumable.add_personnel(pers_add):
-                            consumables_altered += 1
-        else:
-            for pers_add in selected_personnel:
-                if consumables[0].add_personnel(pers_add):
-                    consumables_altered += 1
-        return f"{len(selected_personnel)} Personnel added to {consumables_altered} Consumable(s) as '{role}'."
+        selected_consumables = [
+            consumable
+            for consumable in consumables
+            if force
+            or len(consumables) == 1
+            or confirm_action(
+                f"adding selected Personnel to {str(consumable)} as '{role}'"
+            )
+        ]
+        added, present = bulk_add_personnel(selected_consumables, selected_personnel)
+        return (
+            f"{len(selected_personnel)} Personnel added to {len(selected_consumables)} "
+            + f"Consumable(s) as '{role}', {added} link(s) added and {present} already present."
+        )
 
     @classmethod
     def cli_remove_personnel(cls, args: Namespace) -> str:
@@ -460,10 +594,9 @@ class ConsumableHandler(CLIHandler):
         else:
             role = request_input("Personnel role")
         # Get Personnel/Consumables
-        personnel = Personnel.find(**vars(personnel_where))
+        personnel = Query(Personnel, vars(personnel_where)).all()
         selected_personnel = []
-        consumables = Consumable.find(**vars(where))
-        consumables_altered = 0
+        consumables = Query(Consumable, vars(where)).all()
         if len(personnel) == 0:
             return "No Personnel found."
         if len(consumables) == 0:
@@ -477,20 +610,19 @@ class ConsumableHandler(CLIHandler):
         else:
             personnel[0].role = role
             selected_personnel = personnel
-        # Add to Consumables
-        if len(consumables) > 1:
-            for consumable in consumables:
-                if force or confirm_action(
-                    f"removal of selected Personnel from {str(consumable)}"
-                ):
-                    for pers_remove in selected_personnel:
-                        if consumable.remove_personnel(pers_remove):
-                            consumables_altered += 1
-        else:
-            for pers_remove in selected_personnel:
-                if consumables[0].remove_personnel(pers_remove):
-                    consumables_altered += 1
-        return f"{len(selected_personnel)} Personnel removed from {consumables_altered} Consumable(s)."
+        # Remove from Consumables
+        selected_consumables = [
+            consumable
+            for consumable in consumables
+            if force
+            or len(consumables) == 1
+            or confirm_action(f"removal of selected Personnel from {str(consumable)}")
+        ]
+        removed = bulk_remove_personnel(selected_consumables, selected_personnel)
+        return (
+            f"{len(selected_personnel)} Personnel removed from "
+            + f"{len(selected_consumables)} Consumable(s), {removed} link(s) removed."
+        )
 
     @classmethod
     def no_action(cls, args: Namespace) -> str:
@@ -500,32 +632,28 @@ class ConsumableHandler(CLIHandler):
 
     @classmethod
     def _prepare_args(cls, args: Namespace, values: Namespace) -> None:
-        # Date
+        # Date, including the bounds of date ranges
         date_format = getattr(args, "date_format")
-        if "start_date" in values:
-            if getattr(values, "start_date").lower() == "none":
-                setattr(values, "start_date", None)
-            else:
-                try:
-                    setattr(
-                        values,
-                        "start_date",
-                        datetime.strptime(
-                            getattr(values, "start_date"), date_format
-                        ).timestamp(),
-                    )
-                except ValueError:
-                    raise ArgumentError(None, "Invalid date for format.")
-        if "end_date" in values:
-            if getattr(values, "end_date").lower() == "none":
-                setattr(values, "end_date", None)
+        date_keys = [
+            "start_date",
+            "end_date",
+            "started_after",
+            "started_before",
+            "ended_after",
+            "ended_before",
+        ]
+        for key in date_keys:
+            if key not in values:
+                continue
+            if getattr(values, key).lower() == "none":
+                setattr(values, key, None)
             else:
                 try:
                     setattr(
                         values,
-                        "end_date",
+                        key,
                         datetime.strptime(
-                            getattr(values, "end_date"), date_format
+                            getattr(values, key), date_format
                         ).timestamp(),
                     )
                 except ValueError:
@@ -583,24 +711,23 @@ class SeriesHandler(CLIHandler):
         # Create
         series = Series.new(**vars(new))
         # Create String
-        return SeriesList([series]).tabulate_str()
+        return cls._output(list_handling.SeriesList([series]), args)
 
     @classmethod
     def cli_list(cls, args: Namespace) -> str:
         where = getattr(args, "where", Namespace())
-        # Get Series
-        series = Series.find(**vars(where))
+        query = cls._list_query(Series, args, where)
+        # Static listings are streamed in order straight from the query
+        if cls._streamed(args):
+            return cls._write_static(list_handling.SeriesList([]), query, args)
+        # Page in Series as they are shown
+        series = PagedInstances(query)
         results = len(series)
-        # Static vs Dynamic
-        static = getattr(args, "static", False)
+        # Interactive
         if results > 0:
-            series_list = SeriesList(series)
-            series_list.order_by(getattr(args, "order"), getattr(args, "reverse"))
-            if static:
-                return series_list.tabulate_str() + f"\n{results} Result(s)..."
-            else:
-                series_list.init_run()
-                return ""
+            series_list = list_handling.SeriesList(series)
+            series_list.init_run()
+            return ""
         else:
             return "0 Results..."
 
@@ -614,7 +741,7 @@ class SeriesHandler(CLIHandler):
                 "Values to set must be non-empty. e.g. cons series update set --name A",
             )
         # Find
-        series = Series.find(**vars(where_mapping))
+        series = Query(Series, vars(where_mapping)).all()
         if len(series) == 0:
             return "No Series found."
         # Update
@@ -622,7 +749,7 @@ class SeriesHandler(CLIHandler):
         updated_series = cls.do_update(series, vars(set_mapping), force)
         # Create String
         if len(updated_series) > 0:
-            return SeriesList(updated_series).tabulate_str()
+            return cls._output(list_handling.SeriesList(updated_series), args)
         else:
             return "No Series updated."
 
@@ -630,11 +757,12 @@ class SeriesHandler(CLIHandler):
     def do_update(
         cls, instances: Sequence[Series], set_mapping: Mapping, force: bool = False
     ) -> Sequence[Series]:
-        updated_series = []
-        for ser in instances:
-            if force or len(instances) == 1 or confirm_action(f"update of {str(ser)}"):
-                updated_series.append(ser.update_self(set_mapping))
-        return updated_series
+        selected = [
+            ser
+            for ser in instances
+            if force or len(instances) == 1 or confirm_action(f"update of {str(ser)}")
+        ]
+        return bulk_update(Series, selected, set_mapping)
 
     @classmethod
     def update_fields(
@@ -657,28 +785,37 @@ class SeriesHandler(CLIHandler):
     def cli_delete(cls, args: Namespace) -> str:
         where = getattr(args, "where", Namespace())
         # Find
-        series = Series.find(**vars(where))
-        series = list(filter(lambda x: x.id != -1), series)
+        series = Query(Series, vars(where)).all()
+        series = list(filter(lambda x: x.id != -1, series))
         # Delete
         if len(series) == 0:
             return "No Series found."
         force = getattr(args, "force")
         deleted = cls.do_delete(series, force)
         # Create String
-        return f"{deleted} Series deleted."
+        if len(deleted) > 0:
+            return (
+                list_handling.SeriesList(deleted).tabulate_str()
+                + f"\n{len(deleted)} Series deleted."
+            )
+        else:
+            return "No Series deleted."
 
     @classmethod
-    def do_delete(cls, instances: Sequence[DatabaseEntity], force: bool = False) -> int:
-        deleted = 0
-        for ser in instances:
-            if (
+    def do_delete(
+        cls, instances: Sequence[Series], force: bool = False
+    ) -> Sequence[Series]:
+        selected = [
+            ser
+            for ser in instances
+            if ser.id != -1
+            and (
                 force
                 or len(instances) == 1
                 or confirm_action(f"deletion of {str(ser)}")
-            ):
-                ser.delete_self()
-                deleted += 1
-        return deleted
+            )
+        ]
+        return bulk_delete(Series, selected)
 
     @classmethod
     def no_action(cls, args: Namespace) -> str:
@@ -715,24 +852,23 @@ class PersonnelHandler(CLIHandler):
         # Create
         personnel = Personnel.new(**vars(new))
         # Create String
-        return PersonnelList([personnel]).tabulate_str()
+        return cls._output(list_handling.PersonnelList([personnel]), args)
 
     @classmethod
     def cli_list(cls, args: Namespace) -> str:
         where = getattr(args, "where", Namespace())
-        # Get Personnel
-        personnel = Personnel.find(**vars(where))
+        query = cls._list_query(Personnel, args, where)
+        # Static listings are streamed in order straight from the query
+        if cls._streamed(args):
+            return cls._write_static(list_handling.PersonnelList([]), query, args)
+        # Page in Personnel as they are shown
+        personnel = PagedInstances(query)
         results = len(personnel)
-        # Static vs. Dynamic
-        static = getattr(args, "static", False)
+        # Interactive
         if results > 0:
-            personnel_list = PersonnelList(personnel)
-            personnel_list.order_by(getattr(args, "order"), getattr(args, "reverse"))
-            if static:
-                return personnel_list.tabulate_str() + f"\n{results} Result(s)..."
-            else:
-                personnel_list.init_run()
-                return ""
+            personnel_list = list_handling.PersonnelList(personnel)
+            personnel_list.init_run()
+            return ""
         else:
             return "0 Results..."
 
@@ -746,7 +882,7 @@ class PersonnelHandler(CLIHandler):
                 "Values to set must be non-empty. e.g. cons personnel update set --firstname A",
             )
         # Find
-        personnel = Personnel.find(**vars(where_mapping))
+        personnel = Query(Personnel, vars(where_mapping)).all()
         # Update
         if len(personnel) == 0:
             return "No Personnel found."
@@ -754,7 +890,7 @@ class PersonnelHandler(CLIHandler):
         updated_personnel = cls.do_update(personnel, vars(set_mapping), force)
         # Create String
         if len(updated_personnel) > 0:
-            return PersonnelList(updated_personnel).tabulate_str()
+            return cls._output(list_handling.PersonnelList(updated_personnel), args)
         else:
             return "No Personnel updated."
 
@@ -762,11 +898,12 @@ class PersonnelHandler(CLIHandler):
     def do_update(
         cls, instances: Sequence[Personnel], set_mapping: Mapping, force: bool = False
     ) -> Sequence[Personnel]:
-        updated_personnel = []
-        for pers in instances:
-            if force or len(instances) == 1 or confirm_action(f"update of {str(pers)}"):
-                updated_personnel.append(pers.update_self(set_mapping))
-        return updated_personnel
+        selected = [
+            pers
+            for pers in instances
+            if force or len(instances) == 1 or confirm_action(f"update of {str(pers)}")
+        ]
+        return bulk_update(Personnel, selected, set_mapping)
 
     @classmethod
     def update_fields(
@@ -795,27 +932,33 @@ class PersonnelHandler(CLIHandler):
     def cli_delete(cls, args: Namespace) -> str:
         where = getattr(args, "where", Namespace())
         # Find
-        personnel = Personnel.find(**vars(where))
+        personnel = Query(Personnel, vars(where)).all()
         # Delete
         if len(personnel) == 0:
             return "No Personnel found."
         force = getattr(args, "force")
         deleted = cls.do_delete(personnel, force)
         # Create String
-        return f"{deleted} Personnel deleted."
+        if len(deleted) > 0:
+            return (
+                list_handling.PersonnelList(deleted).tabulate_str()
+                + f"\n{len(deleted)} Personnel deleted."
+            )
+        else:
+            return "No Personnel deleted."
 
     @classmethod
-    def do_delete(cls, instances: Sequence[Personnel], force: bool = False) -> int:
-        deleted = 0
-        for pers in instances:
-            if (
-                force
-                or len(instances) == 1
-                or confirm_action(f"deletion of {str(pers)}")
-            ):
-                pers.delete_self()
-                deleted += 1
-        return deleted
+    def do_delete(
+        cls, instances: Sequence[Personnel], force: bool = False
+    ) -> Sequence[Personnel]:
+        selected = [
+            pers
+            for pers in instances
+            if force
+            or len(instances) == 1
+            or confirm_action(f"deletion of {str(pers)}")
+        ]
+        return bulk_delete(Personnel, selected)
 
     @classmethod
     def no_action(cls, args: Namespace) -> str:
@@ -0,0 +1,21 @@
+# General Imports
+import os
+from collections.abc import Sequence
+from pathlib import Path
+
+# Same directory as the consumptionbackend config, without importing it
+SOCKET_PATH = Path(
+    os.environ.get("CONS_SOCKET", Path.home() / ".consumption" / "cons.sock")
+)
+# Commands that must never be forwarded to a running server
+LOCAL_COMMANDS = ["serve", "batch", "shell", "import", "export"]
+
+
+def forward(argv: Sequence[str], socket_path: Path = SOCKET_PATH) -> int | None:
+    # Exit code of the command run by the server, None if it must be run locally.
+    # The client, and socket with it, is only imported once a server is found.
+    if not socket_path.exists() or any(command in argv for command in LOCAL_COMMANDS):
+        return None
+    from . import server_handling
+
+    return server_handling.forward(argv, socket_path)
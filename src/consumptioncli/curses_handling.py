@@ -1,5 +1,7 @@
 # General Imports
-import curses
+from .utils import lazy_import
+
+curses = lazy_import("curses")
 
 
 class CursesCoords:
@@ -53,6 +55,8 @@ def init_curses():
     curses.noecho()
     curses.cbreak()
     curses.curs_set(False)
+    # Escape ends a search in a list, without waiting for a sequence after it
+    curses.set_escdelay(25)
 
 
 def new_win(coords: CursesCoords):
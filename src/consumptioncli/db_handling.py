@@ -0,0 +1,421 @@
+# General Imports
+import re
+import logging
+import sqlite3
+from contextlib import contextmanager
+from collections.abc import Iterator, Sequence, Mapping, Iterable
+from typing import Any
+
+# Consumption Imports
+from consumptionbackend.Database import DatabaseHandler, DatabaseEntity
+from consumptionbackend.Consumable import Consumable
+from consumptionbackend.Series import Series
+from consumptionbackend.Personnel import Personnel
+from consumptionbackend.Status import Status
+
+# Host parameter limit of SQLite versions before 3.32
+MAX_VARIABLES = 999
+# Trigger action ending the transaction, see abort_triggers
+ROLLBACK = re.compile(r"RAISE\s*\(\s*ROLLBACK", re.IGNORECASE)
+# Row conversion and name used in the backend log for each entity
+ENTITY_ROWS = {
+    Consumable: (Consumable._seq_to_consumable, "CONSUMABLE"),
+    Series: (Series._seq_to_series, "SERIES"),
+    Personnel: (Personnel._seq_to_personnel, "PERSONNEL"),
+}
+# Link tables and columns referencing each entity, foreign keys are not enforced
+ENTITY_LINKS = {
+    Consumable: [
+        (Consumable.DB_TAG_MAPPING_NAME, "consumable_id"),
+        (Consumable.DB_PERSONNEL_MAPPING_NAME, "consumable_id"),
+    ],
+    Series: [],
+    Personnel: [(Consumable.DB_PERSONNEL_MAPPING_NAME, "personnel_id")],
+}
+
+
+class _DeferredCommitConnection:
+    # Handed out by DatabaseHandler.get_db while commits are deferred, the
+    # backend commits after every write which would split up transactions.
+    def __init__(self, connection: sqlite3.Connection) -> None:
+        self.connection = connection
+
+    def commit(self) -> None:
+        pass
+
+    def __getattr__(self, name: str):
+        return getattr(self.connection, name)
+
+
+def get_connection() -> sqlite3.Connection:
+    connection = DatabaseHandler.get_db()
+    if isinstance(connection, _DeferredCommitConnection):
+        return connection.connection
+    return connection
+
+
+def commits_deferred() -> bool:
+    return isinstance(DatabaseHandler.get_db(), _DeferredCommitConnection)
+
+
+@contextmanager
+def deferred_commits() -> Iterator[sqlite3.Connection]:
+    # Backend commits are ignored within, committing is left to the caller
+    connection = get_connection()
+    previous = DatabaseHandler.DB_CONNECTION
+    DatabaseHandler.DB_CONNECTION = _DeferredCommitConnection(connection)
+    try:
+        yield connection
+    finally:
+        DatabaseHandler.DB_CONNECTION = previous
+
+
+@contextmanager
+def transaction() -> Iterator[sqlite3.Connection]:
+    # Joins an enclosing transaction if there is one
+    if commits_deferred():
+        yield get_connection()
+        return
+    with deferred_commits() as connection:
+        try:
+            yield connection
+        except BaseException:
+            connection.rollback()
+            raise
+        connection.commit()
+
+
+def abort_triggers(connection: sqlite3.Connection) -> Sequence[tuple[str, str]]:
+    # The backend's triggers rejecting a write RAISE(ROLLBACK), ending the whole
+    # transaction. Within a transaction of many commands they are swapped for
+    # RAISE(ABORT), failing only the statement. Name and SQL of each swapped
+    # trigger, to be restored before committing so no other connection sees it.
+    cur = connection.execute(
+        "SELECT name, sql FROM sqlite_master "
+        + "WHERE type = 'trigger' AND sql LIKE '%ROLLBACK%'"
+    )
+    triggers = [(name, sql) for name, sql in cur.fetchall() if ROLLBACK.search(sql)]
+    for name, sql in triggers:
+        connection.execute(f"DROP TRIGGER {name}")
+        connection.execute(ROLLBACK.sub("RAISE(ABORT", sql))
+    return triggers
+
+
+def restore_triggers(
+    connection: sqlite3.Connection, triggers: Sequence[tuple[str, str]]
+) -> None:
+    for name, sql in triggers:
+        connection.execute(f"DROP TRIGGER {name}")
+        connection.execute(sql)
+
+
+def chunks(values: Sequence, size: int = MAX_VARIABLES) -> Iterator[Sequence]:
+    for i in range(0, len(values), size):
+        yield values[i : i + size]
+
+
+def chunk_pairs(
+    first: Sequence, second: Sequence
+) -> Iterator[tuple[Sequence, Sequence]]:
+    # Chunks of both bound together, any number of either fits the limit
+    for second_chunk in chunks(second, MAX_VARIABLES // 2):
+        for first_chunk in chunks(first, MAX_VARIABLES - len(second_chunk)):
+            yield first_chunk, second_chunk
+
+
+def placeholders(values: Sequence) -> str:
+    return ",".join("?" for _ in values)
+
+
+def find_by_ids(
+    entity: type[DatabaseEntity], ids: Sequence[int]
+) -> Sequence[DatabaseEntity]:
+    to_instance, _ = ENTITY_ROWS[entity]
+    cur = get_connection().cursor()
+    found = {}
+    for chunk in chunks(ids):
+        cur.execute(
+            f"SELECT * FROM {entity.DB_NAME} WHERE id IN ({placeholders(chunk)})", chunk
+        )
+        for row in cur.fetchall():
+            found[row[0]] = to_instance(row)
+    return [found[id] for id in ids if id in found]
+
+
+def _set_value(key: str, value: Any) -> Any:
+    # Same conversions as the backend update
+    if key == "type" and isinstance(value, str):
+        return value.upper()
+    if key == "status" and isinstance(value, Status):
+        return value.value
+    return value
+
+
+def bulk_update(
+    entity: type[DatabaseEntity],
+    instances: Iterable[DatabaseEntity],
+    set_mapping: Mapping[str, Any],
+    do_log: bool = True,
+) -> Sequence[DatabaseEntity]:
+    # One UPDATE per chunk of ids rather than one statement and commit per row,
+    # status/date side effects are applied by the row triggers as before
+    if len(set_mapping) == 0:
+        raise ValueError("Set map cannot be empty.")
+    entity._assert_attrs(set_mapping)
+    old_instances = {instance.id: instance for instance in instances}
+    ids = list(old_instances)
+    set_sql = ", ".join(f"{key} = ?" for key in set_mapping)
+    set_values = [_set_value(key, value) for key, value in set_mapping.items()]
+    with transaction() as connection:
+        cur = connection.cursor()
+        for chunk in chunks(ids, MAX_VARIABLES - len(set_values)):
+            cur.execute(
+                f"UPDATE {entity.DB_NAME} SET {set_sql} "
+                + f"WHERE id IN ({placeholders(chunk)})",
+                set_values + list(chunk),
+            )
+        # RETURNING would miss the changes made by triggers
+        updated = find_by_ids(entity, ids)
+    if do_log:
+        _, log_name = ENTITY_ROWS[entity]
+        logger = logging.getLogger(entity.__module__)
+        for new_instance in updated:
+            old_instance = old_instances[new_instance.id]
+            logger.info(
+                f"UPDATE_{log_name}#{old_instance._csv_str()}#{new_instance._csv_str()}"
+            )
+    return updated
+
+
+def bulk_delete(
+    entity: type[DatabaseEntity],
+    instances: Iterable[DatabaseEntity],
+    do_log: bool = True,
+) -> Sequence[DatabaseEntity]:
+    # Deletes the rows and their links per chunk of ids, returning what was deleted
+    ids = list({instance.id: None for instance in instances})
+    with transaction() as connection:
+        deleted = find_by_ids(entity, ids)
+        ids = [instance.id for instance in deleted]
+        cur = connection.cursor()
+        for chunk in chunks(ids):
+            chunk_placeholders = placeholders(chunk)
+            for table, column in ENTITY_LINKS[entity]:
+                cur.execute(
+                    f"DELETE FROM {table} WHERE {column} IN ({chunk_placeholders})",
+                    chunk,
+                )
+            if entity is Series:
+                # Consumables fall back to the None Series
+                cur.execute(
+                    f"UPDATE {Consumable.DB_NAME} SET series_id = -1 "
+                    + f"WHERE series_id IN ({chunk_placeholders})",
+                    chunk,
+                )
+            cur.execute(
+                f"DELETE FROM {entity.DB_NAME} WHERE id IN ({chunk_placeholders})",
+                chunk,
+            )
+    if do_log:
+        _, log_name = ENTITY_ROWS[entity]
+        logger = logging.getLogger(entity.__module__)
+        for instance in deleted:
+            logger.info(f"DELETE_{log_name}#{instance._csv_str()}")
+    return deleted
+
+
+def normalise_tag(tag: str) -> str:
+    # Tags are stored by name, this is the backend's resolution of a tag
+    return tag.strip().lower()
+
+
+def split_tags(tags: str) -> Sequence[str]:
+    # Comma separated names, normalised and without duplicates
+    normalised = (normalise_tag(tag) for tag in tags.split(","))
+    return list(dict.fromkeys(tag for tag in normalised if len(tag) > 0))
+
+
+def _tag_links(ids: Sequence[int], tags: Sequence[str]) -> set[tuple[int, str]]:
+    cur = get_connection().cursor()
+    links = set()
+    for chunk, tag_chunk in chunk_pairs(ids, tags):
+        cur.execute(
+            f"SELECT consumable_id, tag FROM {Consumable.DB_TAG_MAPPING_NAME} "
+            + f"WHERE consumable_id IN ({placeholders(chunk)}) "
+            + f"AND tag IN ({placeholders(tag_chunk)})",
+            list(chunk) + list(tag_chunk),
+        )
+        links.update(cur.fetchall())
+    return links
+
+
+def bulk_tag(
+    consumables: Iterable[Consumable], tags: Sequence[str], do_log: bool = True
+) -> int:
+    # Number of tag links added, existing ones are left as they are
+    tags = list(dict.fromkeys(map(normalise_tag, tags)))
+    ids = list({consumable.id: None for consumable in consumables})
+    with transaction() as connection:
+        existing = _tag_links(ids, tags)
+        added = [(id, tag) for id in ids for tag in tags if (id, tag) not in existing]
+        connection.executemany(
+            f"INSERT INTO {Consumable.DB_TAG_MAPPING_NAME} (consumable_id, tag) "
+            + "VALUES (?,?)",
+            added,
+        )
+    if do_log:
+        logger = logging.getLogger(Consumable.__module__)
+        for id, tag in added:
+            logger.info(f"ADD_TAG#{id},'{tag}'")
+    return len(added)
+
+
+def bulk_untag(
+    consumables: Iterable[Consumable], tags: Sequence[str], do_log: bool = True
+) -> int:
+    # Number of tag links removed
+    tags = list(dict.fromkeys(map(normalise_tag, tags)))
+    ids = list({consumable.id: None for consumable in consumables})
+    with transaction() as connection:
+        removed = sorted(_tag_links(ids, tags))
+        connection.executemany(
+            f"DELETE FROM {Consumable.DB_TAG_MAPPING_NAME} "
+            + "WHERE consumable_id = ? AND tag = ?",
+            removed,
+        )
+    if do_log:
+        logger = logging.getLogger(Consumable.__module__)
+        for id, tag in removed:
+            logger.info(f"REMOVE_TAG#{id},'{tag}'")
+    return len(removed)
+
+
+def bulk_retag(
+    sources: Sequence[str], target: str, do_log: bool = True
+) -> tuple[int, int]:
+    # Moves every link of the source tags to the target, links the target
+    # already has are dropped. Number of consumables newly given the target
+    # and of links dropped.
+    target = normalise_tag(target)
+    sources = [
+        tag for tag in dict.fromkeys(map(normalise_tag, sources)) if tag != target
+    ]
+    if len(sources) == 0:
+        return 0, 0
+    with transaction() as connection:
+        cur = connection.cursor()
+        removed = []
+        for chunk in chunks(sources):
+            cur.execute(
+                f"SELECT consumable_id, tag FROM {Consumable.DB_TAG_MAPPING_NAME} "
+                + f"WHERE tag IN ({placeholders(chunk)})",
+                chunk,
+            )
+            removed.extend(cur.fetchall())
+        removed.sort()
+        cur.execute(
+            f"SELECT consumable_id FROM {Consumable.DB_TAG_MAPPING_NAME} WHERE tag = ?",
+            [target],
+        )
+        existing = {row[0] for row in cur.fetchall()}
+        # Rows already linked to the target are left behind and deleted
+        for chunk in chunks(sources, MAX_VARIABLES - 1):
+            cur.execute(
+                f"UPDATE OR IGNORE {Consumable.DB_TAG_MAPPING_NAME} SET tag = ? "
+                + f"WHERE tag IN ({placeholders(chunk)})",
+                [target, *chunk],
+            )
+            cur.execute(
+                f"DELETE FROM {Consumable.DB_TAG_MAPPING_NAME} "
+                + f"WHERE tag IN ({placeholders(chunk)})",
+                chunk,
+            )
+    added = list(dict.fromkeys(id for id, _ in removed if id not in existing))
+    if do_log:
+        logger = logging.getLogger(Consumable.__module__)
+        for id, tag in removed:
+            logger.info(f"REMOVE_TAG#{id},'{tag}'")
+        for id in added:
+            logger.info(f"ADD_TAG#{id},'{target}'")
+    return len(added), len(removed) - len(added)
+
+
+def _personnel_links(
+    consumable_ids: Sequence[int], personnel_ids: Sequence[int]
+) -> set[tuple[int, int, str]]:
+    cur = get_connection().cursor()
+    links = set()
+    for chunk, personnel_chunk in chunk_pairs(consumable_ids, personnel_ids):
+        cur.execute(
+            "SELECT consumable_id, personnel_id, role "
+            + f"FROM {Consumable.DB_PERSONNEL_MAPPING_NAME} "
+            + f"WHERE consumable_id IN ({placeholders(chunk)}) "
+            + f"AND personnel_id IN ({placeholders(personnel_chunk)})",
+            list(chunk) + list(personnel_chunk),
+        )
+        links.update(cur.fetchall())
+    return links
+
+
+def _personnel_product(
+    consumables: Iterable[Consumable], personnel: Iterable[Personnel]
+) -> Sequence[tuple[int, int, str]]:
+    # Every consumable with every personnel in its assigned role
+    roles = list({(pers.id, pers.role): None for pers in personnel})
+    for _, role in roles:
+        if not role:
+            raise ValueError(
+                "Cannot assign Personnel to Consumable without assigned role."
+            )
+    consumable_ids = list({consumable.id: None for consumable in consumables})
+    return [(id, pers_id, role) for id in consumable_ids for pers_id, role in roles]
+
+
+def bulk_add_personnel(
+    consumables: Iterable[Consumable],
+    personnel: Iterable[Personnel],
+    do_log: bool = True,
+) -> tuple[int, int]:
+    # Number of links added and number already present
+    product = _personnel_product(consumables, personnel)
+    with transaction() as connection:
+        existing = _personnel_links(
+            list({link[0]: None for link in product}),
+            list({link[1]: None for link in product}),
+        )
+        added = [link for link in product if link not in existing]
+        connection.executemany(
+            f"INSERT OR IGNORE INTO {Consumable.DB_PERSONNEL_MAPPING_NAME} "
+            + "(consumable_id, personnel_id, role) VALUES (?,?,?)",
+            added,
+        )
+    if do_log:
+        logger = logging.getLogger(Consumable.__module__)
+        for id, pers_id, role in added:
+            logger.info(f"ADD_PERSONNEL#{id},{pers_id},'{role}'")
+    return len(added), len(product) - len(added)
+
+
+def bulk_remove_personnel(
+    consumables: Iterable[Consumable],
+    personnel: Iterable[Personnel],
+    do_log: bool = True,
+) -> int:
+    # Number of links removed
+    product = _personnel_product(consumables, personnel)
+    with transaction() as connection:
+        existing = _personnel_links(
+            list({link[0]: None for link in product}),
+            list({link[1]: None for link in product}),
+        )
+        removed = [link for link in product if link in existing]
+        connection.executemany(
+            f"DELETE FROM {Consumable.DB_PERSONNEL_MAPPING_NAME} "
+            + "WHERE consumable_id = ? AND personnel_id = ? AND role = ?",
+            removed,
+        )
+    if do_log:
+        logger = logging.getLogger(Consumable.__module__)
+        for id, pers_id, role in removed:
+            logger.info(f"REMOVE_PERSONNEL#{id},{pers_id},'{role}'")
+    return len(removed)
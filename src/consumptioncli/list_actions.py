@@ -13,6 +13,8 @@ from consumptionbackend.Personnel import Personnel
 from . import list_handling
 from . import cli_handling
 from .utils import confirm_action, request_input
+from .db_handling import bulk_add_personnel
+from .query_handling import Query, PagedInstances
 from .curses_handling import init_curses, uninit_curses
 from . import details_handling
 
@@ -36,6 +38,8 @@ def new_current(state: list_handling.ListState):
 
 class ListAction(ABC):
     ACTION_NAME: str = ""
+    # Whether the list must be drawn again in full after, e.g. on leaving curses
+    CLEARS_SCREEN: bool = True
 
     def __init__(
         self, priority: int, keys: Sequence[str], key_alises: Sequence[str] = None
@@ -53,6 +57,7 @@ class ListAction(ABC):
 
 class ListUp(ListAction):
     ACTION_NAME: str = "Up"
+    CLEARS_SCREEN: bool = False
 
     def run(
         self, state: list_handling.ListState
@@ -63,6 +68,7 @@ class ListUp(ListAction):
 
 class ListDown(ListAction):
     ACTION_NAME: str = "Down"
+    CLEARS_SCREEN: bool = False
 
     def run(
         self, state: list_handling.ListState
@@ -91,6 +97,7 @@ class ListEnd(ListAction):
 
 class ListSelect(ListAction):
     ACTION_NAME: str = "Select"
+    CLEARS_SCREEN: bool = False
 
     def run(
         self, state: list_handling.ListState
@@ -114,6 +121,7 @@ class ListSelectEnd(ListSelect):
 
 class ListDeselectAll(ListAction):
     ACTION_NAME: str = "Deselect All"
+    CLEARS_SCREEN: bool = False
 
     def run(
         self, state: list_handling.ListState
@@ -122,9 +130,65 @@ class ListDeselectAll(ListAction):
         return state, True
 
 
+class ListSearch(ListAction):
+    ACTION_NAME: str = "Search"
+
+    def run(
+        self, state: list_handling.ListState
+    ) -> Tuple[list_handling.ListState, bool]:
+        # Narrows the list as the search is typed, Enter keeps it and Escape
+        # shows everything again
+        search = state.search if state.search is not None else ""
+        state.filter(search)
+        while True:
+            state.render()
+            key = state.window.getkey()
+            if key in ["\n", "KEY_ENTER"]:
+                if search == "":
+                    state.filter(None)
+                break
+            if key == "\x1b":
+                state.filter(None)
+                break
+            if key in ["KEY_BACKSPACE", "\x7f", "\b"]:
+                search = search[:-1]
+            elif len(key) == 1 and key.isprintable():
+                search += key
+            else:
+                continue
+            state.filter(search)
+        return state, True
+
+
+class ListSort(ListAction):
+    ACTION_NAME: str = "Sort"
+
+    @abstractmethod
+    def order_list(self) -> Sequence[str]:
+        pass
+
+    def run(
+        self, state: list_handling.ListState
+    ) -> Tuple[list_handling.ListState, bool]:
+        # Each key ascending then descending, in turn
+        orders = [
+            (key, reverse) for key in self.order_list() for reverse in [False, True]
+        ]
+        order = orders[0]
+        if state.order in orders:
+            order = orders[(orders.index(state.order) + 1) % len(orders)]
+        state.sort(*order)
+        return state, True
+
+
 # Consumable Actions
 
 
+class ListConsumableSort(ListSort):
+    def order_list(self) -> Sequence[str]:
+        return cli_handling.ConsumableHandler.ORDER_LIST
+
+
 class ListConsumableUpdate(ListAction):
     ACTION_NAME: str = "Update Selected"
 
@@ -135,11 +199,7 @@ class ListConsumableUpdate(ListAction):
         updates = cli_handling.ConsumableHandler.update_fields(
             state.selected, force=True
         )
-        for i, cons in enumerate(state.instances):
-            for updated in updates:
-                if cons == updated:
-                    state.instances[i] = updated
-                    break
+        state.replace(updates)
         state.selected = set(updates)
         return state, True
 
@@ -153,9 +213,7 @@ class ListConsumableDelete(ListAction):
     ) -> Tuple[list_handling.ListState, bool]:
         if confirm_action("deletion of selected Consumable(s)"):
             cli_handling.ConsumableHandler.do_delete(state.selected, force=True)
-        state.instances = list(
-            filter(lambda x: x not in state.selected, state.instances)
-        )
+        state.remove(state.selected)
         state.selected = set()
         state.current = new_current(state)
         return state, True
@@ -163,6 +221,7 @@ class ListConsumableDelete(ListAction):
 
 class ListIncrementCurrentRating(ListAction):
     ACTION_NAME: str = "Increment Rating"
+    CLEARS_SCREEN: bool = False
 
     def run(
         self, state: list_handling.ListState
@@ -171,13 +230,13 @@ class ListIncrementCurrentRating(ListAction):
             cons: Consumable = state.instances[state.current]
             new_rating = 0.1 if cons.rating is None else min(10, cons.rating + 0.1)
             if new_rating != cons.rating:
-                new_cons = cons.update_self({"rating": new_rating})
-                state.instances[state.current] = new_cons
+                state.replace([cons.update_self({"rating": new_rating})])
         return state, True
 
 
 class ListDecrementCurrentRating(ListAction):
     ACTION_NAME: str = "Decrement Rating"
+    CLEARS_SCREEN: bool = False
 
     def run(
         self, state: list_handling.ListState
@@ -190,8 +249,7 @@ class ListDecrementCurrentRating(ListAction):
                 else max(0, cons.rating - 0.1)
             )
             if new_rating != cons.rating:
-                new_cons = cons.update_self({"rating": new_rating})
-                state.instances[state.current] = new_cons
+                state.replace([cons.update_self({"rating": new_rating})])
         return state, True
 
 
@@ -225,8 +283,9 @@ class ListSetConsumableSeriesSelected(ListAction):
         self, state: list_handling.ListState
     ) -> Tuple[list_handling.ListState, bool]:
         # Get Series
-        series_list = list_handling.SeriesList(Series.find())
-        series_list.order_by("name")
+        series_list = list_handling.SeriesList(
+            PagedInstances(Query(Series).order_by("name"))
+        )
         actions = [
             *series_list._move_actions(),
             ListSelectEnd(-998, ["\n", "KEY_ENTER"], ["Enter"]),
@@ -250,8 +309,9 @@ class ListAddConsumablePersonnelSelected(ListAction):
         self, state: list_handling.ListState
     ) -> Tuple[list_handling.ListState, bool]:
         # Get Personnel to add
-        personnel_list = list_handling.PersonnelList(Personnel.find())
-        personnel_list.order_by("first_name")
+        personnel_list = list_handling.PersonnelList(
+            PagedInstances(Query(Personnel).order_by("first_name"))
+        )
         actions = [
             *personnel_list._move_actions(),
             *personnel_list._select_actions(),
@@ -263,8 +323,7 @@ class ListAddConsumablePersonnelSelected(ListAction):
         selected_consumables: Sequence[Consumable] = state.selected
         for personnel in selected_personnel:
             personnel.role = request_input(f"role of {personnel}")
-            for consumable in selected_consumables:
-                consumable.add_personnel(personnel)
+        bulk_add_personnel(selected_consumables, selected_personnel)
         return state, True
 
 
@@ -284,6 +343,7 @@ class ListViewConsumable(ListAction):
 
 class ListRemoveSelectedPersonnel(ListAction):
     ACTION_NAME: str = "Remove Selected"
+    CLEARS_SCREEN: bool = False
 
     def __init__(
         self,
@@ -314,6 +374,11 @@ class ListRemoveSelectedPersonnel(ListAction):
 # Series Actions
 
 
+class ListSeriesSort(ListSort):
+    def order_list(self) -> Sequence[str]:
+        return cli_handling.SeriesHandler.ORDER_LIST
+
+
 class ListSeriesUpdate(ListAction):
     ACTION_NAME: str = "Update Current"
 
@@ -326,7 +391,7 @@ class ListSeriesUpdate(ListAction):
             updated_instance = cli_handling.SeriesHandler.update_fields(
                 [current_instance], force=True
             )[0]
-            state.instances[state.current] = updated_instance
+            state.replace([updated_instance])
             if current_instance in state.selected:
                 state.selected.remove(current_instance)
                 state.selected.add(updated_instance)
@@ -342,9 +407,7 @@ class ListSeriesDelete(ListAction):
     ) -> Tuple[list_handling.ListState, bool]:
         if confirm_action("deletion of selected Series"):
             cli_handling.SeriesHandler.do_delete(state.selected, force=True)
-        state.instances = list(
-            filter(lambda x: x not in state.selected, state.instances)
-        )
+        state.remove(state.selected)
         state.selected = set()
         state.current = new_current(state)
         return state, True
@@ -359,8 +422,9 @@ class ListSetSeriesConsumable(ListAction):
     ) -> Tuple[list_handling.ListState, bool]:
         if len(state.instances) > 0:
             # Get Consumables
-            consumable_list = list_handling.ConsumableList(Consumable.find())
-            consumable_list.order_by("name")
+            consumable_list = list_handling.ConsumableList(
+                PagedInstances(Query(Consumable).order_by("name"))
+            )
             actions = [
                 *consumable_list._move_actions(),
                 *consumable_list._select_actions(),
@@ -391,6 +455,7 @@ class ListViewSeries(ListAction):
 
 class ListRemoveSelectedSeriesConsumable(ListAction):
     ACTION_NAME: str = "Remove Selected"
+    CLEARS_SCREEN: bool = False
 
     def __init__(
         self,
@@ -417,6 +482,11 @@ class ListRemoveSelectedSeriesConsumable(ListAction):
 # Personnel Actions
 
 
+class ListPersonnelSort(ListSort):
+    def order_list(self) -> Sequence[str]:
+        return cli_handling.PersonnelHandler.ORDER_LIST
+
+
 class ListPersonnelUpdate(ListAction):
     ACTION_NAME: str = "Update Current"
 
@@ -429,7 +499,7 @@ class ListPersonnelUpdate(ListAction):
             updated_instance = cli_handling.PersonnelHandler.update_fields(
                 [current_instance], force=True
             )[0]
-            state.instances[state.current] = updated_instance
+            state.replace([updated_instance])
             if current_instance in state.selected:
                 state.selected.remove(current_instance)
                 state.selected.add(updated_instance)
@@ -445,9 +515,7 @@ class ListPersonnelDelete(ListAction):
     ) -> Tuple[list_handling.ListState, bool]:
         if confirm_action("deletion of selected Personnel"):
             cli_handling.PersonnelHandler.do_delete(state.selected, force=True)
-        state.instances = list(
-            filter(lambda x: x not in state.selected, state.instances)
-        )
+        state.remove(state.selected)
         state.selected = set()
         state.current = new_current(state)
         return state, True
@@ -461,8 +529,9 @@ class ListAddPersonnelConsumableSelected(ListAction):
         self, state: list_handling.ListState
     ) -> Tuple[list_handling.ListState, bool]:
         # Get Consumables to add
-        consumable_list = list_handling.ConsumableList(Consumable.find())
-        consumable_list.state.order_by("name")
+        consumable_list = list_handling.ConsumableList(
+            PagedInstances(Query(Consumable).order_by("name"))
+        )
         actions = [
             *consumable_list._move_actions(),
             *consumable_list._select_actions(),
@@ -474,8 +543,7 @@ class ListAddPersonnelConsumableSelected(ListAction):
         selected_personnel: Sequence[Personnel] = state.selected
         for personnel in selected_personnel:
             personnel.role = request_input(f"role of {personnel}")
-            for consumable in selected_consumables:
-                consumable.add_personnel(personnel)
+        bulk_add_personnel(selected_consumables, selected_personnel)
         return state, True
 
 
@@ -495,6 +563,7 @@ class ListViewPersonnel(ListAction):
 
 class ListRemoveSelectedPersonnelConsumable(ListAction):
     ACTION_NAME: str = "Remove Selected"
+    CLEARS_SCREEN: bool = False
 
     def __init__(
         self,
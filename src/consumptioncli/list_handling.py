@@ -1,13 +1,17 @@
 # General Imports
+from __future__ import annotations
 from abc import ABC, abstractmethod
+from bisect import bisect_left
 from datetime import datetime
-from typing import Tuple
-from itertools import count
-import curses
-from collections.abc import Sequence
-from consumptioncli.list_actions import ListAction
-from tabulate import tabulate
-from .utils import truncate
+from time import perf_counter_ns
+from typing import Tuple, Callable
+from collections import OrderedDict
+from collections.abc import Sequence, Iterable
+from .utils import truncate, lazy_import
+from .output_handling import write_table, write_records, TableLayout, SAMPLE_SIZE
+from .timing_handling import QueryExplainer
+from .query_handling import PagedInstances
+from .search_handling import SEARCH_COLUMNS
 
 # Consumption Imports
 from .curses_handling import init_curses, uninit_curses, new_win, CursesCoords
@@ -15,7 +19,44 @@ from consumptionbackend.Database import DatabaseEntity
 from consumptionbackend.Consumable import Consumable
 from consumptionbackend.Series import Series
 from consumptionbackend.Personnel import Personnel
-from . import list_actions
+from consumptionbackend.Status import Status
+
+# Deferred until a list is tabulated or run interactively
+curses = lazy_import("curses")
+tabulate = lazy_import("tabulate")
+list_actions = lazy_import(f"{__package__}.list_actions")
+
+# Formatted rows kept by an interactive list, a few screens worth
+ROW_CACHE_SIZE = 1000
+# Earlier searches an interactive list keeps the matches of
+SEARCH_CACHE_SIZE = 64
+
+
+class ListSearchIndex:
+    # Casefolded names of a list by position. The matches of earlier searches
+    # are kept, a search only checks the fewest matches of one it contains,
+    # so typing on refines the matches of the search before.
+    def __init__(self, texts: Iterable[str], ids: Sequence[int] = None) -> None:
+        self.texts = [text.casefold() for text in texts]
+        # Ids by position, where the list is paged
+        self.ids = ids
+        self.matches: OrderedDict[str, list[int]] = OrderedDict()
+
+    def find(self, search: str) -> Sequence[int]:
+        search = search.casefold()
+        if search in self.matches:
+            self.matches.move_to_end(search)
+            return self.matches[search]
+        candidates = range(len(self.texts))
+        for earlier, matches in self.matches.items():
+            if earlier in search and len(matches) < len(candidates):
+                candidates = matches
+        texts = self.texts
+        found = [position for position in candidates if search in texts[position]]
+        self.matches[search] = found
+        if len(self.matches) > SEARCH_CACHE_SIZE:
+            self.matches.popitem(last=False)
+        return found
 
 
 class ListState:
@@ -25,6 +66,161 @@ class ListState:
         self.current = 0
         self.window = None
         self.coords = CursesCoords()
+        # Cells of recently shown rows by id of the instance, with the instance
+        # and its number, least recently shown first
+        self.rows: OrderedDict[
+            int, tuple[DatabaseEntity, int, Sequence[str]]
+        ] = OrderedDict()
+        self.layout: TableLayout = None
+        # What each line of the body shows, lines showing the same are not redrawn
+        self.drawn: dict[int, tuple] = {}
+        # While searching, the whole list and the positions in it of the
+        # instances shown, None for all
+        self.search: str = None
+        self.unfiltered: Sequence[DatabaseEntity] = None
+        self.positions: Sequence[int] = None
+        self.search_index: ListSearchIndex = None
+        # Draws the list, for actions taking input while it is shown
+        self.render: Callable[[], None] = None
+        # Key and direction of the order, the list as given once sorted again,
+        # and the ascending order of each key sorted by since, as instances or
+        # ids where paged
+        self.order: tuple[str, bool] = (
+            instances.query.order if isinstance(instances, PagedInstances) else None
+        )
+        self.unsorted: Sequence[DatabaseEntity] = None
+        self.permutations: dict[str, Sequence] = {}
+
+    def sort(self, key: str, reverse: bool = False) -> None:
+        # Orders the whole list, descending is the ascending order reversed
+        search = self.search
+        if search is not None:
+            self.filter(None)
+        current = self.instances[self.current] if len(self.instances) > 0 else None
+        if self.unsorted is None:
+            self.unsorted = self.instances
+        if key not in self.permutations:
+            self.permutations[key] = self._permutation(self.unsorted, key)
+        permutation = self.permutations[key]
+        permutation = permutation[::-1] if reverse else list(permutation)
+        if isinstance(self.unsorted, PagedInstances):
+            self.instances = PagedInstances(self.unsorted.query, permutation)
+            current = current.id if current is not None else None
+        else:
+            self.instances = permutation
+        # Stay on the same instance
+        self.current = permutation.index(current) if current is not None else 0
+        self.order = (key, reverse)
+        self.search_index = None
+        if search is not None:
+            self.filter(search)
+
+    def filter(self, search: str = None) -> None:
+        # Shows the instances with names containing search, None ends searching
+        if self.unfiltered is None:
+            self.unfiltered = self.instances
+        if self.positions is not None and len(self.instances) > 0:
+            # Position of the cursor in the whole list
+            self.current = self.positions[self.current]
+        self.search = search
+        self.positions = None
+        if search is None:
+            self.instances = self.unfiltered
+            self.unfiltered = None
+            return
+        # Built as searching starts, before anything is typed
+        if self.search_index is None:
+            self.search_index = self._search_index(self.unfiltered)
+        positions = self.search_index.find(search) if search != "" else None
+        if positions is None or len(positions) == len(self.unfiltered):
+            self.instances = self.unfiltered
+            return
+        self.positions = positions
+        if isinstance(self.unfiltered, PagedInstances):
+            ids = self.search_index.ids
+            self.instances = PagedInstances(
+                self.unfiltered.query, [ids[position] for position in self.positions]
+            )
+        else:
+            self.instances = [self.unfiltered[position] for position in self.positions]
+        # Stay on the same instance where it matches, positions are in order
+        current = bisect_left(self.positions, self.current)
+        if current < len(self.positions) and self.positions[current] == self.current:
+            self.current = current
+        else:
+            self.current = 0
+
+    def replace(self, instances: Iterable[DatabaseEntity]) -> None:
+        # Swaps in updated instances, matched by id
+        updated = {instance.id: instance for instance in instances}
+        for shown in [self.instances, self.unfiltered, self.unsorted]:
+            if isinstance(shown, PagedInstances):
+                shown.replace(updated)
+            elif shown is not None:
+                for i, instance in enumerate(shown):
+                    if instance.id in updated:
+                        shown[i] = updated[instance.id]
+        # Names and sorted values may have changed
+        self.search_index = None
+        self.permutations = {}
+
+    def remove(self, instances: Iterable[DatabaseEntity]) -> None:
+        removed = set(instances)
+        if self.unsorted is not None:
+            self.unsorted = self._without(self.unsorted, removed)
+            self.permutations = {}
+        if self.unfiltered is not None:
+            self.unfiltered = self._without(self.unfiltered, removed)
+            self.search_index = None
+            self.positions = None
+            self.filter(self.search)
+        else:
+            self.instances = self._without(self.instances, removed)
+
+    @classmethod
+    def _without(
+        cls, instances: Sequence[DatabaseEntity], removed: set[DatabaseEntity]
+    ) -> Sequence[DatabaseEntity]:
+        if isinstance(instances, PagedInstances):
+            instances.remove(removed)
+            return instances
+        return [instance for instance in instances if instance not in removed]
+
+    @classmethod
+    def _permutation(cls, instances: Sequence[DatabaseEntity], key: str) -> Sequence:
+        # Ascending with None first, ties keep the order of the list
+        if isinstance(instances, PagedInstances):
+            rows = sorted(
+                instances.values([key]), key=lambda row: (row[1] is not None, row[1])
+            )
+            return [row[0] for row in rows]
+        values = [getattr(instance, key) for instance in instances]
+        values = [v.value if isinstance(v, Status) else v for v in values]
+        order = sorted(
+            range(len(values)), key=lambda i: (values[i] is not None, values[i])
+        )
+        return [instances[i] for i in order]
+
+    @classmethod
+    def _search_index(cls, instances: Sequence[DatabaseEntity]) -> ListSearchIndex:
+        # Paged lists read the names without hydrating anything
+        if isinstance(instances, PagedInstances):
+            rows = instances.values(SEARCH_COLUMNS[instances.query.entity])
+            return ListSearchIndex(
+                (
+                    " ".join(value for value in row[1:] if value is not None)
+                    for row in rows
+                ),
+                [row[0] for row in rows],
+            )
+        return ListSearchIndex(
+            " ".join(
+                getattr(instance, column)
+                for column in SEARCH_COLUMNS.get(type(instance), [])
+                if getattr(instance, column) is not None
+            )
+            for instance in instances
+        )
 
     def order_by(self, key: str, reverse: bool = False) -> None:
         # Thanks to Andrew Clark for solution to sorting list with NoneTypes https://stackoverflow.com/a/18411610
@@ -33,21 +229,53 @@ class ListState:
             key=lambda a: (getattr(a, key) is not None, getattr(a, key)),
             reverse=reverse,
         )
+        self.order = (key, reverse)
 
 
 class BaseInstanceList(ABC):
     LIST_TITLE: str = "List"
+    HEADERS: Sequence[str] = []
+    # Names of the values of record, as used by the machine readable formats
+    FIELDS: Sequence[str] = []
 
     def __init__(self, instances: Sequence[DatabaseEntity]) -> None:
         self.state = ListState(instances)
 
     @abstractmethod
-    def tabulate_str(self) -> str:
+    def row(self, number: int, instance: DatabaseEntity) -> Sequence:
         pass
 
-    def tabulate(self) -> Tuple[Sequence[str], Sequence[str]]:
-        table = self.tabulate_str().split("\n")
-        return (table[:2], table[2:])
+    def record(self, instance: DatabaseEntity) -> Sequence:
+        # Full values for FIELDS, nothing truncated
+        return [getattr(instance, field) for field in self.FIELDS]
+
+    def tabulate_str(self) -> str:
+        start = perf_counter_ns()
+        table_instances = [
+            self.row(number, instance)
+            for number, instance in enumerate(self.state.instances)
+        ]
+        table = tabulate.tabulate(table_instances, headers=self.HEADERS)
+        QueryExplainer.formatted(perf_counter_ns() - start)
+        return table
+
+    def write_static(self, instances: Iterable[DatabaseEntity]) -> int:
+        # Streams instances to stdout without holding them, returns how many
+        start = perf_counter_ns()
+        rows = (self.row(number, instance) for number, instance in enumerate(instances))
+        written = write_table(self.HEADERS, rows)
+        QueryExplainer.formatted(perf_counter_ns() - start, streamed=True)
+        return written
+
+    def write_records(
+        self, instances: Iterable[DatabaseEntity], output_format: str
+    ) -> int:
+        # As write_static, in one of the machine readable formats
+        start = perf_counter_ns()
+        records = (self.record(instance) for instance in instances)
+        written = write_records(output_format, self.FIELDS, records)
+        QueryExplainer.formatted(perf_counter_ns() - start, streamed=True)
+        return written
 
     def init_run(
         self, actions: Sequence[list_actions.ListAction], coords: CursesCoords = None
@@ -63,20 +291,57 @@ class BaseInstanceList(ABC):
         self.state.coords = coords if coords is not None else CursesCoords()
         self.state.window = new_win(self.state.coords)
         actions = BaseInstanceList._setup_actions(actions)
+        self.state.render = lambda: self._render(actions)
+        self._init_layout()
         # Render/Action Loop
         self._handle(actions)
 
+    def _init_layout(self) -> None:
+        # Columns are sized from the first rows, as by write_table. Rows are only
+        # formatted once shown, so a list costs the same to open at any length.
+        start = perf_counter_ns()
+        state = self.state
+        state.layout = TableLayout(self.HEADERS)
+        state.rows = OrderedDict()
+        state.drawn = {}
+        # The last row too, for the width of the numbers
+        sample = [*range(min(len(state.instances), SAMPLE_SIZE))]
+        if len(state.instances) > SAMPLE_SIZE:
+            sample.append(len(state.instances) - 1)
+        state.layout.fit(self.row(number, state.instances[number]) for number in sample)
+        QueryExplainer.formatted(perf_counter_ns() - start)
+
+    def _cells(self, number: int) -> Tuple[Sequence[str], bool]:
+        # Cells of a row and whether formatting it widened the layout. Rows are
+        # formatted again once their instance is replaced or they move.
+        state = self.state
+        instance = state.instances[number]
+        cached = state.rows.get(id(instance))
+        if cached is not None and cached[0] is instance and cached[1] == number:
+            state.rows.move_to_end(id(instance))
+            return cached[2], False
+        row = self.row(number, instance)
+        changed = state.layout.fit([row])
+        cells = state.layout.cells(row)
+        state.rows[id(instance)] = (instance, number, cells)
+        state.rows.move_to_end(id(instance))
+        if len(state.rows) > ROW_CACHE_SIZE:
+            state.rows.popitem(last=False)
+        return cells, changed
+
     def _handle(self, actions: Sequence[list_actions.ListAction]) -> None:
         cont = True
+        full = True
         while cont:
             # Render
-            headers, body = self.tabulate()
-            self._render(headers, body, actions)
+            self._render(actions, full)
+            full = False
             # Action
             key = self.state.window.getkey().upper()
             for action in actions:
                 if key in action.keys:
                     self.state, cont = action.run(self.state)
+                    full = full or action.CLEARS_SCREEN
 
     @classmethod
     def _action_strs(cls, actions: Sequence[list_actions.ListAction]) -> Sequence[str]:
@@ -113,74 +378,114 @@ class BaseInstanceList(ABC):
         return groups
 
     def _render(
-        self,
-        headers: Sequence[str],
-        body: Sequence[str],
-        actions: Sequence[list_actions.ListAction],
+        self, actions: Sequence[list_actions.ListAction], full: bool = True
     ) -> None:
-        window = self.state.window
-        instances = self.state.instances
-        selected = self.state.selected
-        current_index = self.state.current
-        window.erase()
-
-        # Title and border
-        window.box(0, 0)
-        window.addstr(0, 0, truncate(self.LIST_TITLE, self.state.coords.width()))
+        # Only lines showing something else than before are drawn, unless full
+        state = self.state
+        window = state.window
+        instances = state.instances
+        selected = state.selected
+        current_index = state.current
         BORDER_SIZE = 1
+        INDENT = 2
         ## Relative coordinates of inner box
         coords = CursesCoords(
             BORDER_SIZE,
             BORDER_SIZE,
-            self.state.coords.width() - BORDER_SIZE,
-            self.state.coords.height() - BORDER_SIZE,
+            state.coords.width() - BORDER_SIZE,
+            state.coords.height() - BORDER_SIZE,
         )
-
-        # Render Actions
         action_groups = BaseInstanceList._grouped_action_strs(actions, coords.width())
         action_lines = len(action_groups)
-        for line_number, group in enumerate(action_groups):
-            action_y = max(coords.y_start, (coords.y_max - action_lines) + line_number)
-            if action_y < coords.y_max:
-                action_string = "   ".join(group)
-                window.addstr(action_y, coords.x_start, action_string)
-        coords.delta_y_max(-action_lines - 1)
-
-        # Render Table
-        INDENT = 2
+        header_count = len(state.layout.header_lines())
+        body = CursesCoords(
+            coords.x_start,
+            min(coords.y_max - action_lines - 1, coords.y_start + header_count),
+            coords.x_max,
+            coords.y_max - action_lines - 1,
+        )
 
-        ## Header
-        header_lines = 0
-        for header_line in headers:
-            if header_lines < coords.height():
-                header_y = header_lines + coords.y_start
+        ## Rows in view, formatting any that are not cached. Paged rows are
+        ## loaded first, which shortens the list where rows were deleted since.
+        if isinstance(instances, PagedInstances):
+            length = None
+            while length != len(instances):
+                length = len(instances)
+                instances.load(
+                    current_index - body.height(), current_index + body.height()
+                )
+                current_index = min(current_index, max(0, len(instances) - 1))
+            state.current = current_index
+        start_index = max(0, current_index - (body.height() // 2))
+        end_index = min(len(instances), start_index + max(0, body.height()))
+        rows = []
+        for i in range(start_index, end_index):
+            cells, changed = self._cells(i)
+            rows.append(cells)
+            full = full or changed
+
+        if full:
+            window.erase()
+            state.drawn = {}
+            # Title and border
+            window.box(0, 0)
+            title = self.LIST_TITLE
+            if state.unsorted is not None:
+                key, reverse = state.order
+                title += f" [{key} {'desc' if reverse else 'asc'}]"
+            if state.search is not None:
+                title += f" /{state.search}"
+            window.addstr(0, 0, truncate(title, state.coords.width()))
+            # Render Actions
+            for line_number, group in enumerate(action_groups):
+                action_y = max(
+                    coords.y_start, (coords.y_max - action_lines) + line_number
+                )
+                if action_y < coords.y_max:
+                    action_string = "   ".join(group)
+                    window.addstr(action_y, coords.x_start, action_string)
+            # Render Header
+            for header_y, header_line in zip(
+                range(coords.y_start, body.y_start), state.layout.header_lines()
+            ):
                 window.addstr(
                     header_y,
                     INDENT + 1,
                     truncate(header_line, coords.width() - INDENT),
                     curses.A_BOLD,
                 )
-                header_lines += 1
-        coords.delta_y_start(header_lines)
-
-        ## Body
-        start_index = max(0, current_index - (coords.height() // 2))
-        end_index = min(len(body), start_index + coords.height())
-        for i, y_pos in zip(range(start_index, end_index), count(coords.y_start)):
-            line = body[i]
-            style = curses.A_STANDOUT if instances[i] in selected else curses.A_NORMAL
-            if i == self.state.current:
+
+        # Render Body
+        for y_pos in range(body.y_start, body.y_max):
+            i = start_index + y_pos - body.y_start
+            shown = None
+            if i < end_index:
+                shown = (
+                    id(instances[i]),
+                    i,
+                    instances[i] in selected,
+                    i == current_index,
+                )
+            if state.drawn.get(y_pos) == shown:
+                continue
+            state.drawn[y_pos] = shown
+            window.addstr(y_pos, body.x_start, " " * body.width())
+            if shown is None:
+                continue
+            line = state.layout.line(rows[i - start_index])
+            style = curses.A_STANDOUT if shown[2] else curses.A_NORMAL
+            if i == current_index:
                 window.addstr(
                     y_pos,
-                    coords.x_start,
-                    f"> {truncate(line, coords.width() - 2*INDENT)} <",
+                    body.x_start,
+                    f"> {truncate(line, body.width() - 2*INDENT)} <",
                     style,
                 )
             else:
                 window.addstr(
                     y_pos,
-                    coords.x_start + INDENT,
-                    truncate(line, coords.width() - INDENT),
+                    body.x_start + INDENT,
+                    truncate(line, body.width() - INDENT),
                     style,
                 )
         window.refresh()
@@ -205,6 +510,7 @@ class BaseInstanceList(ABC):
             list_actions.ListEnd(-9999, ["Q"]),
             *BaseInstanceList._move_actions(),
             *BaseInstanceList._select_actions(),
+            list_actions.ListSearch(9995, ["/"]),
         ]
 
     @classmethod
@@ -220,6 +526,31 @@ class BaseInstanceList(ABC):
 
 class ConsumableList(BaseInstanceList):
     LIST_TITLE: str = "Consumable List"
+    HEADERS: Sequence[str] = [
+        "#",
+        "ID",
+        "Type",
+        "Name",
+        "Parts",
+        "Rating",
+        "Completions",
+        "Status",
+        "Started",
+        "Completed",
+    ]
+    FIELDS: Sequence[str] = [
+        "id",
+        "series_id",
+        "type",
+        "name",
+        "parts",
+        "max_parts",
+        "rating",
+        "completions",
+        "status",
+        "start_date",
+        "end_date",
+    ]
 
     def __init__(
         self, instances: Sequence[Consumable], date_format: str = r"%Y/%m/%d"
@@ -235,6 +566,7 @@ class ConsumableList(BaseInstanceList):
         if actions is None:
             actions = [
                 *BaseInstanceList._default_actions(),
+                list_actions.ListConsumableSort(9994, ["O"]),
                 list_actions.ListViewConsumable(999, ["V"]),
                 list_actions.ListConsumableUpdate(899, ["U"]),
                 list_actions.ListConsumableDelete(898, ["D"]),
@@ -251,46 +583,48 @@ class ConsumableList(BaseInstanceList):
             ]
         super().init_run(actions, coords)
 
-    def tabulate_str(self) -> str:
-        instances: Sequence[Consumable] = self.state.instances
-        table_instances = [
-            [
-                row + 1,
-                i.id,
-                i.type,
-                truncate(i.name, 50),
-                f"{i.parts}/{'?' if i.max_parts is None else i.max_parts}",
-                i.rating,
-                i.completions,
-                i.status.name,
-                datetime.fromtimestamp(i.start_date).strftime(self.date_format)
-                if i.start_date
-                else i.start_date,
-                datetime.fromtimestamp(i.end_date).strftime(self.date_format)
-                if i.end_date
-                else i.end_date,
-            ]
-            for row, i in enumerate(instances)
+    def record(self, i: Consumable) -> Sequence:
+        return [
+            i.id,
+            i.series_id,
+            i.type,
+            i.name,
+            i.parts,
+            i.max_parts,
+            i.rating,
+            i.completions,
+            i.status.name,
+            datetime.fromtimestamp(i.start_date).strftime(self.date_format)
+            if i.start_date
+            else None,
+            datetime.fromtimestamp(i.end_date).strftime(self.date_format)
+            if i.end_date
+            else None,
+        ]
+
+    def row(self, number: int, i: Consumable) -> Sequence:
+        return [
+            number + 1,
+            i.id,
+            i.type,
+            truncate(i.name, 50),
+            f"{i.parts}/{'?' if i.max_parts is None else i.max_parts}",
+            i.rating,
+            i.completions,
+            i.status.name,
+            datetime.fromtimestamp(i.start_date).strftime(self.date_format)
+            if i.start_date
+            else i.start_date,
+            datetime.fromtimestamp(i.end_date).strftime(self.date_format)
+            if i.end_date
+            else i.end_date,
         ]
-        return tabulate(
-            table_instances,
-            headers=[
-                "#",
-                "ID",
-                "Type",
-                "Name",
-                "Parts",
-                "Rating",
-                "Completions",
-                "Status",
-                "Started",
-                "Completed",
-            ],
-        )
 
 
 class SeriesList(BaseInstanceList):
     LIST_TITLE: str = "Series List"
+    HEADERS: Sequence[str] = ["#", "ID", "Name"]
+    FIELDS: Sequence[str] = ["id", "name"]
 
     def __init__(self, instances: Sequence[Series]) -> None:
         super().__init__(instances)
@@ -303,6 +637,7 @@ class SeriesList(BaseInstanceList):
         if actions is None:
             actions = [
                 *BaseInstanceList._default_actions(),
+                list_actions.ListSeriesSort(9994, ["O"]),
                 list_actions.ListViewSeries(999, ["V"]),
                 list_actions.ListSeriesUpdate(899, ["U"]),
                 list_actions.ListSeriesDelete(898, ["D"]),
@@ -310,14 +645,14 @@ class SeriesList(BaseInstanceList):
             ]
         super().init_run(actions, coords)
 
-    def tabulate_str(self) -> str:
-        instances: Sequence[Series] = self.state.instances
-        table_instances = [[row + 1, i.id, i.name] for row, i in enumerate(instances)]
-        return tabulate(table_instances, headers=["#", "ID", "Name"])
+    def row(self, number: int, i: Series) -> Sequence:
+        return [number + 1, i.id, i.name]
 
 
 class PersonnelList(BaseInstanceList):
     LIST_TITLE: str = "Personnel List"
+    HEADERS: Sequence[str] = ["#", "ID", "First Name", "Pseudonym", "Last Name"]
+    FIELDS: Sequence[str] = ["id", "first_name", "pseudonym", "last_name"]
 
     def __init__(self, instances: Sequence[Personnel]) -> None:
         super().__init__(instances)
@@ -330,6 +665,7 @@ class PersonnelList(BaseInstanceList):
         if actions is None:
             actions = [
                 *BaseInstanceList._default_actions(),
+                list_actions.ListPersonnelSort(9994, ["O"]),
                 list_actions.ListViewPersonnel(999, ["V"]),
                 list_actions.ListPersonnelUpdate(899, ["U"]),
                 list_actions.ListPersonnelDelete(898, ["D"]),
@@ -337,15 +673,8 @@ class PersonnelList(BaseInstanceList):
             ]
         super().init_run(actions, coords)
 
-    def tabulate_str(self) -> str:
-        instances: Sequence[Personnel] = self.state.instances
-        table_instances = [
-            [row + 1, i.id, i.first_name, i.pseudonym, i.last_name]
-            for row, i in enumerate(instances)
-        ]
-        return tabulate(
-            table_instances, headers=["#", "ID", "First Name", "Pseudonym", "Last Name"]
-        )
+    def row(self, number: int, i: Personnel) -> Sequence:
+        return [number + 1, i.id, i.first_name, i.pseudonym, i.last_name]
 
 
 class MiniInstanceList(BaseInstanceList):
@@ -353,8 +682,8 @@ class MiniInstanceList(BaseInstanceList):
         self.LIST_TITLE = header
         super().__init__(instances)
 
+    def row(self, number: int, instance: DatabaseEntity) -> Sequence:
+        return [str(instance)]
+
     def tabulate_str(self) -> str:
         return "\n".join(map(str, self.state.instances))
-
-    def tabulate(self) -> Tuple[Sequence[str], Sequence[str]]:
-        return ([], [str(c) for c in self.state.instances])
@@ -0,0 +1,142 @@
+# General Imports
+import json
+import sys
+from itertools import chain, islice
+from collections.abc import Iterable, Sequence
+from typing import Any, TextIO
+from .utils import lazy_import
+
+# Deferred until written as CSV
+csv = lazy_import("csv")
+
+# Values of --format, table being the human readable default
+FORMATS = ["table", "json", "ndjson", "csv", "tsv"]
+# Rows used to size the columns before anything is written
+SAMPLE_SIZE = 200
+# Rows joined into a single write
+WRITE_SIZE = 100
+# Space kept around headers, as by tabulate
+MIN_PADDING = 2
+
+
+def _cell(value: Any) -> str:
+    if value is None:
+        return ""
+    if isinstance(value, float):
+        return format(value, "g")
+    return str(value)
+
+
+def _is_number(value: Any) -> bool:
+    return isinstance(value, (int, float)) and not isinstance(value, bool)
+
+
+class TableLayout:
+    # Column widths and alignment of tabulate's simple format. A column is right
+    # aligned when it has values and all of them are numbers.
+    def __init__(self, headers: Sequence[str]) -> None:
+        self.headers = headers
+        self.widths = [len(header) + MIN_PADDING for header in headers]
+        self.filled = [False] * len(headers)
+        self.numbers = [True] * len(headers)
+
+    def fit(self, rows: Iterable[Sequence[Any]]) -> bool:
+        # Widens the columns to the rows, returns whether the layout changed
+        before = (list(self.widths), self.numeric())
+        for row in rows:
+            for i, value in enumerate(row):
+                if i >= len(self.widths):
+                    self.widths.append(0)
+                    self.filled.append(False)
+                    self.numbers.append(True)
+                self.widths[i] = max(self.widths[i], len(_cell(value)))
+                if value is not None:
+                    self.filled[i] = True
+                    self.numbers[i] = self.numbers[i] and _is_number(value)
+        return before != (self.widths, self.numeric())
+
+    def numeric(self) -> Sequence[bool]:
+        return [
+            filled and numbers for filled, numbers in zip(self.filled, self.numbers)
+        ]
+
+    def cells(self, row: Sequence[Any]) -> Sequence[str]:
+        return [_cell(value) for value in row]
+
+    def line(self, cells: Sequence[str]) -> str:
+        return "  ".join(
+            cell.rjust(width) if right else cell.ljust(width)
+            for cell, width, right in zip(cells, self.widths, self.numeric())
+        ).rstrip()
+
+    def header_lines(self) -> Sequence[str]:
+        if len(self.headers) == 0:
+            return []
+        return [self.line(self.headers), "  ".join("-" * w for w in self.widths)]
+
+
+def write_table(
+    headers: Sequence[str],
+    rows: Iterable[Sequence[Any]],
+    file: TextIO = None,
+    sample_size: int = SAMPLE_SIZE,
+) -> int:
+    # Layout of tabulate's simple format, written as rows arrive. Columns are
+    # sized from the first rows, later wider values push the line out instead.
+    file = file if file is not None else sys.stdout
+    rows = iter(rows)
+    sample = list(islice(rows, sample_size))
+    if len(sample) == 0:
+        return 0
+    layout = TableLayout(headers)
+    layout.fit(sample)
+    file.write("\n".join(layout.header_lines()) + "\n")
+    written = 0
+    lines = []
+    for row in chain(sample, rows):
+        lines.append(layout.line(layout.cells(row)) + "\n")
+        written += 1
+        if len(lines) >= WRITE_SIZE:
+            file.write("".join(lines))
+            lines = []
+    file.write("".join(lines))
+    file.flush()
+    return written
+
+
+def write_records(
+    output_format: str,
+    fields: Sequence[str],
+    records: Iterable[Sequence[Any]],
+    file: TextIO = None,
+) -> int:
+    # Machine readable formats, written one record at a time
+    file = file if file is not None else sys.stdout
+    written = 0
+    if output_format in ["csv", "tsv"]:
+        writer = csv.writer(
+            file,
+            dialect="excel" if output_format == "csv" else "excel-tab",
+            lineterminator="\n",
+        )
+        writer.writerow(fields)
+        for record in records:
+            writer.writerow(record)
+            written += 1
+    elif output_format == "ndjson":
+        for record in records:
+            file.write(json.dumps(dict(zip(fields, record))) + "\n")
+            written += 1
+    elif output_format == "json":
+        file.write("[")
+        for record in records:
+            file.write(
+                ("\n" if written == 0 else ",\n")
+                + json.dumps(dict(zip(fields, record)))
+            )
+            written += 1
+        file.write("\n]\n" if written > 0 else "]\n")
+    else:
+        raise ValueError(f"Unknown output format: {output_format}")
+    file.flush()
+    return written
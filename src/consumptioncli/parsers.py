@@ -1,11 +1,15 @@
 # General Imports
 import argparse
 from abc import ABC, abstractmethod
+from collections.abc import Sequence
 
 # Consumption Imports
-from consumptionbackend.Consumable import Status
+from consumptionbackend.Status import Status
 from .SubNamespaceAction import SubNamespaceAction
 from .cli_handling import CLIHandler, PersonnelHandler, ConsumableHandler, SeriesHandler
+from .output_handling import FORMATS
+from .stats_handling import GROUPS as STATS_GROUPS
+from .tag_handling import TagHandler, ORDER_LIST as TAG_ORDER_LIST
 
 
 class MainParser:
@@ -13,44 +17,143 @@ class MainParser:
         raise RuntimeError("Class cannot be used outside of a static context.")
 
     @classmethod
-    def get(cls):
+    def get(cls, argv: Sequence[str] = None):
+        # Given argv, only the branches named in it are fully built
         main_parser = argparse.ArgumentParser(
             prog="Consumption CLI",
             description="A CLI tool for tracking media consumption",
         )
+        main_parser.add_argument(
+            "--import-times",
+            dest="import_times",
+            action="store_true",
+            help="report the time taken importing each module",
+        )
+        main_parser.add_argument(
+            "--explain",
+            dest="explain",
+            action="store_true",
+            help="report the SQL, query plan and timings of each query run",
+        )
         sub_parsers = main_parser.add_subparsers()
         main_parser.set_defaults(handler=CLIHandler, mode="none")
-        # Consumable
-        ConsumableParser.setup(sub_parsers)
-        # Series
-        SeriesParser.setup(sub_parsers)
-        # Personnel
-        PersonnelParser.setup(sub_parsers)
+        for child_parser in cls.child_parsers():
+            child_parser.setup(sub_parsers, argv)
         return main_parser
 
+    @classmethod
+    def child_parsers(cls) -> Sequence[type["ChildParser"]]:
+        return [
+            ConsumableParser,
+            SeriesParser,
+            PersonnelParser,
+            TagParser,
+            ServeParser,
+            BatchParser,
+            ShellParser,
+            IndexParser,
+            ImportParser,
+            ExportParser,
+        ]
+
 
 # Child Parsers
 
 
 class ChildParser(ABC):
+    NAME: str = ""
+    ALIASES: Sequence[str] = []
+    HELP: str = ""
+    # (name, aliases, help) of each action, built by the matching _setup_{name}
+    ACTIONS: Sequence[tuple[str, Sequence[str], str]] = []
+
     def __init__(self) -> None:
         raise RuntimeError("Class cannot be used outside of a static context.")
 
+    @classmethod
+    def setup(cls, parent_sp, argv: Sequence[str] = None) -> None:
+        # Parsers not named in argv are left empty, only their names are needed
+        parser: argparse.ArgumentParser = parent_sp.add_parser(
+            cls.NAME, aliases=cls.ALIASES, help=cls.HELP
+        )
+        if is_selected(argv, cls.NAME, cls.ALIASES):
+            cls._setup(parser, argv)
+
     @classmethod
     @abstractmethod
-    def setup(cls, parent_sp) -> None:
+    def _setup(cls, parser: argparse.ArgumentParser, argv: Sequence[str]) -> None:
         pass
 
+    @classmethod
+    def add_page_args(cls, parser: argparse.ArgumentParser) -> None:
+        parser.add_argument(
+            "--limit",
+            type=int,
+            dest="limit",
+            default=None,
+            metavar="N",
+            help="list at most N results",
+        )
+        parser.add_argument(
+            "--offset",
+            type=int,
+            dest="offset",
+            default=0,
+            metavar="N",
+            help="skip the first N results",
+        )
+        parser.add_argument(
+            "--after",
+            dest="after",
+            default=None,
+            metavar="KEY",
+            help="continue after the key printed by a limited listing",
+        )
+
+    @classmethod
+    def add_format_args(cls, parser: argparse.ArgumentParser) -> None:
+        parser.add_argument(
+            "--format",
+            dest="format",
+            choices=FORMATS,
+            default="table",
+            help="output format, all but table are streamed without truncation",
+        )
+
+    @classmethod
+    def _setup_actions(cls, parent_sp, argv: Sequence[str]) -> None:
+        for name, aliases, help in cls.ACTIONS:
+            parser = parent_sp.add_parser(name, aliases=aliases, help=help)
+            if is_selected(argv, name, aliases):
+                getattr(cls, f"_setup_{name}")(parser)
+
+
+def is_selected(argv: Sequence[str], name: str, aliases: Sequence[str]) -> bool:
+    # Any matching token selects, over-building on e.g. "--name list" is harmless
+    return argv is None or name in argv or any(alias in argv for alias in aliases)
+
 
 # Consumable Parsing
 
 
 class ConsumableParser(ChildParser):
+    NAME: str = "consumable"
+    ALIASES: Sequence[str] = ["c"]
+    HELP: str = "action on consumable entities"
+    ACTIONS: Sequence[tuple[str, Sequence[str], str]] = [
+        ("new", ["n"], "create a new consumable"),
+        ("list", ["l"], "list consumables"),
+        ("update", ["u"], "update existing consumable"),
+        ("delete", ["d"], "delete existing consumable"),
+        ("stats", ["st"], "aggregate statistics of consumables"),
+        ("tag", ["t"], "add tag to existing consumable"),
+        ("untag", ["ut"], "remove tag from existing consumable"),
+        ("series", ["ss"], "set series of existing consumable"),
+        ("personnel", ["p"], "manage personnel of existing consumable"),
+    ]
+
     @classmethod
-    def setup(cls, parent_sp) -> None:
-        parser: argparse.ArgumentParser = parent_sp.add_parser(
-            "consumable", aliases=["c"], help="action on consumable entities"
-        )
+    def _setup(cls, parser: argparse.ArgumentParser, argv: Sequence[str]) -> None:
         parser.set_defaults(handler=ConsumableHandler)
         parser.add_argument(
             "--df",
@@ -60,32 +163,19 @@ class ConsumableParser(ChildParser):
             metavar="FORMAT",
             help="date format string, e.g %%Y/%%m/%%d",
         )
-        sp = parser.add_subparsers()
         # Add Parsers
-        cls._setup_new(sp)
-        cls._setup_list(sp)
-        cls._setup_update(sp)
-        cls._setup_delete(sp)
-        cls._setup_tag(sp)
-        cls._setup_untag(sp)
-        cls._setup_series(sp)
-        cls._setup_personnel(sp)
+        cls._setup_actions(parser.add_subparsers(), argv)
 
     @classmethod
-    def _setup_new(cls, parent_sp) -> None:
+    def _setup_new(cls, parser_new: argparse.ArgumentParser) -> None:
         # New Consumable
-        parser_new = parent_sp.add_parser(
-            "new", aliases=["n"], help="create a new consumable"
-        )
         parser_new.set_defaults(mode="new")
+        cls.add_format_args(parser_new)
         cls.add_set_args(parser_new, "new")
 
     @classmethod
-    def _setup_list(cls, parent_sp) -> None:
+    def _setup_list(cls, parser_list: argparse.ArgumentParser) -> None:
         # List Consumable
-        parser_list = parent_sp.add_parser(
-            "list", aliases=["l"], help="list consumables"
-        )
         parser_list.set_defaults(mode="list")
         parser_list.add_argument(
             "-o",
@@ -108,14 +198,13 @@ class ConsumableParser(ChildParser):
             action="store_true",
             help="use a static listing instead of interactive scrolling",
         )
+        cls.add_page_args(parser_list)
+        cls.add_format_args(parser_list)
         cls.add_where_args(parser_list)
 
     @classmethod
-    def _setup_update(cls, parent_sp) -> None:
+    def _setup_update(cls, parser_update: argparse.ArgumentParser) -> None:
         # Update Consumable
-        parser_update = parent_sp.add_parser(
-            "update", aliases=["u"], help="update existing consumable"
-        )
         parser_update.add_argument(
             "--force",
             dest=f"force",
@@ -123,16 +212,14 @@ class ConsumableParser(ChildParser):
             help="complete action without confirmation",
         )
         parser_update.set_defaults(mode="update")
+        cls.add_format_args(parser_update)
         cls.add_where_args(parser_update)
         parser_set = parser_update.add_subparsers().add_parser("set", aliases=["s"])
         cls.add_set_args(parser_set)
 
     @classmethod
-    def _setup_delete(cls, parent_sp) -> None:
+    def _setup_delete(cls, parser_delete: argparse.ArgumentParser) -> None:
         # Delete Consumable
-        parser_delete = parent_sp.add_parser(
-            "delete", aliases=["d"], help="delete existing consumable"
-        )
         parser_delete.add_argument(
             "--force",
             dest=f"force",
@@ -143,14 +230,28 @@ class ConsumableParser(ChildParser):
         cls.add_where_args(parser_delete)
 
     @classmethod
-    def _setup_tag(cls, parent_sp) -> None:
-        # Tag Consumable
-        parser_tag = parent_sp.add_parser(
-            "tag", aliases=["t"], help="add tag to existing consumable"
+    def _setup_stats(cls, parser_stats: argparse.ArgumentParser) -> None:
+        # Consumable Statistics
+        parser_stats.set_defaults(mode="stats")
+        parser_stats.add_argument(
+            "--by",
+            dest="by",
+            choices=list(STATS_GROUPS),
+            default=None,
+            help="group by attribute, year being the year completed",
         )
+        cls.add_format_args(parser_stats)
+        cls.add_where_args(parser_stats)
+
+    @classmethod
+    def _setup_tag(cls, parser_tag: argparse.ArgumentParser) -> None:
+        # Tag Consumable
         parser_tag.set_defaults(mode="tag")
         parser_tag.add_argument(
-            "--tag", dest="tag", default=argparse.SUPPRESS, help="tag to add"
+            "--tag",
+            dest="tag",
+            default=argparse.SUPPRESS,
+            help="comma separated tags to add e.g. --tag tag1,tag2",
         )
         parser_tag.add_argument(
             "--force",
@@ -161,14 +262,14 @@ class ConsumableParser(ChildParser):
         cls.add_where_args(parser_tag)
 
     @classmethod
-    def _setup_untag(cls, parent_sp) -> None:
+    def _setup_untag(cls, parser_untag: argparse.ArgumentParser) -> None:
         # Untag Consumable
-        parser_untag = parent_sp.add_parser(
-            "untag", aliases=["ut"], help="remove tag from existing consumable"
-        )
         parser_untag.set_defaults(mode="untag")
         parser_untag.add_argument(
-            "--tag", dest="tag", default=argparse.SUPPRESS, help="tag to remove"
+            "--tag",
+            dest="tag",
+            default=argparse.SUPPRESS,
+            help="comma separated tags to remove e.g. --tag tag1,tag2",
         )
         parser_untag.add_argument(
             "--force",
@@ -179,11 +280,8 @@ class ConsumableParser(ChildParser):
         cls.add_where_args(parser_untag)
 
     @classmethod
-    def _setup_series(cls, parent_sp) -> None:
+    def _setup_series(cls, parser_series: argparse.ArgumentParser) -> None:
         # Set Series
-        parser_series = parent_sp.add_parser(
-            "series", aliases=["ss"], help="set series of existing consumable"
-        )
         parser_series.add_argument(
             "--force",
             dest=f"force",
@@ -196,10 +294,7 @@ class ConsumableParser(ChildParser):
         SeriesParser.add_where_args(parser_set, "series")
 
     @classmethod
-    def _setup_personnel(cls, parent_sp) -> None:
-        parser_personnel = parent_sp.add_parser(
-            "personnel", aliases=["p"], help="manage personnel of existing consumable"
-        )
+    def _setup_personnel(cls, parser_personnel: argparse.ArgumentParser) -> None:
         parser_personnel.add_argument(
             "--force",
             dest=f"force",
@@ -345,6 +440,14 @@ class ConsumableParser(ChildParser):
             metavar="ID",
             help="unique consumable id",
         )
+        parser.add_argument(
+            "--match",
+            dest=f"{dest}.match",
+            action=SubNamespaceAction,
+            default=argparse.SUPPRESS,
+            metavar="QUERY",
+            help="word or prefix query on names e.g. 'dune OR hobb*', see cons index",
+        )
         parser.add_argument(
             "--tg",
             "--tags",
@@ -355,6 +458,57 @@ class ConsumableParser(ChildParser):
             help="comma separated tags e.g. --tags tag1,tag2,tag3",
         )
         cls.add_args(parser, dest)
+        cls.add_range_args(parser, dest)
+
+    @classmethod
+    def add_range_args(cls, parser: argparse.ArgumentParser, dest: str) -> None:
+        for name, type, metavar in [
+            ("rating", float, "RATING"),
+            ("parts", int, "PART"),
+            ("completions", int, "COMPLETIONS"),
+        ]:
+            parser.add_argument(
+                f"--{name}-min",
+                type=type,
+                dest=f"{dest}.{name}_min",
+                action=SubNamespaceAction,
+                default=argparse.SUPPRESS,
+                metavar=metavar,
+                help=f"at least this many {name}"
+                if name != "rating"
+                else "minimum rating",
+            )
+            parser.add_argument(
+                f"--{name}-max",
+                type=type,
+                dest=f"{dest}.{name}_max",
+                action=SubNamespaceAction,
+                default=argparse.SUPPRESS,
+                metavar=metavar,
+                help=f"at most this many {name}"
+                if name != "rating"
+                else "maximum rating",
+            )
+        for name, event in [
+            ("started", "initial start"),
+            ("ended", "first completion"),
+        ]:
+            parser.add_argument(
+                f"--{name}-after",
+                dest=f"{dest}.{name}_after",
+                action=SubNamespaceAction,
+                default=argparse.SUPPRESS,
+                metavar="DATE",
+                help=f"date of {event} on or after DATE",
+            )
+            parser.add_argument(
+                f"--{name}-before",
+                dest=f"{dest}.{name}_before",
+                action=SubNamespaceAction,
+                default=argparse.SUPPRESS,
+                metavar="DATE",
+                help=f"date of {event} before DATE",
+            )
 
     @classmethod
     def add_set_args(cls, parser: argparse.ArgumentParser, dest: str = "set") -> None:
@@ -365,31 +519,31 @@ class ConsumableParser(ChildParser):
 
 
 class SeriesParser(ChildParser):
+    NAME: str = "series"
+    ALIASES: Sequence[str] = ["s"]
+    HELP: str = "action on series entities"
+    ACTIONS: Sequence[tuple[str, Sequence[str], str]] = [
+        ("new", ["n"], "create a new series"),
+        ("list", ["l"], "list series"),
+        ("update", ["u"], "update existing series"),
+        ("delete", ["d"], "delete existing series"),
+    ]
+
     @classmethod
-    def setup(cls, parent_sp) -> None:
-        parser: argparse.ArgumentParser = parent_sp.add_parser(
-            "series", aliases=["s"], help="action on series entities"
-        )
+    def _setup(cls, parser: argparse.ArgumentParser, argv: Sequence[str]) -> None:
         parser.set_defaults(handler=SeriesHandler)
-        sp = parser.add_subparsers()
-        cls._setup_new(sp)
-        cls._setup_list(sp)
-        cls._setup_update(sp)
-        cls._setup_delete(sp)
+        cls._setup_actions(parser.add_subparsers(), argv)
 
     @classmethod
-    def _setup_new(cls, parent_sp) -> None:
+    def _setup_new(cls, parser_new: argparse.ArgumentParser) -> None:
         # New Series
-        parser_new = parent_sp.add_parser(
-            "new", aliases=["n"], help="create a new series"
-        )
         parser_new.set_defaults(mode="new")
+        cls.add_format_args(parser_new)
         cls.add_set_args(parser_new, "new")
 
     @classmethod
-    def _setup_list(cls, parser_sp) -> None:
+    def _setup_list(cls, parser_list: argparse.ArgumentParser) -> None:
         # List Series
-        parser_list = parser_sp.add_parser("list", aliases=["l"], help="list series")
         parser_list.set_defaults(mode="list")
         parser_list.add_argument(
             "-o",
@@ -412,14 +566,13 @@ class SeriesParser(ChildParser):
             action="store_true",
             help="use a static listing instead of interactive scrolling",
         )
+        cls.add_page_args(parser_list)
+        cls.add_format_args(parser_list)
         cls.add_where_args(parser_list)
 
     @classmethod
-    def _setup_update(cls, parent_sp) -> None:
+    def _setup_update(cls, parser_update: argparse.ArgumentParser) -> None:
         # Update Series
-        parser_update = parent_sp.add_parser(
-            "update", aliases=["u"], help="update existing series"
-        )
         parser_update.add_argument(
             "--force",
             dest=f"force",
@@ -427,16 +580,14 @@ class SeriesParser(ChildParser):
             help="complete action without confirmation",
         )
         parser_update.set_defaults(mode="update")
+        cls.add_format_args(parser_update)
         cls.add_where_args(parser_update)
         set_parser = parser_update.add_subparsers().add_parser("set", aliases=["s"])
         cls.add_set_args(set_parser)
 
     @classmethod
-    def _setup_delete(cls, parent_sp) -> None:
+    def _setup_delete(cls, parser_delete: argparse.ArgumentParser) -> None:
         # Delete Series
-        parser_delete = parent_sp.add_parser(
-            "delete", aliases=["d"], help="delete existing series"
-        )
         parser_delete.add_argument(
             "--force",
             dest=f"force",
@@ -471,6 +622,14 @@ class SeriesParser(ChildParser):
             default=argparse.SUPPRESS,
             help="unique series id",
         )
+        parser.add_argument(
+            "--match",
+            dest=f"{dest}.match",
+            action=SubNamespaceAction,
+            default=argparse.SUPPRESS,
+            metavar="QUERY",
+            help="word or prefix query on names e.g. 'dune OR hobb*', see cons index",
+        )
         cls.add_args(parser, dest)
 
     @classmethod
@@ -482,31 +641,31 @@ class SeriesParser(ChildParser):
 
 
 class PersonnelParser(ChildParser):
+    NAME: str = "personnel"
+    ALIASES: Sequence[str] = ["p"]
+    HELP: str = "action on personnel entities"
+    ACTIONS: Sequence[tuple[str, Sequence[str], str]] = [
+        ("new", ["n"], "create new personnel"),
+        ("list", ["l"], "list personnel"),
+        ("update", ["u"], "update existing personnel"),
+        ("delete", ["d"], "delete existing personnel"),
+    ]
+
     @classmethod
-    def setup(cls, parent_sp) -> None:
-        parser: argparse.ArgumentParser = parent_sp.add_parser(
-            "personnel", aliases=["p"], help="action on personnel entities"
-        )
+    def _setup(cls, parser: argparse.ArgumentParser, argv: Sequence[str]) -> None:
         parser.set_defaults(handler=PersonnelHandler)
-        sp = parser.add_subparsers()
-        cls._setup_new(sp)
-        cls._setup_list(sp)
-        cls._setup_update(sp)
-        cls._setup_delete(sp)
+        cls._setup_actions(parser.add_subparsers(), argv)
 
     @classmethod
-    def _setup_new(cls, parent_sp) -> None:
+    def _setup_new(cls, parser_new: argparse.ArgumentParser) -> None:
         # New Personnel
-        parser_new = parent_sp.add_parser(
-            "new", aliases=["n"], help="create new personnel"
-        )
         parser_new.set_defaults(mode="new")
+        cls.add_format_args(parser_new)
         cls.add_set_args(parser_new, "new")
 
     @classmethod
-    def _setup_list(cls, parent_sp) -> None:
+    def _setup_list(cls, parser_list: argparse.ArgumentParser) -> None:
         # List Personnel
-        parser_list = parent_sp.add_parser("list", aliases=["l"], help="list personnel")
         parser_list.set_defaults(mode="list")
         parser_list.add_argument(
             "-o",
@@ -529,14 +688,13 @@ class PersonnelParser(ChildParser):
             action="store_true",
             help="use a static listing instead of interactive scrolling",
         )
+        cls.add_page_args(parser_list)
+        cls.add_format_args(parser_list)
         cls.add_where_args(parser_list)
 
     @classmethod
-    def _setup_update(cls, parent_sp) -> None:
+    def _setup_update(cls, parser_update: argparse.ArgumentParser) -> None:
         # Update Personnel
-        parser_update = parent_sp.add_parser(
-            "update", aliases=["u"], help="update existing personnel"
-        )
         parser_update.add_argument(
             "--force",
             dest=f"force",
@@ -544,16 +702,14 @@ class PersonnelParser(ChildParser):
             help="complete action without confirmation",
         )
         parser_update.set_defaults(mode="update")
+        cls.add_format_args(parser_update)
         cls.add_set_args(parser_update)
         set_parser = parser_update.add_subparsers().add_parser("set", aliases=["s"])
         cls.add_set_args(set_parser)
 
     @classmethod
-    def _setup_delete(cls, parent_sp) -> None:
+    def _setup_delete(cls, parser_delete: argparse.ArgumentParser) -> None:
         # Delete Series
-        parser_delete = parent_sp.add_parser(
-            "delete", aliases=["d"], help="delete existing personnel"
-        )
         parser_delete.add_argument(
             "--force",
             dest=f"force",
@@ -606,8 +762,265 @@ class PersonnelParser(ChildParser):
             default=argparse.SUPPRESS,
             help="unique personnel id",
         )
+        parser.add_argument(
+            "--match",
+            dest=f"{dest}.match",
+            action=SubNamespaceAction,
+            default=argparse.SUPPRESS,
+            metavar="QUERY",
+            help="word or prefix query on names e.g. 'dune OR hobb*', see cons index",
+        )
         cls.add_args(parser, dest)
 
     @classmethod
     def add_set_args(cls, parser: argparse.ArgumentParser, dest: str = "set") -> None:
         cls.add_args(parser, dest)
+
+
+# Tag Parsing
+
+
+class TagParser(ChildParser):
+    NAME: str = "tag"
+    ALIASES: Sequence[str] = ["t"]
+    HELP: str = "action on the tags of all consumables"
+    ACTIONS: Sequence[tuple[str, Sequence[str], str]] = [
+        ("list", ["l"], "list tags with the number of consumables tagged"),
+        ("rename", ["r"], "rename a tag on every consumable"),
+        ("merge", ["m"], "merge tags into one on every consumable"),
+    ]
+
+    @classmethod
+    def _setup(cls, parser: argparse.ArgumentParser, argv: Sequence[str]) -> None:
+        parser.set_defaults(handler=TagHandler)
+        cls._setup_actions(parser.add_subparsers(), argv)
+
+    @classmethod
+    def _setup_list(cls, parser_list: argparse.ArgumentParser) -> None:
+        # List Tags
+        parser_list.set_defaults(mode="list")
+        parser_list.add_argument(
+            "-o",
+            "--order",
+            dest="order",
+            choices=TAG_ORDER_LIST,
+            default="count",
+            help="order by attribute, most used first for count",
+        )
+        parser_list.add_argument(
+            "--rv",
+            "--reverse",
+            dest="reverse",
+            action="store_true",
+            help="reverse order of listing",
+        )
+        parser_list.add_argument(
+            "--prefix",
+            dest="prefix",
+            default=None,
+            help="only tags starting with this",
+        )
+        parser_list.add_argument(
+            "--limit",
+            type=int,
+            dest="limit",
+            default=None,
+            metavar="N",
+            help="list at most N tags",
+        )
+        cls.add_format_args(parser_list)
+
+    @classmethod
+    def _setup_rename(cls, parser_rename: argparse.ArgumentParser) -> None:
+        # Rename Tag
+        parser_rename.set_defaults(mode="rename")
+        parser_rename.add_argument("old", metavar="OLD", help="tag to rename")
+        parser_rename.add_argument("new", metavar="NEW", help="new name of the tag")
+
+    @classmethod
+    def _setup_merge(cls, parser_merge: argparse.ArgumentParser) -> None:
+        # Merge Tags
+        parser_merge.set_defaults(mode="merge")
+        parser_merge.add_argument(
+            "sources", nargs="+", metavar="TAG", help="tags to merge"
+        )
+        parser_merge.add_argument(
+            "--into",
+            dest="target",
+            required=True,
+            metavar="TAG",
+            help="tag the others are merged into",
+        )
+
+
+# Serve Parsing
+
+
+class ServeParser(ChildParser):
+    NAME: str = "serve"
+    HELP: str = "keep a server running that other cons calls are forwarded to"
+
+    @classmethod
+    def _setup(cls, parser: argparse.ArgumentParser, argv: Sequence[str]) -> None:
+        # Handlers of the commands below are imported only once selected
+        from .server_handling import ServeHandler
+
+        parser.set_defaults(handler=ServeHandler, mode="serve")
+        parser.add_argument(
+            "--socket",
+            dest="socket",
+            default=None,
+            metavar="PATH",
+            help="UNIX socket to listen on, defaults to $CONS_SOCKET or ~/.consumption/cons.sock",
+        )
+
+
+# Batch Parsing
+
+
+class BatchParser(ChildParser):
+    NAME: str = "batch"
+    HELP: str = "run commands from a file, one per line, in a single transaction"
+
+    @classmethod
+    def _setup(cls, parser: argparse.ArgumentParser, argv: Sequence[str]) -> None:
+        from .batch_handling import BatchHandler
+
+        parser.set_defaults(handler=BatchHandler, mode="batch")
+        parser.add_argument(
+            "file",
+            type=argparse.FileType("r", encoding="utf-8"),
+            metavar="FILE",
+            help="file of commands without the leading cons, - for stdin",
+        )
+        parser.add_argument(
+            "--ce",
+            "--commit-every",
+            type=int,
+            dest="commit_every",
+            default=0,
+            metavar="LINES",
+            help="commit after this many successful lines instead of only at the end",
+        )
+        parser.add_argument(
+            "-q",
+            "--quiet",
+            dest="quiet",
+            action="store_true",
+            help="only report failures and the summary",
+        )
+
+
+# Shell Parsing
+
+
+class ShellParser(ChildParser):
+    NAME: str = "shell"
+    HELP: str = "interactive prompt for running many commands"
+
+    @classmethod
+    def _setup(cls, parser: argparse.ArgumentParser, argv: Sequence[str]) -> None:
+        from .shell_handling import ShellHandler
+
+        parser.set_defaults(handler=ShellHandler, mode="shell")
+
+
+# Index Parsing
+
+
+class IndexParser(ChildParser):
+    NAME: str = "index"
+    HELP: str = "build the indexes used by name filters, --match and ordering"
+
+    @classmethod
+    def _setup(cls, parser: argparse.ArgumentParser, argv: Sequence[str]) -> None:
+        from .search_handling import IndexHandler
+
+        parser.set_defaults(handler=IndexHandler, mode="index")
+        parser.add_argument(
+            "--drop",
+            dest="drop",
+            action="store_true",
+            help="remove the indexes instead",
+        )
+
+
+# Import Parsing
+
+
+class ImportParser(ChildParser):
+    NAME: str = "import"
+    HELP: str = "create consumables, with their series, tags and personnel, from a file"
+
+    @classmethod
+    def _setup(cls, parser: argparse.ArgumentParser, argv: Sequence[str]) -> None:
+        from .transfer_handling import ImportHandler, TRANSFER_FORMATS
+
+        parser.set_defaults(handler=ImportHandler, mode="import")
+        parser.add_argument(
+            "file",
+            metavar="FILE",
+            help="CSV or NDJSON file, optionally .gz or .xz compressed, - for stdin",
+        )
+        parser.add_argument(
+            "--format",
+            dest="format",
+            choices=TRANSFER_FORMATS,
+            default=None,
+            help="format of the file, by default given by its suffix",
+        )
+        parser.add_argument(
+            "--ce",
+            "--commit-every",
+            type=int,
+            dest="commit_every",
+            default=1000,
+            metavar="RECORDS",
+            help="records inserted and committed at a time",
+        )
+        parser.add_argument(
+            "--dry-run",
+            dest="dry_run",
+            action="store_true",
+            help="only validate the records, nothing is written",
+        )
+        parser.add_argument(
+            "--no-log",
+            dest="no_log",
+            action="store_true",
+            help="leave the imported records out of the consumption log",
+        )
+
+
+# Export Parsing
+
+
+class ExportParser(ChildParser):
+    NAME: str = "export"
+    HELP: str = "write every consumable, with its series, tags and personnel, to a file"
+
+    @classmethod
+    def _setup(cls, parser: argparse.ArgumentParser, argv: Sequence[str]) -> None:
+        from .transfer_handling import ExportHandler, TRANSFER_FORMATS
+
+        parser.set_defaults(handler=ExportHandler, mode="export")
+        parser.add_argument(
+            "file",
+            nargs="?",
+            default="-",
+            metavar="FILE",
+            help="CSV or NDJSON file, compressed if ending in .gz or .xz, stdout by default",
+        )
+        parser.add_argument(
+            "--format",
+            dest="format",
+            choices=TRANSFER_FORMATS,
+            default=None,
+            help="format of the file, by default given by its suffix",
+        )
+        parser.add_argument(
+            "--wal",
+            dest="wal",
+            action="store_true",
+            help="switch the database to WAL journaling, so the export reads it in place without blocking writers",
+        )
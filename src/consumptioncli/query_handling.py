@@ -0,0 +1,408 @@
+# General Imports
+from __future__ import annotations
+import json
+import sqlite3
+from argparse import ArgumentError
+from collections import OrderedDict
+from copy import copy
+from time import perf_counter_ns
+from collections.abc import Iterable, Iterator, Mapping, Sequence
+from typing import Any
+
+# Consumption Imports
+from consumptionbackend.Database import DatabaseEntity
+from consumptionbackend.Consumable import Consumable
+from consumptionbackend.Status import Status
+from .db_handling import (
+    get_connection,
+    placeholders,
+    chunks,
+    find_by_ids,
+    ENTITY_ROWS,
+)
+from .search_handling import (
+    has_search_index,
+    trigram_table,
+    words_table,
+    SEARCH_COLUMNS,
+    MIN_TRIGRAM_LENGTH,
+)
+from .timing_handling import QueryExplainer, QueryProfile
+
+# Columns matched as case-insensitive substrings, as by the backend find
+LIKE_COLUMNS = SEARCH_COLUMNS
+# Range filter keys with the column and comparison they stand for
+RANGE_FILTERS = {
+    "rating_min": ("rating", ">="),
+    "rating_max": ("rating", "<="),
+    "parts_min": ("parts", ">="),
+    "parts_max": ("parts", "<="),
+    "completions_min": ("completions", ">="),
+    "completions_max": ("completions", "<="),
+    "started_after": ("start_date", ">="),
+    "started_before": ("start_date", "<"),
+    "ended_after": ("end_date", ">="),
+    "ended_before": ("end_date", "<"),
+}
+# Rows fetched from the cursor at a time when iterating
+CHUNK_SIZE = 500
+# Instances loaded at a time by PagedInstances, and pages it keeps
+PAGE_SIZE = 200
+PAGE_CACHE_SIZE = 50
+
+
+class Query:
+    # Same matching as DatabaseEntity.find, but ordered in SQL and streamed
+    def __init__(
+        self, entity: type[DatabaseEntity], where: Mapping[str, Any] = None
+    ) -> None:
+        self.entity = entity
+        self.where = dict(where) if where is not None else {}
+        # Search index query on the names, not an attribute
+        self.match: str = self.where.pop("match", None)
+        self.ranges = {
+            key: self.where.pop(key) for key in list(self.where) if key in RANGE_FILTERS
+        }
+        entity._assert_attrs(self.where)
+        for key in self.ranges:
+            column, _ = RANGE_FILTERS[key]
+            entity._assert_attrs({column: None})
+        self.order: tuple[str, bool] = None
+        # Limit (None for all) and offset
+        self.bounds: tuple[int, int] = (None, 0)
+        # Order value and id of the row to continue after
+        self.start: tuple[Any, int] = None
+        # Last instance yielded, the key of which continues the listing
+        self.last: DatabaseEntity = None
+
+    def order_by(self, key: str, reverse: bool = False) -> Query:
+        self.entity._assert_attrs({key: None})
+        self.order = (key, reverse)
+        return self
+
+    def page(self, limit: int = None, offset: int = 0) -> Query:
+        if (limit is not None and limit < 0) or offset < 0:
+            raise ValueError("Limit and offset cannot be negative.")
+        self.bounds = (limit, offset)
+        return self
+
+    def after(self, key: str) -> Query:
+        # Keys are "VALUE:ID" with the order value as JSON, see key_of
+        value, _, id = key.rpartition(":")
+        self.start = (json.loads(value), int(id))
+        return self
+
+    def key_of(self, instance: DatabaseEntity) -> str:
+        value, id = self._start_of(instance)
+        return f"{json.dumps(value)}:{id}"
+
+    def _start_of(self, instance: DatabaseEntity) -> tuple[Any, int]:
+        # Order value and id continuing after the instance, see start
+        value = getattr(instance, self.order[0]) if self.order is not None else None
+        if isinstance(value, Status):
+            value = value.value
+        return (value, instance.id)
+
+    def sql(
+        self, columns: str = "*", ordered: bool = None
+    ) -> tuple[str, Sequence[Any]]:
+        # Counts ignore the order and paging, as do other columns unless ordered
+        ordered = columns == "*" if ordered is None else ordered
+        where, values = self._where()
+        sql = f"SELECT {columns} FROM {self.entity.DB_NAME} WHERE {where}"
+        if ordered:
+            if self.start is not None:
+                keyset, keyset_values = self._keyset()
+                sql += f" AND {keyset}"
+                values = [*values, *keyset_values]
+            limit, offset = self.bounds
+            sql += f" ORDER BY {self._order()} LIMIT ? OFFSET ?"
+            values = [*values, -1 if limit is None else limit, offset]
+        return sql, values
+
+    def count(self) -> int:
+        cur = self._execute("COUNT(*)")
+        return cur.fetchone()[0]
+
+    def total(self) -> int:
+        # Rows the listing yields, unlike count with the paging applied
+        limit, offset = self.bounds
+        if self.start is None and limit is None and offset == 0:
+            return self.count()
+        sql, values = self.sql()
+        cur = self._run(f"SELECT COUNT(*) FROM ({sql})", values)
+        return cur.fetchone()[0]
+
+    def values(self, columns: Sequence[str]) -> Sequence[Sequence[Any]]:
+        # Ids and some columns of the listing, nothing is hydrated
+        cur = self._run(*self.sql(", ".join(["id", *columns]), ordered=True))
+        return cur.fetchall()
+
+    def all(self) -> Sequence[DatabaseEntity]:
+        return list(self)
+
+    def __iter__(self) -> Iterator[DatabaseEntity]:
+        if QueryExplainer.ENABLED:
+            yield from self._profiled_iter()
+            return
+        to_instance, _ = ENTITY_ROWS[self.entity]
+        cur = self._execute()
+        while True:
+            rows = cur.fetchmany(CHUNK_SIZE)
+            if len(rows) == 0:
+                break
+            for row in rows:
+                self.last = to_instance(row)
+                yield self.last
+
+    def _profiled_iter(self) -> Iterator[DatabaseEntity]:
+        # As __iter__, but timing the query and hydration separately for --explain
+        to_instance, _ = ENTITY_ROWS[self.entity]
+        connection = get_connection()
+        sql, values = self.sql()
+        cur = connection.cursor()
+        cur.execute(f"EXPLAIN QUERY PLAN {sql}", values)
+        plan = [row[-1] for row in cur.fetchall()]
+        profile = QueryExplainer.add(
+            QueryProfile(f"{self.entity.__name__} query", sql, values, plan)
+        )
+        cur.execute(f"SELECT COUNT(*) FROM {self.entity.DB_NAME}")
+        profile.table_rows = cur.fetchone()[0]
+        connection.set_progress_handler(profile.step, QueryProfile.STEP_GRANULARITY)
+        try:
+            start = perf_counter_ns()
+            cur = self._execute()
+            while True:
+                rows = cur.fetchmany(CHUNK_SIZE)
+                hydrated = perf_counter_ns()
+                profile.times["query"] += hydrated - start
+                if len(rows) == 0:
+                    break
+                instances = [to_instance(row) for row in rows]
+                profile.returned += len(instances)
+                profile.times["hydration"] += perf_counter_ns() - hydrated
+                for instance in instances:
+                    self.last = instance
+                    yield instance
+                start = perf_counter_ns()
+        finally:
+            connection.set_progress_handler(None, 0)
+
+    def _execute(self, columns: str = "*") -> sqlite3.Cursor:
+        return self._run(*self.sql(columns))
+
+    def _run(self, sql: str, values: Sequence[Any]) -> sqlite3.Cursor:
+        cur = get_connection().cursor()
+        try:
+            cur.execute(sql, values)
+        except sqlite3.OperationalError as e:
+            # The query itself is fine, only the user's --match can be malformed
+            if self.match is not None:
+                raise ArgumentError(None, f"Invalid --match query: {e}")
+            raise
+        return cur
+
+    def _where(self) -> tuple[str, Sequence[Any]]:
+        conditions = ["true"]
+        values = []
+        indexed = has_search_index(self.entity)
+        if self.match is not None:
+            if not indexed:
+                raise ArgumentError(
+                    None, "--match requires the search index, see cons index."
+                )
+            words = words_table(self.entity)
+            conditions.append(
+                f"id IN (SELECT rowid FROM {words} WHERE {words} MATCH ?)"
+            )
+            values.append(self.match)
+        for key, value in self.where.items():
+            if key == "tags":
+                # Must have all of the tags
+                tags = list(dict.fromkeys(value))
+                conditions.append(
+                    f"""id IN (SELECT consumable_id
+                        FROM {Consumable.DB_TAG_MAPPING_NAME}
+                        WHERE tag IN ({placeholders(tags)})
+                        GROUP BY consumable_id
+                        HAVING COUNT(*) = ?)"""
+                )
+                values.extend([*tags, len(tags)])
+            elif key in LIKE_COLUMNS[self.entity]:
+                if indexed and len(value) >= MIN_TRIGRAM_LENGTH:
+                    # Case-insensitive like the scan, as the trigram index folds case
+                    conditions.append(
+                        f"id IN (SELECT rowid FROM {trigram_table(self.entity)} "
+                        + f"WHERE {key} LIKE ?)"
+                    )
+                else:
+                    conditions.append(f"upper({key}) LIKE upper(?)")
+                values.append(f"%{value}%")
+            elif key == "type":
+                conditions.append(f"upper({key}) = upper(?)")
+                values.append(value)
+            elif isinstance(value, Status):
+                conditions.append(f"{key} = ?")
+                values.append(value.value)
+            else:
+                conditions.append(f"{key} = ?")
+                values.append(value)
+        for key, value in self.ranges.items():
+            column, comparison = RANGE_FILTERS[key]
+            conditions.append(f"{column} {comparison} ?")
+            values.append(value)
+        return " AND ".join(conditions), values
+
+    def _order(self) -> str:
+        if self.order is None:
+            return "id"
+        # None first as in ListState.order_by, ties stay in id order. The index
+        # on the key gives id order within equal keys, so ascending needs no sort.
+        key, reverse = self.order
+        if reverse:
+            return f"{key} DESC NULLS LAST, id"
+        return f"{key} ASC NULLS FIRST, id"
+
+    def _keyset(self) -> tuple[str, Sequence[Any]]:
+        # Rows strictly after the start row in _order
+        value, id = self.start
+        if self.order is None:
+            return "id > ?", [id]
+        key, reverse = self.order
+        if value is None:
+            if reverse:
+                return f"({key} IS NULL AND id > ?)", [id]
+            return f"({key} IS NOT NULL OR id > ?)", [id]
+        if reverse:
+            return (
+                f"({key} IS NULL OR {key} < ? OR ({key} = ? AND id > ?))",
+                [value, value, id],
+            )
+        # Row values let the index seek straight to the start row
+        return f"({key}, id) > (?, ?)", [value, id]
+
+
+class PagedInstances(Sequence):
+    # Instances of a listing, loaded a page at a time as they are accessed. A
+    # page follows on from the last row of the page before where that is known,
+    # otherwise it is found by offset. Pages reflect the database when loaded,
+    # rows deleted since the listing was counted shorten it as they are found.
+    def __init__(self, query: Query, ids: Sequence[int] = None) -> None:
+        self.query = query
+        # Rows of the query's entity to list instead, in this order
+        self.ids = ids
+        self.pages: OrderedDict[int, list[DatabaseEntity]] = OrderedDict()
+        # Order value and id of the last row of each page loaded so far
+        self.ends: dict[int, tuple[Any, int]] = {}
+        self.total = query.total() if ids is None else len(ids)
+
+    def __len__(self) -> int:
+        return self.total
+
+    def __getitem__(self, index: int | slice) -> Any:
+        if isinstance(index, slice):
+            return [self[i] for i in range(*index.indices(self.total))]
+        page, position = self._position(index)
+        return self._page(page)[position]
+
+    def __setitem__(self, index: int, instance: DatabaseEntity) -> None:
+        page, position = self._position(index)
+        self._page(page)[position] = instance
+
+    def values(self, columns: Sequence[str]) -> Sequence[Sequence[Any]]:
+        # As Query.values, in the order of the listing
+        if self.ids is None:
+            return self.query.values(columns)
+        cur = get_connection().cursor()
+        found = {}
+        for chunk in chunks(self.ids):
+            cur.execute(
+                f"SELECT {', '.join(['id', *columns])} FROM {self.query.entity.DB_NAME} "
+                + f"WHERE id IN ({placeholders(chunk)})",
+                chunk,
+            )
+            for row in cur.fetchall():
+                found[row[0]] = row
+        return [found[id] for id in self.ids if id in found]
+
+    def replace(self, instances: Mapping[int, DatabaseEntity]) -> None:
+        # Swaps in instances by id where loaded, other pages load them anew
+        for page in self.pages.values():
+            for position, instance in enumerate(page):
+                if instance.id in instances:
+                    page[position] = instances[instance.id]
+
+    def remove(self, instances: Iterable[DatabaseEntity]) -> None:
+        # Deleted rows are gone from a query once loaded again, ids are dropped
+        if self.ids is not None:
+            removed = {instance.id for instance in instances}
+            self.ids = [id for id in self.ids if id not in removed]
+        self.pages.clear()
+        self.ends.clear()
+        self.total = self.query.total() if self.ids is None else len(self.ids)
+
+    def load(self, start: int, stop: int) -> None:
+        # Loads the pages of the rows in range, so the length is final for them
+        page = max(0, start) // PAGE_SIZE
+        while page * PAGE_SIZE < min(stop, self.total):
+            self._page(page)
+            page += 1
+
+    def _position(self, index: int) -> tuple[int, int]:
+        if index < 0:
+            index += self.total
+        if not 0 <= index < self.total:
+            raise IndexError("PagedInstances index out of range")
+        return divmod(index, PAGE_SIZE)
+
+    def _page(self, page: int) -> list[DatabaseEntity]:
+        if page in self.pages:
+            self.pages.move_to_end(page)
+            return self.pages[page]
+        if self.ids is not None:
+            instances = self._ids_page(page)
+        else:
+            instances = self._query_page(page)
+            if len(instances) < min(PAGE_SIZE, self.total - page * PAGE_SIZE):
+                # Rows were deleted, the listing now ends with this page
+                self.total = page * PAGE_SIZE + len(instances)
+                self._forget_after(page)
+        self.pages[page] = instances
+        if len(self.pages) > PAGE_CACHE_SIZE:
+            self.pages.popitem(last=False)
+        return instances
+
+    def _ids_page(self, page: int) -> list[DatabaseEntity]:
+        start, stop = page * PAGE_SIZE, (page + 1) * PAGE_SIZE
+        while True:
+            ids = self.ids[start:stop]
+            instances = list(find_by_ids(self.query.entity, ids))
+            if len(instances) == len(ids):
+                return instances
+            # Rows were deleted, the rows after them move up to fill the page
+            found = {instance.id for instance in instances}
+            self.ids = (
+                self.ids[:start] + [id for id in ids if id in found] + self.ids[stop:]
+            )
+            self.total = len(self.ids)
+            self._forget_after(page)
+
+    def _forget_after(self, page: int) -> None:
+        for later in [later for later in self.pages if later > page]:
+            del self.pages[later]
+        for later in [later for later in self.ends if later > page]:
+            del self.ends[later]
+
+    def _query_page(self, page: int) -> list[DatabaseEntity]:
+        query = copy(self.query)
+        limit = min(PAGE_SIZE, self.total - page * PAGE_SIZE)
+        if page - 1 in self.ends:
+            query.start = self.ends[page - 1]
+            query.bounds = (limit, 0)
+        else:
+            _, offset = self.query.bounds
+            query.bounds = (limit, offset + page * PAGE_SIZE)
+        instances = query.all()
+        if len(instances) > 0:
+            self.ends[page] = query._start_of(instances[-1])
+        return instances
@@ -0,0 +1,158 @@
+# General Imports
+from argparse import Namespace
+from collections.abc import Sequence
+
+# Consumption Imports
+from consumptionbackend.Database import DatabaseEntity
+from consumptionbackend.Consumable import Consumable
+from consumptionbackend.Series import Series
+from consumptionbackend.Personnel import Personnel
+from .db_handling import get_connection, transaction
+
+# Name columns covered by the search index of each entity
+SEARCH_COLUMNS = {
+    Consumable: ["name"],
+    Series: ["name"],
+    Personnel: ["first_name", "last_name", "pseudonym"],
+}
+# Shortest substring the trigram index can look up
+MIN_TRIGRAM_LENGTH = 3
+# Columns indexed for ordering and range filters, the tags counted by
+# 'cons tag list' and the links looked up per consumable by exports, as
+# (table, column)
+COLUMN_INDEXES = [
+    (Consumable.DB_NAME, column)
+    for column in [
+        "type",
+        "name",
+        "parts",
+        "rating",
+        "completions",
+        "status",
+        "start_date",
+        "end_date",
+    ]
+] + [
+    (Series.DB_NAME, "name"),
+    (Personnel.DB_NAME, "first_name"),
+    (Personnel.DB_NAME, "last_name"),
+    (Personnel.DB_NAME, "pseudonym"),
+    (Consumable.DB_TAG_MAPPING_NAME, "tag"),
+    (Consumable.DB_PERSONNEL_MAPPING_NAME, "consumable_id"),
+]
+
+
+def trigram_table(entity: type[DatabaseEntity]) -> str:
+    # Substring lookups, i.e. the LIKE filters on names
+    return f"{entity.DB_NAME}_trigram"
+
+
+def words_table(entity: type[DatabaseEntity]) -> str:
+    # Word and prefix queries for --match
+    return f"{entity.DB_NAME}_words"
+
+
+def has_search_index(entity: type[DatabaseEntity]) -> bool:
+    # Looked up on each query rather than cached, 'cons index' may have been
+    # run by another process since, e.g. while 'cons serve' is running
+    cur = get_connection().cursor()
+    cur.execute(
+        "SELECT 1 FROM sqlite_master WHERE type = 'table' AND name = ?",
+        [words_table(entity)],
+    )
+    return cur.fetchone() is not None
+
+
+class SearchIndex:
+    # External content FTS5 tables over the names, kept in sync by triggers so
+    # writes made by the backend are covered too
+    def __init__(self) -> None:
+        raise RuntimeError("Class cannot be used outside of a static context.")
+
+    @classmethod
+    def create(cls, entity: type[DatabaseEntity]) -> None:
+        columns = SEARCH_COLUMNS[entity]
+        column_list = ", ".join(columns)
+        options = f"content='{entity.DB_NAME}', content_rowid='id'"
+        tables = [
+            (trigram_table(entity), f"{options}, tokenize='trigram'"),
+            (words_table(entity), f"{options}, prefix='2 3'"),
+        ]
+        new_values = ", ".join(f"NEW.{column}" for column in columns)
+        old_values = ", ".join(f"OLD.{column}" for column in columns)
+        with transaction() as connection:
+            for table, table_options in tables:
+                connection.execute(
+                    f"CREATE VIRTUAL TABLE IF NOT EXISTS {table} "
+                    + f"USING fts5({column_list}, {table_options})"
+                )
+                insert = (
+                    f"INSERT INTO {table} (rowid, {column_list}) "
+                    + f"VALUES (NEW.id, {new_values});"
+                )
+                delete = (
+                    f"INSERT INTO {table} ({table}, rowid, {column_list}) "
+                    + f"VALUES ('delete', OLD.id, {old_values});"
+                )
+                for name, event, body in [
+                    ("insert", "INSERT", insert),
+                    ("delete", "DELETE", delete),
+                    ("update", f"UPDATE OF {column_list}", delete + insert),
+                ]:
+                    connection.execute(
+                        f"CREATE TRIGGER IF NOT EXISTS {table}_{name} "
+                        + f"AFTER {event} ON {entity.DB_NAME} BEGIN {body} END"
+                    )
+                connection.execute(f"INSERT INTO {table} ({table}) VALUES ('rebuild')")
+
+    @classmethod
+    def drop(cls, entity: type[DatabaseEntity]) -> None:
+        with transaction() as connection:
+            for table in [trigram_table(entity), words_table(entity)]:
+                for name in ["insert", "delete", "update"]:
+                    connection.execute(f"DROP TRIGGER IF EXISTS {table}_{name}")
+                connection.execute(f"DROP TABLE IF EXISTS {table}")
+
+
+class ColumnIndex:
+    # Plain indexes, only created on request as the backend owns the schema
+    def __init__(self) -> None:
+        raise RuntimeError("Class cannot be used outside of a static context.")
+
+    @classmethod
+    def create(cls) -> None:
+        with transaction() as connection:
+            for table, column in COLUMN_INDEXES:
+                connection.execute(
+                    f"CREATE INDEX IF NOT EXISTS {cls.name(table, column)} "
+                    + f"ON {table} ({column})"
+                )
+
+    @classmethod
+    def drop(cls) -> None:
+        with transaction() as connection:
+            for table, column in COLUMN_INDEXES:
+                connection.execute(f"DROP INDEX IF EXISTS {cls.name(table, column)}")
+
+    @classmethod
+    def name(cls, table: str, column: str) -> str:
+        return f"{table}_{column}_index"
+
+
+class IndexHandler:
+    ENTITIES: Sequence[type[DatabaseEntity]] = [Consumable, Series, Personnel]
+
+    def __init__(self) -> None:
+        raise RuntimeError("Class cannot be used outside of a static context.")
+
+    @classmethod
+    def handle(cls, args: Namespace) -> str:
+        if getattr(args, "drop", False):
+            for entity in cls.ENTITIES:
+                SearchIndex.drop(entity)
+            ColumnIndex.drop()
+            return "Indexes removed."
+        for entity in cls.ENTITIES:
+            SearchIndex.create(entity)
+        ColumnIndex.create()
+        return "Indexes built, name filters, --match and ordering will now use them."
@@ -0,0 +1,252 @@
+# General Imports
+import os
+import io
+import sys
+import json
+import signal
+import socket
+import time
+import traceback
+from argparse import ArgumentError, ArgumentParser, Namespace
+from collections.abc import Iterator, Sequence, Mapping
+from contextlib import contextmanager, redirect_stdout, redirect_stderr
+from pathlib import Path
+
+# Consumption Imports
+from .utils import redirect_input
+from .client_handling import SOCKET_PATH, LOCAL_COMMANDS
+
+# Messages are newline separated JSON objects. The client sends
+# {"argv": [...], "cwd": ..., "tz": ...}, its TZ being null when unset, and
+# answers {"prompt": ...} with {"input": ...}. The server streams
+# {"stdout": ...}/{"stderr": ...} and finishes with {"exit": code}, or with
+# {"fallback": true} if the command has to be run by the client itself.
+
+
+def _send(stream: io.TextIOBase, message: Mapping) -> None:
+    stream.write(json.dumps(message) + "\n")
+    stream.flush()
+
+
+def _receive(stream: io.TextIOBase) -> Mapping:
+    line = stream.readline()
+    if not line:
+        raise EOFError("Connection closed.")
+    return json.loads(line)
+
+
+def _set_time_zone(tz: str | None) -> None:
+    if tz is None:
+        os.environ.pop("TZ", None)
+    else:
+        os.environ["TZ"] = tz
+    if hasattr(time, "tzset"):
+        time.tzset()
+
+
+@contextmanager
+def _client_environment(request: Mapping) -> Iterator[bool]:
+    # Working directory and time zone of the client for the length of its
+    # command, dates given and shown are in its local time. False if the
+    # directory cannot be entered, the client then runs the command itself.
+    cwd, tz = os.getcwd(), os.environ.get("TZ")
+    try:
+        os.chdir(request.get("cwd", cwd))
+    except OSError:
+        entered = False
+    else:
+        entered = True
+        _set_time_zone(request.get("tz", tz))
+    try:
+        yield entered
+    finally:
+        if entered:
+            os.chdir(cwd)
+            _set_time_zone(tz)
+
+
+class _MessageWriter(io.TextIOBase):
+    def __init__(self, stream: io.TextIOBase, key: str) -> None:
+        self.stream = stream
+        self.key = key
+
+    def writable(self) -> bool:
+        return True
+
+    def write(self, s: str) -> int:
+        if len(s) > 0:
+            _send(self.stream, {self.key: s})
+        return len(s)
+
+
+def forward(argv: Sequence[str], socket_path: Path = SOCKET_PATH) -> int | None:
+    # Exit code of the command run by the server, None if it must be run locally
+    if (
+        not hasattr(socket, "AF_UNIX")
+        or not socket_path.exists()
+        or any(command in argv for command in LOCAL_COMMANDS)
+    ):
+        return None
+    connection = socket.socket(socket.AF_UNIX, socket.SOCK_STREAM)
+    try:
+        connection.connect(str(socket_path))
+    except OSError:
+        connection.close()
+        return None
+    with connection, connection.makefile("rw", encoding="utf-8") as stream:
+        _send(
+            stream,
+            {"argv": list(argv), "cwd": os.getcwd(), "tz": os.environ.get("TZ")},
+        )
+        while True:
+            try:
+                message = _receive(stream)
+            except EOFError:
+                print("Server closed the connection unexpectedly.", file=sys.stderr)
+                return 1
+            if "stdout" in message:
+                sys.stdout.write(message["stdout"])
+                sys.stdout.flush()
+            elif "stderr" in message:
+                sys.stderr.write(message["stderr"])
+                sys.stderr.flush()
+            elif "prompt" in message:
+                try:
+                    _send(stream, {"input": input(message["prompt"])})
+                except EOFError:
+                    _send(stream, {"input": None})
+            elif "fallback" in message:
+                return None
+            elif "exit" in message:
+                return message["exit"]
+
+
+class ServeHandler:
+    # Never run by a server on behalf of a client
+    LOCAL_ONLY: bool = True
+
+    def __init__(self) -> None:
+        raise RuntimeError("Class cannot be used outside of a static context.")
+
+    @classmethod
+    def handle(cls, args: Namespace) -> str:
+        # Imported here as the parsers depend on this module
+        from .parsers import MainParser
+        from consumptionbackend.Database import DatabaseHandler
+
+        socket_path = Path(getattr(args, "socket", None) or SOCKET_PATH)
+        if not hasattr(socket, "AF_UNIX"):
+            raise ArgumentError(None, "UNIX sockets are not supported on this system.")
+        cls._remove_stale_socket(socket_path)
+        # Warm state shared by every request
+        main_parser = MainParser.get()
+        DatabaseHandler.get_db()
+
+        server = socket.socket(socket.AF_UNIX, socket.SOCK_STREAM)
+        for signal_number in [signal.SIGINT, signal.SIGTERM]:
+            signal.signal(signal_number, signal.default_int_handler)
+        try:
+            # Owner only from creation, a chmod after binding leaves a window
+            # in which others could connect
+            umask = os.umask(0o177)
+            try:
+                server.bind(str(socket_path))
+            finally:
+                os.umask(umask)
+            server.listen()
+            print(f"Serving on {socket_path}, stop with Ctrl+C.", flush=True)
+            while True:
+                connection, _ = server.accept()
+                with connection:
+                    cls._serve_connection(main_parser, connection)
+        except KeyboardInterrupt:
+            pass
+        finally:
+            server.close()
+            socket_path.unlink(missing_ok=True)
+        return "Server stopped."
+
+    @classmethod
+    def _remove_stale_socket(cls, socket_path: Path) -> None:
+        if not socket_path.exists():
+            return
+        probe = socket.socket(socket.AF_UNIX, socket.SOCK_STREAM)
+        try:
+            probe.connect(str(socket_path))
+        except OSError:
+            socket_path.unlink()
+        else:
+            raise ArgumentError(None, f"A server is already running on {socket_path}.")
+        finally:
+            probe.close()
+
+    @classmethod
+    def _serve_connection(
+        cls, main_parser: ArgumentParser, connection: socket.socket
+    ) -> None:
+        with connection.makefile("rw", encoding="utf-8") as stream:
+            try:
+                message = _receive(stream)
+
+                def prompt(request: str) -> str:
+                    _send(stream, {"prompt": request})
+                    value = _receive(stream)["input"]
+                    if value is None:
+                        raise EOFError
+                    return value
+
+                with (
+                    _client_environment(message) as entered,
+                    redirect_stdout(_MessageWriter(stream, "stdout")),
+                    redirect_stderr(_MessageWriter(stream, "stderr")),
+                    redirect_input(prompt),
+                ):
+                    exit_code = (
+                        cls._run(main_parser, message["argv"]) if entered else None
+                    )
+                if exit_code is None:
+                    _send(stream, {"fallback": True})
+                else:
+                    _send(stream, {"exit": exit_code})
+            except (OSError, EOFError, ValueError):
+                # Client went away or sent garbage, nothing left to report to
+                pass
+
+    @classmethod
+    def _run(cls, main_parser: ArgumentParser, argv: Sequence[str]) -> int | None:
+        from consumptionbackend.Database import DatabaseHandler
+
+        try:
+            args = main_parser.parse_args(argv)
+        except SystemExit as e:
+            return e.code
+        if cls._requires_client(args):
+            return None
+        try:
+            output = getattr(args, "handler").handle(args)
+            if output:
+                print(output)
+            return 0
+        except ArgumentError as e:
+            try:
+                main_parser.error(e.message)
+            except SystemExit as exit:
+                return exit.code
+        except (OSError, EOFError):
+            raise
+        except Exception:
+            traceback.print_exc()
+            return 1
+        finally:
+            # Never leave a half finished command pending for the next one
+            if DatabaseHandler.get_db().in_transaction:
+                DatabaseHandler.get_db().rollback()
+
+    @classmethod
+    def _requires_client(cls, args: Namespace) -> bool:
+        # Interactive lists need the client's terminal
+        return getattr(getattr(args, "handler"), "LOCAL_ONLY", False) or (
+            getattr(args, "mode", None) == "list"
+            and not getattr(args, "static", False)
+            and getattr(args, "format", "table") == "table"
+        )
@@ -0,0 +1,203 @@
+# General Imports
+import sys
+import shlex
+import traceback
+from argparse import ArgumentError, ArgumentParser, Namespace
+from collections.abc import Sequence
+from pathlib import Path
+
+# Consumption Imports
+from consumptionbackend.Consumable import Consumable
+from consumptionbackend.Series import Series
+from consumptionbackend.Personnel import Personnel
+from .db_handling import get_connection
+
+HISTORY_PATH = Path.home() / ".consumption" / "shell_history"
+
+
+class _NameIndex:
+    # Entity names used for completion, loaded once per session on first use
+    def __init__(self) -> None:
+        self._names: dict[str, Sequence[str]] = None
+
+    def names(self, key: str) -> Sequence[str]:
+        if self._names is None:
+            self._names = self._load()
+        return self._names.get(key, [])
+
+    @classmethod
+    def _load(cls) -> dict[str, Sequence[str]]:
+        cur = get_connection().cursor()
+
+        def column(sql: str) -> Sequence[str]:
+            cur.execute(sql)
+            return sorted({row[0] for row in cur.fetchall() if row[0]})
+
+        return {
+            "name": column(f"SELECT name FROM {Consumable.DB_NAME}"),
+            "series": column(f"SELECT name FROM {Series.DB_NAME} WHERE id != -1"),
+            "first_name": column(f"SELECT first_name FROM {Personnel.DB_NAME}"),
+            "last_name": column(f"SELECT last_name FROM {Personnel.DB_NAME}"),
+            "pseudonym": column(f"SELECT pseudonym FROM {Personnel.DB_NAME}"),
+            "tag": column(f"SELECT tag FROM {Consumable.DB_TAG_MAPPING_NAME}"),
+        }
+
+
+class _Completer:
+    def __init__(self, main_parser: ArgumentParser) -> None:
+        self.main_parser = main_parser
+        self.index = _NameIndex()
+        self.matches: Sequence[str] = []
+
+    def complete(self, text: str, state: int) -> str | None:
+        if state == 0:
+            # Only completing once the shell has imported it
+            import readline
+
+            line = readline.get_line_buffer()[: readline.get_begidx()]
+            try:
+                preceding = shlex.split(line)
+            except ValueError:
+                preceding = line.split()
+            self.matches = self.candidates(preceding, text)
+        return self.matches[state] if state < len(self.matches) else None
+
+    def candidates(self, preceding: Sequence[str], text: str) -> Sequence[str]:
+        if len(preceding) > 0 and preceding[0] == "cons":
+            preceding = preceding[1:]
+        # Follow the given subcommands down the parser tree
+        parser = self.main_parser
+        for token in preceding:
+            subparsers = self._subparsers(parser)
+            if token in subparsers:
+                parser = subparsers[token]
+        # Values of the previous option
+        action = None
+        if len(preceding) > 0:
+            action = parser._option_string_actions.get(preceding[-1])
+        if action is not None and action.nargs != 0:
+            if action.choices is not None:
+                options = list(action.choices)
+            else:
+                options = self.index.names(self._index_key(action.dest))
+        elif text.startswith("-"):
+            options = self._options(parser)
+        else:
+            options = list(self._subparsers(parser))
+        prefix = text.lstrip("'\"").casefold()
+        return [
+            shlex.quote(option)
+            for option in options
+            if option.casefold().startswith(prefix)
+        ]
+
+    @classmethod
+    def _subparsers(cls, parser: ArgumentParser) -> dict[str, ArgumentParser]:
+        if parser._subparsers is None:
+            return {}
+        return {
+            name: subparser
+            for action in parser._subparsers._group_actions
+            for name, subparser in action.choices.items()
+        }
+
+    @classmethod
+    def _options(cls, parser: ArgumentParser) -> Sequence[str]:
+        return [option for option in parser._option_string_actions]
+
+    @classmethod
+    def _index_key(cls, dest: str) -> str:
+        # e.g. where.name, series.name, personnel.first_name, where.tags, tag
+        prefix, _, key = dest.rpartition(".")
+        if prefix == "series":
+            return "series"
+        if key in ["tags", "tag"]:
+            return "tag"
+        return key
+
+
+class ShellHandler:
+    # Never run by a server on behalf of a client
+    LOCAL_ONLY: bool = True
+    PROMPT: str = "cons> "
+
+    def __init__(self) -> None:
+        raise RuntimeError("Class cannot be used outside of a static context.")
+
+    @classmethod
+    def handle(cls, args: Namespace) -> str:
+        # Imported here as the parsers depend on this module
+        from .parsers import MainParser
+
+        main_parser = MainParser.get()
+        try:
+            import readline
+        except ImportError:
+            # Not available on e.g. Windows, the shell then works without completion
+            readline = None
+        if readline is not None:
+            cls._setup_readline(_Completer(main_parser))
+        print(
+            "Enter commands as with cons, e.g. c l --static. Quit with exit or Ctrl+D."
+        )
+        try:
+            while True:
+                try:
+                    line = input(cls.PROMPT)
+                except KeyboardInterrupt:
+                    print()
+                    continue
+                except EOFError:
+                    print()
+                    break
+                try:
+                    argv = shlex.split(line)
+                except ValueError as e:
+                    print(f"Invalid input: {e}", file=sys.stderr)
+                    continue
+                if len(argv) > 0 and argv[0] == "cons":
+                    argv = argv[1:]
+                if argv in [["exit"], ["quit"]]:
+                    break
+                if len(argv) > 0:
+                    cls._run(main_parser, argv)
+        finally:
+            if readline is not None:
+                readline.write_history_file(HISTORY_PATH)
+        return ""
+
+    @classmethod
+    def _setup_readline(cls, completer: _Completer) -> None:
+        import readline
+
+        if HISTORY_PATH.is_file():
+            readline.read_history_file(HISTORY_PATH)
+        readline.set_history_length(1000)
+        readline.set_completer(completer.complete)
+        readline.set_completer_delims(" \t\n")
+        # libedit (macOS) uses a different binding syntax
+        if "libedit" in (readline.__doc__ or ""):
+            readline.parse_and_bind("bind ^I rl_complete")
+        else:
+            readline.parse_and_bind("tab: complete")
+
+    @classmethod
+    def _run(cls, main_parser: ArgumentParser, argv: Sequence[str]) -> None:
+        try:
+            args = main_parser.parse_args(argv)
+        except SystemExit:
+            # argparse has already printed the usage or error
+            return
+        handler = getattr(args, "handler")
+        try:
+            if getattr(handler, "LOCAL_ONLY", False):
+                raise ArgumentError(None, "Command cannot be used within the shell.")
+            output = handler.handle(args)
+            if output:
+                print(output)
+        except ArgumentError as e:
+            print(f"{main_parser.prog}: error: {e.message}", file=sys.stderr)
+        except KeyboardInterrupt:
+            print()
+        except Exception:
+            traceback.print_exc()
@@ -0,0 +1,98 @@
+# General Imports
+from collections.abc import Sequence
+from typing import Any
+
+# Consumption Imports
+from consumptionbackend.Consumable import Consumable
+from consumptionbackend.Series import Series
+from consumptionbackend.Status import Status
+from .db_handling import get_connection
+from .query_handling import Query
+
+# Grouping expression and joins for each --by, over the filtered consumables c
+GROUPS = {
+    "type": ("c.type", ""),
+    "status": ("c.status", ""),
+    "year": ("strftime('%Y', c.end_date, 'unixepoch', 'localtime')", ""),
+    "tag": (
+        "t.tag",
+        f"LEFT JOIN {Consumable.DB_TAG_MAPPING_NAME} t ON t.consumable_id = c.id",
+    ),
+    "series": (
+        "s.name",
+        f"LEFT JOIN {Series.DB_NAME} s ON s.id = c.series_id AND s.id != -1",
+    ),
+}
+# Columns of the filtered consumables the aggregates need
+COLUMNS = ["id", "series_id", "type", "status", "parts", "max_parts"]
+COLUMNS += ["completions", "rating", "end_date"]
+FIELDS = [
+    "group",
+    "count",
+    "completed",
+    "parts",
+    "progress",
+    "completions",
+    "average_rating",
+    "median_rating",
+]
+
+
+class ConsumableStats:
+    # Aggregates computed by SQLite, nothing is hydrated
+    def __init__(self) -> None:
+        raise RuntimeError("Class cannot be used outside of a static context.")
+
+    @classmethod
+    def rows(cls, query: Query, by: str = None) -> Sequence[Sequence[Any]]:
+        filtered, values = query.sql(", ".join(COLUMNS))
+        group, joins = GROUPS[by] if by is not None else ("NULL", "")
+        # Progress only counts parts of consumables with a known number of parts
+        sql = f"""
+            WITH c AS ({filtered}),
+            grouped AS (SELECT {group} AS grp, c.* FROM c {joins}),
+            ranked AS (
+                SELECT grp, rating,
+                    ROW_NUMBER() OVER (PARTITION BY grp ORDER BY rating) AS n,
+                    COUNT(*) OVER (PARTITION BY grp) AS total
+                FROM grouped WHERE rating IS NOT NULL
+            ),
+            medians AS (
+                SELECT grp, AVG(rating) AS median FROM ranked
+                WHERE n IN ((total + 1) / 2, (total + 2) / 2)
+                GROUP BY grp
+            ),
+            totals AS (
+                SELECT grp,
+                    COUNT(*) AS count,
+                    SUM(status = {Status.COMPLETED.value}) AS completed,
+                    SUM(parts) AS parts,
+                    100.0 * SUM(CASE WHEN max_parts IS NOT NULL THEN parts END)
+                        / SUM(max_parts) AS progress,
+                    SUM(completions) AS completions,
+                    AVG(rating) AS average_rating
+                FROM grouped GROUP BY grp
+            )
+            SELECT totals.*, medians.median FROM totals
+            LEFT JOIN medians ON medians.grp IS totals.grp
+            ORDER BY totals.grp
+        """
+        cur = get_connection().cursor()
+        cur.execute(sql, values)
+        return [cls._row(by, row) for row in cur.fetchall()]
+
+    @classmethod
+    def _row(cls, by: str, row: Sequence[Any]) -> Sequence[Any]:
+        group, *counts, progress, completions, average, median = row
+        if by is None:
+            group = "All"
+        elif by == "status" and group is not None:
+            group = Status(group).name
+        return [
+            group,
+            *counts,
+            round(progress, 1) if progress is not None else None,
+            completions,
+            round(average, 2) if average is not None else None,
+            round(median, 2) if median is not None else None,
+        ]
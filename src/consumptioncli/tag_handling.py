@@ -0,0 +1,115 @@
+# General Imports
+from argparse import ArgumentError, Namespace
+from collections.abc import Sequence
+
+# Consumption Imports
+from consumptionbackend.Consumable import Consumable
+from .db_handling import get_connection, normalise_tag, bulk_retag
+from .output_handling import write_table, write_records
+
+ORDER_LIST = ["count", "name"]
+
+
+def tag_counts(
+    prefix: str = None, order: str = "count", reverse: bool = False, limit: int = None
+) -> Sequence[tuple[str, int]]:
+    # Tags with the number of consumables linked, grouped along the tag index
+    # where 'cons index' has built it
+    where, values = "true", []
+    prefix = normalise_tag(prefix) if prefix is not None else ""
+    if len(prefix) > 0:
+        # A range on the index rather than LIKE, which could not use it
+        where = "tag >= ? AND tag < ?"
+        values = [prefix, prefix[:-1] + chr(ord(prefix[-1]) + 1)]
+    if order == "count":
+        order_by = "COUNT(*) ASC, tag DESC" if reverse else "COUNT(*) DESC, tag ASC"
+    else:
+        order_by = "tag DESC" if reverse else "tag ASC"
+    cur = get_connection().cursor()
+    cur.execute(
+        f"""SELECT tag, COUNT(*) FROM {Consumable.DB_TAG_MAPPING_NAME}
+            WHERE {where} GROUP BY tag ORDER BY {order_by} LIMIT ?""",
+        [*values, -1 if limit is None else limit],
+    )
+    return cur.fetchall()
+
+
+class TagHandler:
+    def __init__(self) -> None:
+        raise RuntimeError("Class cannot be used outside of a static context.")
+
+    @classmethod
+    def handle(cls, args: Namespace) -> str:
+        match getattr(args, "mode", None):
+            case "list":
+                return cls.cli_list(args)
+            case "rename":
+                return cls.cli_rename(args)
+            case "merge":
+                return cls.cli_merge(args)
+            case _:
+                raise ArgumentError(
+                    None, "Must select an action. e.g. cons tag list --prefix sci"
+                )
+
+    @classmethod
+    def cli_list(cls, args: Namespace) -> str:
+        limit = getattr(args, "limit", None)
+        if limit is not None and limit < 0:
+            raise ArgumentError(None, "Limit must not be negative.")
+        counts = tag_counts(
+            getattr(args, "prefix", None),
+            getattr(args, "order"),
+            getattr(args, "reverse"),
+            limit,
+        )
+        output_format = getattr(args, "format", "table")
+        if output_format != "table":
+            write_records(output_format, ["tag", "count"], counts)
+            return ""
+        rows = ([i, tag, count] for i, (tag, count) in enumerate(counts, 1))
+        results = write_table(["#", "Tag", "Consumables"], rows)
+        if results == 0:
+            return "0 Results..."
+        return f"{results} Tag(s)..."
+
+    @classmethod
+    def cli_rename(cls, args: Namespace) -> str:
+        old, new = cls._tag(getattr(args, "old")), cls._tag(getattr(args, "new"))
+        if old == new:
+            raise ArgumentError(None, "Tags must differ to be renamed.")
+        if cls._in_use(new):
+            raise ArgumentError(
+                None,
+                f"Tag '{new}' is already in use, combine them with cons tag merge.",
+            )
+        moved, _ = bulk_retag([old], new)
+        if moved == 0:
+            return f"No Consumables tagged '{old}'."
+        return f"Renamed '{old}' to '{new}' on {moved} Consumable(s)."
+
+    @classmethod
+    def cli_merge(cls, args: Namespace) -> str:
+        sources = [cls._tag(tag) for tag in getattr(args, "sources")]
+        target = cls._tag(getattr(args, "target"))
+        tagged, _ = bulk_retag(sources, target)
+        return (
+            f"Merged {len(set(sources) - {target})} tag(s) into '{target}', "
+            + f"{tagged} Consumable(s) newly tagged."
+        )
+
+    @classmethod
+    def _tag(cls, tag: str) -> str:
+        tag = normalise_tag(tag)
+        if len(tag) == 0:
+            raise ArgumentError(None, "Tags must be non-empty.")
+        return tag
+
+    @classmethod
+    def _in_use(cls, tag: str) -> bool:
+        cur = get_connection().cursor()
+        cur.execute(
+            f"SELECT 1 FROM {Consumable.DB_TAG_MAPPING_NAME} WHERE tag = ? LIMIT 1",
+            [tag],
+        )
+        return cur.fetchone() is not None
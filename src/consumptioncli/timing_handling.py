@@ -0,0 +1,145 @@
+# General Imports
+import sys
+from time import perf_counter_ns
+from collections.abc import Sequence
+from typing import Any
+
+
+class _TimedLoader:
+    def __init__(self, loader, timer: "ImportTimer") -> None:
+        self.loader = loader
+        self.timer = timer
+
+    def __getattr__(self, name: str):
+        return getattr(self.loader, name)
+
+    def create_module(self, spec):
+        return self.loader.create_module(spec)
+
+    def exec_module(self, module) -> None:
+        self.timer.start(module.__name__)
+        try:
+            self.loader.exec_module(module)
+        finally:
+            self.timer.stop()
+
+
+class ImportTimer:
+    # Same layout as python -X importtime, but can be enabled after startup
+    def __init__(self) -> None:
+        self.records: list[tuple[int, str, int, int]] = []
+        self._stack: list[list] = []
+
+    def install(self) -> None:
+        sys.meta_path.insert(0, self)
+
+    def uninstall(self) -> None:
+        if self in sys.meta_path:
+            sys.meta_path.remove(self)
+
+    def find_spec(self, fullname: str, path: Sequence[str] = None, target=None):
+        for finder in sys.meta_path:
+            if finder is self or not hasattr(finder, "find_spec"):
+                continue
+            spec = finder.find_spec(fullname, path, target)
+            if spec is not None:
+                if hasattr(spec.loader, "exec_module"):
+                    spec.loader = _TimedLoader(spec.loader, self)
+                return spec
+        return None
+
+    def start(self, name: str) -> None:
+        # name, start time, time spent in nested imports
+        self._stack.append([name, perf_counter_ns(), 0])
+
+    def stop(self) -> None:
+        name, start, nested = self._stack.pop()
+        cumulative = (perf_counter_ns() - start) // 1000
+        if len(self._stack) > 0:
+            self._stack[-1][2] += cumulative
+        self.records.append((len(self._stack), name, cumulative - nested, cumulative))
+
+    def report(self) -> str:
+        lines = ["import time: self [us] | cumulative | imported package"]
+        for depth, name, self_us, cumulative_us in self.records:
+            lines.append(
+                f"import time: {self_us:>9} | {cumulative_us:>10} | {'  ' * depth}{name}"
+            )
+        total = sum(record[3] for record in self.records if record[0] == 0)
+        lines.append(f"{len(self.records)} module(s) imported in {total / 1000:.2f}ms")
+        return "\n".join(lines)
+
+
+class QueryProfile:
+    # SQL-level costs are approximated by SQLite VM steps, counted in batches
+    STEP_GRANULARITY: int = 100
+
+    def __init__(
+        self, name: str, sql: str, values: Sequence[Any], plan: Sequence[str]
+    ) -> None:
+        self.name = name
+        self.sql = sql
+        self.values = values
+        self.plan = plan
+        self.table_rows = 0
+        self.returned = 0
+        self.steps = 0
+        # Nanoseconds spent in each stage
+        self.times = {"query": 0, "hydration": 0, "formatting": 0}
+
+    def step(self) -> int:
+        # Progress handler, a non-zero return would abort the query
+        self.steps += self.STEP_GRANULARITY
+        return 0
+
+    def report(self) -> str:
+        times = ", ".join(
+            f"{stage} {elapsed / 1e6:.2f}ms" for stage, elapsed in self.times.items()
+        )
+        return "\n".join(
+            [
+                f"explain: {self.name}",
+                f"  SQL: {' '.join(self.sql.split())}",
+                f"  Values: {list(self.values)}",
+                "  Plan:",
+                *[f"    {line}" for line in self.plan],
+                f"  Rows: {self.returned} returned of {self.table_rows} in table, "
+                + f"~{self.steps} VM steps",
+                f"  Time: {times}",
+            ]
+        )
+
+
+class QueryExplainer:
+    # Profiles of the queries run while --explain is set
+    ENABLED: bool = False
+    PROFILES: list[QueryProfile] = []
+
+    def __init__(self) -> None:
+        raise RuntimeError("Class cannot be used outside of a static context.")
+
+    @classmethod
+    def enable(cls) -> None:
+        cls.ENABLED = True
+        cls.PROFILES = []
+
+    @classmethod
+    def add(cls, profile: QueryProfile) -> QueryProfile:
+        cls.PROFILES.append(profile)
+        return profile
+
+    @classmethod
+    def formatted(cls, elapsed: int, streamed: bool = False) -> None:
+        # Streamed output also pulled the rows, which is already accounted for
+        if not cls.ENABLED or len(cls.PROFILES) == 0:
+            return
+        profile = cls.PROFILES[-1]
+        if streamed:
+            elapsed -= profile.times["query"] + profile.times["hydration"]
+        profile.times["formatting"] += max(0, elapsed)
+
+    @classmethod
+    def report(cls) -> str:
+        if len(cls.PROFILES) == 0:
+            return "explain: no queries were run"
+        return "\n".join(profile.report() for profile in cls.PROFILES)
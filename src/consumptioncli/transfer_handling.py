@@ -0,0 +1,561 @@
+# General Imports
+import io
+import csv
+import sys
+import gzip
+import json
+import lzma
+import logging
+import sqlite3
+import tempfile
+from time import perf_counter
+from datetime import datetime
+from argparse import ArgumentError, Namespace
+from contextlib import contextmanager
+from collections.abc import Iterator, Mapping, Sequence
+from pathlib import Path
+from typing import Any, TextIO
+
+# Consumption Imports
+from consumptionbackend.Consumable import Consumable
+from consumptionbackend.Series import Series
+from consumptionbackend.Personnel import Personnel
+from consumptionbackend.Status import Status
+from .db_handling import (
+    get_connection,
+    normalise_tag,
+    split_tags,
+)
+from .output_handling import write_records
+
+# Fields of an import/export record. In CSV tags are comma separated and
+# personnel a JSON list, in NDJSON both are lists.
+CONSUMABLE_FIELDS = [
+    "name",
+    "type",
+    "status",
+    "parts",
+    "max_parts",
+    "completions",
+    "rating",
+    "start_date",
+    "end_date",
+]
+RECORD_FIELDS = ["id", *CONSUMABLE_FIELDS, "series", "tags", "personnel"]
+PERSONNEL_FIELDS = ["first_name", "last_name", "pseudonym", "role"]
+TRANSFER_FORMATS = ["ndjson", "csv"]
+# Compression used for files with these suffixes, with the options used when
+# writing. The default levels are several times slower than the export itself.
+COMPRESSION = {
+    ".gz": (gzip, {"compresslevel": 6}),
+    ".xz": (lzma, {"preset": 1}),
+    ".lzma": (lzma, {"preset": 1}),
+}
+
+# (first_name, last_name, pseudonym) identifying a Personnel
+PersonnelKey = tuple[str, str, str]
+# Rows fetched at a time when exporting
+FETCH_SIZE = 1000
+
+
+@contextmanager
+def open_path(path: str, mode: str) -> Iterator[TextIO]:
+    # "-" for stdin/stdout, compressed by suffix
+    if path == "-":
+        stream = sys.stdin if "r" in mode else sys.stdout
+        stream.flush()
+        file = io.TextIOWrapper(stream.buffer, encoding="utf-8", newline="")
+        try:
+            yield file
+        finally:
+            # Leave the standard stream open
+            file.flush()
+            file.detach()
+        return
+    compression = COMPRESSION.get(Path(path).suffix.lower())
+    try:
+        if compression is not None:
+            module, options = compression
+            if "r" in mode:
+                options = {}
+            file = module.open(
+                path, f"{mode}t", encoding="utf-8", newline="", **options
+            )
+        else:
+            file = open(path, mode, encoding="utf-8", newline="")
+    except OSError as e:
+        raise ArgumentError(None, f"Cannot open {path}: {e.strerror}.")
+    with file:
+        yield file
+
+
+def path_format(path: str) -> str:
+    # Format given by the suffix before any compression suffix, NDJSON otherwise
+    suffixes = [suffix.lower() for suffix in Path(path).suffixes]
+    if len(suffixes) > 0 and suffixes[-1] in COMPRESSION:
+        suffixes.pop()
+    return "csv" if len(suffixes) > 0 and suffixes[-1] == ".csv" else "ndjson"
+
+
+def parse_date(value: Any) -> float:
+    # POSIX timestamps or ISO 8601, local time unless an offset is given
+    if isinstance(value, (int, float)):
+        return float(value)
+    try:
+        return float(value)
+    except ValueError:
+        return datetime.fromisoformat(value).timestamp()
+
+
+def _value(record: Mapping[str, Any], key: str) -> Any:
+    # Empty CSV cells are missing values
+    value = record.get(key)
+    return None if value == "" else value
+
+
+def _personnel_key(record: Mapping[str, Any]) -> PersonnelKey:
+    return tuple(_value(record, key) for key in PERSONNEL_FIELDS[:3])
+
+
+class ImportRecord:
+    def __init__(self, raw: str | Mapping[str, Any]) -> None:
+        try:
+            record = json.loads(raw) if isinstance(raw, str) else raw
+        except ValueError as e:
+            raise ValueError(f"Invalid JSON, {e}.")
+        if not isinstance(record, dict):
+            raise ValueError("Record must be an object.")
+        unknown = [key for key in record if key not in RECORD_FIELDS]
+        if len(unknown) > 0:
+            raise ValueError(f"Unknown field(s): {', '.join(map(str, unknown))}.")
+        self.consumable = self._consumable(record)
+        self.series: str = _value(record, "series")
+        self.tags = self._tags(_value(record, "tags"))
+        self.personnel = self._personnel(_value(record, "personnel"))
+
+    @classmethod
+    def _consumable(cls, record: Mapping[str, Any]) -> Consumable:
+        values = {}
+        for key in ["name", "type"]:
+            value = _value(record, key)
+            if not isinstance(value, str) or len(value.strip()) == 0:
+                raise ValueError(f"Record must have a {key}.")
+            values[key] = value
+        status = _value(record, "status")
+        if status is not None:
+            try:
+                if isinstance(status, str) and not status.isdigit():
+                    values["status"] = Status[status.strip().upper()]
+                else:
+                    values["status"] = Status(int(status))
+            except (KeyError, ValueError):
+                raise ValueError(f"Invalid status: {status}.")
+        conversions = [
+            ("parts", int),
+            ("max_parts", int),
+            ("completions", int),
+            ("rating", float),
+            ("start_date", parse_date),
+            ("end_date", parse_date),
+        ]
+        for key, convert in conversions:
+            value = _value(record, key)
+            if value is None:
+                continue
+            try:
+                values[key] = convert(value)
+            except (TypeError, ValueError):
+                raise ValueError(f"Invalid {key}: {value}.")
+        # Same defaults and status side effects as Consumable.new
+        consumable = Consumable(**values)
+        if (
+            consumable.start_date is not None
+            and consumable.end_date is not None
+            and consumable.start_date > consumable.end_date
+        ):
+            raise ValueError("End date must be after start date.")
+        return consumable
+
+    @classmethod
+    def _tags(cls, tags: Any) -> Sequence[str]:
+        if tags is None:
+            return []
+        if isinstance(tags, str):
+            return split_tags(tags)
+        if not isinstance(tags, list) or not all(isinstance(t, str) for t in tags):
+            raise ValueError("Tags must be a list or comma separated.")
+        normalised = (normalise_tag(tag) for tag in tags)
+        return list(dict.fromkeys(tag for tag in normalised if len(tag) > 0))
+
+    @classmethod
+    def _personnel(cls, personnel: Any) -> Sequence[tuple[PersonnelKey, str]]:
+        if personnel is None:
+            return []
+        if isinstance(personnel, str):
+            try:
+                personnel = json.loads(personnel)
+            except ValueError:
+                raise ValueError("Personnel must be a JSON list.")
+        if not isinstance(personnel, list):
+            raise ValueError("Personnel must be a list.")
+        links = {}
+        for entry in personnel:
+            if not isinstance(entry, dict):
+                raise ValueError("Personnel must be objects.")
+            key = _personnel_key(entry)
+            role = _value(entry, "role")
+            if all(name is None for name in key):
+                raise ValueError("Personnel must have a name.")
+            if not role:
+                raise ValueError("Personnel must have a role.")
+            links[(key, role)] = None
+        return list(links)
+
+
+class ImportHandler:
+    # Never run by a server on behalf of a client, the file is the client's
+    LOCAL_ONLY: bool = True
+
+    def __init__(self) -> None:
+        raise RuntimeError("Class cannot be used outside of a static context.")
+
+    @classmethod
+    def handle(cls, args: Namespace) -> str:
+        path = getattr(args, "file")
+        input_format = getattr(args, "format") or path_format(path)
+        commit_every = getattr(args, "commit_every")
+        dry_run = getattr(args, "dry_run")
+        do_log = not getattr(args, "no_log")
+        if commit_every < 1:
+            raise ArgumentError(None, "Records per commit must be at least 1.")
+        with open_path(path, "r") as file:
+            importer = _Importer(dry_run, do_log)
+            start = perf_counter()
+            batch: list[ImportRecord] = []
+            for line_number, raw in cls._read(file, input_format):
+                try:
+                    batch.append(ImportRecord(raw))
+                except ValueError as e:
+                    importer.failed += 1
+                    print(f"Line {line_number}: {e}", file=sys.stderr)
+                    continue
+                if len(batch) >= commit_every:
+                    importer.write(batch)
+                    batch = []
+                    cls._progress(importer, start)
+            importer.write(batch)
+        elapsed = perf_counter() - start
+        rate = importer.imported / elapsed if elapsed > 0 else 0
+        created = (
+            f"{len(importer.new_series)} new Series, "
+            + f"{len(importer.new_personnel)} new Personnel"
+        )
+        if dry_run:
+            return (
+                f"Dry run: {importer.imported} record(s) valid, "
+                + f"{importer.failed} invalid, {created} would be created."
+            )
+        return (
+            f"{importer.imported} record(s) imported, {importer.failed} failed, "
+            + f"{created} in {elapsed:.2f}s ({rate:.0f} records/s)."
+        )
+
+    @classmethod
+    def _read(
+        cls, file: TextIO, input_format: str
+    ) -> Iterator[tuple[int, str | Mapping[str, Any]]]:
+        # Line numbers and records, NDJSON lines are parsed with the record
+        if input_format == "csv":
+            reader = csv.DictReader(file)
+            for record in reader:
+                yield reader.line_num, record
+            return
+        for line_number, line in enumerate(file, 1):
+            if len(line.strip()) > 0:
+                yield line_number, line
+
+    @classmethod
+    def _progress(cls, importer: "_Importer", start: float) -> None:
+        elapsed = perf_counter() - start
+        rate = importer.imported / elapsed if elapsed > 0 else 0
+        print(
+            f"{importer.imported} record(s) {'checked' if importer.dry_run else 'imported'}"
+            + f" ({rate:.0f} records/s)...",
+            file=sys.stderr,
+        )
+
+
+class _Importer:
+    # Writes batches of records in one transaction each, resolving Series and
+    # Personnel by name through maps loaded once
+    def __init__(self, dry_run: bool, do_log: bool = True) -> None:
+        self.dry_run = dry_run
+        self.do_log = do_log
+        self.imported = 0
+        self.failed = 0
+        self.new_series: list[Series] = []
+        self.new_personnel: list[Personnel] = []
+        cur = get_connection().cursor()
+        self.series_ids: dict[str, int] = {}
+        cur.execute(f"SELECT id, name FROM {Series.DB_NAME} ORDER BY id")
+        for id, name in cur.fetchall():
+            self.series_ids.setdefault(name, id)
+        self.personnel_ids: dict[PersonnelKey, int] = {}
+        cur.execute(
+            f"SELECT id, first_name, last_name, pseudonym FROM {Personnel.DB_NAME} "
+            + "ORDER BY id"
+        )
+        for id, *key in cur.fetchall():
+            self.personnel_ids.setdefault(tuple(key), id)
+
+    def write(self, batch: Sequence[ImportRecord]) -> None:
+        if len(batch) == 0:
+            return
+        if self.dry_run:
+            for record in batch:
+                self._series_id(None, record.series)
+                for key, _ in record.personnel:
+                    self._personnel_id(None, key)
+            self.imported += len(batch)
+            return
+        connection = get_connection()
+        if connection.in_transaction:
+            connection.commit()
+        # Held from the first read, so the ids handed out stay free
+        connection.execute("BEGIN IMMEDIATE")
+        try:
+            cur = connection.cursor()
+            cur.execute(f"SELECT COALESCE(MAX(id), 0) FROM {Consumable.DB_NAME}")
+            next_id = cur.fetchone()[0] + 1
+            new_series, new_personnel = len(self.new_series), len(self.new_personnel)
+            consumables, tags, personnel = [], [], []
+            for id, record in enumerate(batch, next_id):
+                consumable = record.consumable
+                consumable.id = id
+                consumable.series_id = self._series_id(cur, record.series)
+                consumables.append(consumable)
+                tags.extend((id, tag) for tag in record.tags)
+                personnel.extend(
+                    (id, self._personnel_id(cur, key), role)
+                    for key, role in record.personnel
+                )
+            cur.executemany(
+                f"""INSERT INTO {Consumable.DB_NAME}
+                (id, series_id, name, type, status, parts, max_parts, completions, rating, start_date, end_date)
+                VALUES (?,?,?,?,?,?,?,?,?,?,?)""",
+                map(Consumable._consumable_to_seq, consumables),
+            )
+            cur.executemany(
+                f"INSERT INTO {Consumable.DB_TAG_MAPPING_NAME} (consumable_id, tag) "
+                + "VALUES (?,?)",
+                tags,
+            )
+            cur.executemany(
+                f"INSERT OR IGNORE INTO {Consumable.DB_PERSONNEL_MAPPING_NAME} "
+                + "(consumable_id, personnel_id, role) VALUES (?,?,?)",
+                personnel,
+            )
+            connection.commit()
+        except BaseException:
+            connection.rollback()
+            # Names created in the batch are gone again
+            for series in self.new_series[new_series:]:
+                del self.series_ids[series.name]
+            for pers in self.new_personnel[new_personnel:]:
+                del self.personnel_ids[_personnel_key(vars(pers))]
+            del self.new_series[new_series:]
+            del self.new_personnel[new_personnel:]
+            raise
+        self.imported += len(batch)
+        if self.do_log:
+            self._log(
+                self.new_series[new_series:],
+                self.new_personnel[new_personnel:],
+                consumables,
+                tags,
+                personnel,
+            )
+
+    def _series_id(self, cur, name: str) -> int:
+        if name is None:
+            return -1
+        # Ids are None in a dry run
+        if name not in self.series_ids:
+            series = Series(name=name)
+            if cur is not None:
+                cur.execute(f"INSERT INTO {Series.DB_NAME} (name) VALUES (?)", [name])
+                series.id = cur.lastrowid
+            self.new_series.append(series)
+            self.series_ids[name] = series.id
+        return self.series_ids[name]
+
+    def _personnel_id(self, cur, key: PersonnelKey) -> int:
+        if key not in self.personnel_ids:
+            first_name, last_name, pseudonym = key
+            personnel = Personnel(
+                first_name=first_name, last_name=last_name, pseudonym=pseudonym
+            )
+            if cur is not None:
+                cur.execute(
+                    f"INSERT INTO {Personnel.DB_NAME} "
+                    + "(first_name, last_name, pseudonym) VALUES (?,?,?)",
+                    key,
+                )
+                personnel.id = cur.lastrowid
+            self.new_personnel.append(personnel)
+            self.personnel_ids[key] = personnel.id
+        return self.personnel_ids[key]
+
+    @classmethod
+    def _log(
+        cls,
+        series: Sequence[Series],
+        personnel: Sequence[Personnel],
+        consumables: Sequence[Consumable],
+        tags: Sequence[tuple[int, str]],
+        links: Sequence[tuple[int, int, str]],
+    ) -> None:
+        # Same entries as creating everything one command at a time
+        series_logger = logging.getLogger(Series.__module__)
+        for instance in series:
+            series_logger.info(f"NEW_SERIES#{instance._csv_str()}")
+        personnel_logger = logging.getLogger(Personnel.__module__)
+        for instance in personnel:
+            personnel_logger.info(f"NEW_PERSONNEL#{instance._csv_str()}")
+        logger = logging.getLogger(Consumable.__module__)
+        for consumable in consumables:
+            logger.info(f"NEW_CONSUMABLE#{consumable._csv_str()}")
+        for id, tag in tags:
+            logger.info(f"ADD_TAG#{id},'{tag}'")
+        for id, pers_id, role in links:
+            logger.info(f"ADD_PERSONNEL#{id},{pers_id},'{role}'")
+
+
+class ExportHandler:
+    # Never run by a server on behalf of a client, the file is the client's
+    LOCAL_ONLY: bool = True
+
+    def __init__(self) -> None:
+        raise RuntimeError("Class cannot be used outside of a static context.")
+
+    @classmethod
+    def handle(cls, args: Namespace) -> str:
+        path = getattr(args, "file")
+        output_format = getattr(args, "format") or path_format(path)
+        start = perf_counter()
+        with open_path(path, "w") as file, cls._snapshot(
+            getattr(args, "wal", False)
+        ) as connection:
+            if output_format == "csv":
+                rows = cls._rows(connection)
+                exported = write_records("csv", RECORD_FIELDS, rows, file)
+            else:
+                exported = cls._write_lines(connection, file)
+        summary = f"{exported} Consumable(s) exported in {perf_counter() - start:.2f}s."
+        if path == "-":
+            # Keep the export itself parseable
+            print(summary, file=sys.stderr)
+            return ""
+        return summary
+
+    @classmethod
+    @contextmanager
+    def _snapshot(cls, wal: bool = False) -> Iterator[sqlite3.Connection]:
+        # Connection to read the whole export from, consistent throughout
+        # without keeping writers of other processes waiting for it
+        connection = get_connection()
+        if connection.in_transaction:
+            connection.commit()
+        if wal:
+            # Persists for the database, every later connection uses it too
+            connection.execute("PRAGMA journal_mode = WAL")
+        (journal_mode,) = connection.execute("PRAGMA journal_mode").fetchone()
+        if journal_mode == "wal":
+            # Readers and writers do not block each other, one read
+            # transaction is a snapshot, taken by its first read
+            connection.execute("BEGIN")
+            connection.execute("SELECT count(*) FROM sqlite_master").fetchone()
+            try:
+                yield connection
+            finally:
+                connection.rollback()
+            return
+        # Otherwise a copy is read, writers only wait while it is made
+        with tempfile.TemporaryDirectory() as directory:
+            snapshot_path = Path(directory) / "snapshot.db"
+            connection.execute("VACUUM INTO ?", [str(snapshot_path)])
+            snapshot = sqlite3.connect(snapshot_path)
+            try:
+                yield snapshot
+            finally:
+                snapshot.close()
+
+    @classmethod
+    def _columns(cls, output_format: str) -> Sequence[str]:
+        # Values of RECORD_FIELDS, converted by SQLite rather than per row in Python
+        status = " ".join(
+            f"WHEN {status.value} THEN '{status.name}'" for status in Status
+        )
+        columns = {field: f"c.{field}" for field in ["id", *CONSUMABLE_FIELDS]}
+        columns["status"] = f"CASE c.status {status} END"
+        for field in ["start_date", "end_date"]:
+            columns[
+                field
+            ] = f"strftime('%Y-%m-%dT%H:%M:%f+00:00', c.{field}, 'unixepoch')"
+        columns["series"] = "CASE WHEN c.series_id = -1 THEN NULL ELSE s.name END"
+        tags = f"""SELECT tag FROM {Consumable.DB_TAG_MAPPING_NAME}
+            WHERE consumable_id = c.id ORDER BY tag"""
+        personnel_object = ", ".join(
+            f"'{field}', p.{field}" for field in PERSONNEL_FIELDS[:3]
+        )
+        personnel = f"""SELECT json_object({personnel_object}, 'role', cp.role) AS link
+            FROM {Consumable.DB_PERSONNEL_MAPPING_NAME} cp
+            JOIN {Personnel.DB_NAME} p ON p.id = cp.personnel_id
+            WHERE cp.consumable_id = c.id ORDER BY cp.role, p.id"""
+        if output_format == "csv":
+            columns["tags"] = f"(SELECT group_concat(tag, ',') FROM ({tags}))"
+            columns[
+                "personnel"
+            ] = f"(SELECT '[' || group_concat(link, ', ') || ']' FROM ({personnel}))"
+        else:
+            columns["tags"] = f"(SELECT json_group_array(tag) FROM ({tags}))"
+            columns[
+                "personnel"
+            ] = f"(SELECT json_group_array(json(link)) FROM ({personnel}))"
+        return [columns[field] for field in RECORD_FIELDS]
+
+    @classmethod
+    def _cursor(cls, connection: sqlite3.Connection, columns: str) -> sqlite3.Cursor:
+        cur = connection.cursor()
+        cur.execute(
+            f"""SELECT {columns}
+                FROM {Consumable.DB_NAME} c
+                LEFT JOIN {Series.DB_NAME} s ON s.id = c.series_id
+                ORDER BY c.id"""
+        )
+        return cur
+
+    @classmethod
+    def _rows(cls, connection: sqlite3.Connection) -> Iterator[Sequence[Any]]:
+        cur = cls._cursor(connection, ", ".join(cls._columns("csv")))
+        while True:
+            rows = cur.fetchmany(FETCH_SIZE)
+            if len(rows) == 0:
+                return
+            yield from rows
+
+    @classmethod
+    def _write_lines(cls, connection: sqlite3.Connection, file: TextIO) -> int:
+        # NDJSON lines are made whole by SQLite
+        record = ", ".join(
+            f"'{field}', {column}"
+            for field, column in zip(RECORD_FIELDS, cls._columns("ndjson"))
+        )
+        cur = cls._cursor(connection, f"json_object({record})")
+        written = 0
+        while True:
+            rows = cur.fetchmany(FETCH_SIZE)
+            if len(rows) == 0:
+                return written
+            file.write("".join(row[0] + "\n" for row in rows))
+            written += len(rows)
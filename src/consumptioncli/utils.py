@@ -1,5 +1,9 @@
+import sys
+import importlib.util
+from contextlib import contextmanager
+from types import ModuleType
 from typing import TypeVar, Callable
-from collections.abc import Sequence
+from collections.abc import Sequence, Iterator
 
 T = TypeVar("T")
 
@@ -15,6 +19,36 @@ class _SentinelClass:
 UNCHANGED_SENTINEL = _SentinelClass("Leave Unchanged")
 NONE_SENTINEL = _SentinelClass("None")
 
+# Where request_input and confirm_action read from, see redirect_input
+_input: Callable[[str], str] = input
+
+
+@contextmanager
+def redirect_input(function: Callable[[str], str]) -> Iterator[None]:
+    global _input
+    previous = _input
+    _input = function
+    try:
+        yield
+    finally:
+        _input = previous
+
+
+def lazy_import(name: str) -> ModuleType:
+    # Module is only executed on first attribute access
+    if name in sys.modules:
+        return sys.modules[name]
+    spec = importlib.util.find_spec(name)
+    loader = importlib.util.LazyLoader(spec.loader)
+    spec.loader = loader
+    module = importlib.util.module_from_spec(spec)
+    sys.modules[name] = module
+    loader.exec_module(module)
+    parent, _, child = name.rpartition(".")
+    if parent:
+        setattr(sys.modules[parent], child, module)
+    return module
+
 
 def sort_by(instances: Sequence[T], sort_key: str, reverse: bool = False) -> list[T]:
     # Thanks to Andrew Clark for solution to sorting list with NoneTypes https://stackoverflow.com/a/18411610
@@ -32,12 +66,12 @@ def request_input(
         request_string = f"Provide a {name} (Default : {default}): "
     else:
         request_string = f"Provide a {name}: "
-    value = input(request_string).strip()
+    value = _input(request_string).strip()
     if default is not NONE_SENTINEL and not len(value):
         return default
     if validator is not None:
         while not validator(value):
-            value = input(request_string).strip()
+            value = _input(request_string).strip()
             if default:
                 value = value if len(value) else default
     return value
@@ -45,10 +79,10 @@ def request_input(
 
 def confirm_action(action: str) -> bool:
     prompt = f"Confirm {action} [Y/n]: "
-    response = input(prompt).strip().lower()
+    response = _input(prompt).strip().lower()
     while response not in ["y", "n"]:
         print("Invalid input.")
-        response = input(prompt).strip().lower()
+        response = _input(prompt).strip().lower()
     return response == "y"
 
 
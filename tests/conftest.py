@@ -0,0 +1,27 @@
+import sqlite3
+
+import pytest
+
+from consumptionbackend.Database import DatabaseHandler, DatabaseInstantiator
+
+
+@pytest.fixture
+def db(tmp_path, monkeypatch):
+    # Fresh database in place of the one named by the user's config
+    connection = sqlite3.connect(tmp_path / "consumption.db")
+    monkeypatch.setattr(DatabaseHandler, "DB_CONNECTION", connection)
+    DatabaseInstantiator.run()
+    yield connection
+    connection.close()
+
+
+@pytest.fixture
+def cons(db):
+    # Runs a command as main does, returning its output
+    from consumptioncli.parsers import MainParser
+
+    def run(*argv):
+        args = MainParser.get(argv).parse_args(argv)
+        return args.handler.handle(args)
+
+    return run
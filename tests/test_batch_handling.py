@@ -0,0 +1,48 @@
+import io
+
+import pytest
+from argparse import Namespace
+
+from consumptionbackend.Consumable import Consumable
+from consumptioncli.batch_handling import BatchHandler
+
+
+def run_batch(lines):
+    file = io.StringIO("\n".join(lines) + "\n")
+    return BatchHandler.handle(Namespace(file=file, commit_every=0, quiet=True))
+
+
+def test_list_formats_without_static(db, capsys):
+    Consumable.new(name="A", type="Novel")
+    run_batch(["c l --format csv", "c l"])
+    out, err = capsys.readouterr()
+    assert out.splitlines()[1].split(",")[3] == "A"
+    assert "Line 1" not in err
+    assert "Line 2: Interactive lists require --static in a batch." in err
+
+
+def triggers(db):
+    cur = db.execute("SELECT name, sql FROM sqlite_master WHERE type = 'trigger'")
+    return dict(cur.fetchall())
+
+
+@pytest.mark.parametrize("commit_every", [0, 1])
+def test_rejected_line_only_fails_itself(db, capsys, caplog, commit_every):
+    before = triggers(db)
+    file = io.StringIO(
+        "c n --name A --type novel --status IN_PROGRESS\n"
+        + "c n --name B --type novel --sd 2021/01/01 --ed 2020/01/01\n"
+        + "c n --name C --type novel\n"
+    )
+    summary = BatchHandler.handle(
+        Namespace(file=file, commit_every=commit_every, quiet=True)
+    )
+    _, err = capsys.readouterr()
+    assert summary.startswith("2 line(s) succeeded, 1 failed")
+    assert "Line 2: end date must be after start date" in err
+    assert [c.name for c in Consumable.find()] == ["A", "C"]
+    # Nothing is run again, which would log the lines twice
+    logged = [r.message for r in caplog.records if "NEW_CONSUMABLE" in r.message]
+    assert len(logged) == 2
+    # The swapped triggers are never committed
+    assert triggers(db) == before
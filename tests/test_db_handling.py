@@ -0,0 +1,144 @@
+import sqlite3
+
+import pytest
+
+from consumptionbackend.Consumable import Consumable
+from consumptionbackend.Status import Status
+from consumptioncli import db_handling
+from consumptionbackend.Personnel import Personnel
+from consumptionbackend.Series import Series
+from consumptioncli.db_handling import (
+    MAX_VARIABLES,
+    bulk_update,
+    bulk_delete,
+    bulk_tag,
+    bulk_untag,
+    bulk_retag,
+    bulk_add_personnel,
+    bulk_remove_personnel,
+)
+
+
+def test_tags_beyond_variable_limit(db):
+    consumables = [Consumable.new(name=f"{i}", type="Novel") for i in range(3)]
+    tags = [f"tag{i}" for i in range(MAX_VARIABLES + 1)]
+    assert bulk_tag(consumables[:1], tags[:10]) == 10
+    assert bulk_tag(consumables, tags) == 3 * len(tags) - 10
+    assert bulk_untag(consumables, tags) == 3 * len(tags)
+
+
+def tags_of(db, consumable):
+    cur = db.execute(
+        f"SELECT tag FROM {Consumable.DB_TAG_MAPPING_NAME} "
+        + "WHERE consumable_id = ? ORDER BY tag",
+        [consumable.id],
+    )
+    return [row[0] for row in cur.fetchall()]
+
+
+def test_tag_batch_with_duplicates(db):
+    a, b = [Consumable.new(name=name, type="Novel") for name in ["A", "B"]]
+    assert bulk_tag([a], ["x"]) == 1
+    # Same tag in other spellings and the same consumable twice
+    assert bulk_tag([a, b, a], ["x", "X ", " y", "y"]) == 3
+    assert tags_of(db, a) == ["x", "y"]
+    assert tags_of(db, b) == ["x", "y"]
+    assert bulk_untag([a, a], ["Y", "y", "z"]) == 1
+    assert tags_of(db, a) == ["x"]
+
+
+def test_personnel_beyond_variable_limit(db):
+    consumables = [Consumable.new(name=f"{i}", type="Novel") for i in range(2)]
+    personnel = [
+        Personnel.new(first_name=f"{i}", role="Author")
+        for i in range(MAX_VARIABLES + 1)
+    ]
+    assert bulk_add_personnel(consumables[:1], personnel[:5]) == (5, 0)
+    assert bulk_add_personnel(consumables, personnel) == (2 * len(personnel) - 5, 5)
+    assert bulk_remove_personnel(consumables, personnel) == 2 * len(personnel)
+
+
+def test_retag_beyond_variable_limit(db):
+    consumables = [Consumable.new(name=f"{i}", type="Novel") for i in range(2)]
+    sources = [f"tag{i}" for i in range(MAX_VARIABLES + 1)]
+    bulk_tag(consumables, sources)
+    # Each consumable gains the target once, its other links are dropped
+    assert bulk_retag(sources, "merged") == (2, 2 * len(sources) - 2)
+    cur = db.execute(
+        f"SELECT consumable_id, tag FROM {Consumable.DB_TAG_MAPPING_NAME} ORDER BY 1"
+    )
+    assert cur.fetchall() == [
+        (consumables[0].id, "merged"),
+        (consumables[1].id, "merged"),
+    ]
+
+
+def test_update_applies_triggers(db, monkeypatch):
+    # Chunks of two ids beside the one set value
+    monkeypatch.setattr(db_handling, "MAX_VARIABLES", 3)
+    consumables = [Consumable.new(name=f"{i}", type="Novel") for i in range(5)]
+    updated = bulk_update(Consumable, consumables[1:], {"status": Status.COMPLETED})
+    assert [c.id for c in updated] == [c.id for c in consumables[1:]]
+    # Reselected, with the values the completion triggers set
+    for consumable in updated:
+        assert consumable.status == Status.COMPLETED
+        assert (consumable.parts, consumable.completions) == (1, 1)
+        assert consumable.end_date is not None
+    assert Consumable.find(id=consumables[0].id)[0].status == Status.PLANNING
+
+
+def test_update_rejected_by_trigger(db):
+    consumables = [
+        Consumable.new(name=f"{i}", type="Novel", start_date=100) for i in range(2)
+    ]
+    with pytest.raises(sqlite3.IntegrityError):
+        bulk_update(Consumable, consumables, {"end_date": 50})
+    assert [c.end_date for c in Consumable.find()] == [None, None]
+
+
+def links(db, table, column, id):
+    cur = db.execute(f"SELECT count(*) FROM {table} WHERE {column} = ?", [id])
+    return cur.fetchone()[0]
+
+
+def test_delete_removes_links(db):
+    kept, deleted = [Consumable.new(name=name, type="Novel") for name in "AB"]
+    author = Personnel.new(first_name="P", role="Author")
+    bulk_tag([kept, deleted], ["x"])
+    bulk_add_personnel([kept, deleted], [author])
+    # Already gone rows and repeats are left out of what is returned
+    gone = Consumable.new(name="C", type="Novel")
+    bulk_delete(Consumable, [gone])
+    result = bulk_delete(Consumable, [deleted, deleted, gone])
+    assert [c.id for c in result] == [deleted.id]
+    assert [c.id for c in Consumable.find()] == [kept.id]
+    for table in [Consumable.DB_TAG_MAPPING_NAME, Consumable.DB_PERSONNEL_MAPPING_NAME]:
+        assert links(db, table, "consumable_id", deleted.id) == 0
+        assert links(db, table, "consumable_id", kept.id) == 1
+    bulk_delete(Personnel, [author])
+    assert (
+        links(db, Consumable.DB_PERSONNEL_MAPPING_NAME, "personnel_id", author.id) == 0
+    )
+
+
+def test_delete_series_resets_consumables(db):
+    series = Series.new(name="S")
+    other = Series.new(name="T")
+    a = Consumable.new(name="A", type="Novel", series_id=series.id)
+    b = Consumable.new(name="B", type="Novel", series_id=other.id)
+    assert [s.id for s in bulk_delete(Series, [series])] == [series.id]
+    assert Consumable.find(id=a.id)[0].series_id == -1
+    assert Consumable.find(id=b.id)[0].series_id == other.id
+
+
+def test_add_personnel_reports_present(db):
+    a, b = [Consumable.new(name=name, type="Novel") for name in "AB"]
+    author = Personnel.new(first_name="P", role="Author")
+    editor = Personnel.find(id=author.id)[0]
+    editor.role = "Editor"
+    assert bulk_add_personnel([a], [author]) == (1, 0)
+    # Present counted per link, the same personnel in another role is new
+    assert bulk_add_personnel([a, b], [author, editor]) == (3, 1)
+    assert bulk_add_personnel([a, b], [author, editor]) == (0, 4)
+    assert bulk_remove_personnel([a], [editor]) == 1
+    assert bulk_add_personnel([a], [author, editor]) == (1, 1)
@@ -0,0 +1,49 @@
+import pytest
+
+from consumptionbackend.Consumable import Consumable
+from consumptioncli.list_actions import (
+    ListIncrementCurrentRating,
+    ListDecrementCurrentRating,
+)
+from consumptioncli.list_handling import ListState
+from consumptioncli.query_handling import PagedInstances, Query
+
+
+@pytest.fixture
+def consumables(db):
+    return [
+        Consumable.new(name=name, type="Novel", rating=rating)
+        for name, rating in [("A", 3.0), ("B", 5.0), ("C", 7.0)]
+    ]
+
+
+@pytest.fixture(params=["list", "paged"])
+def state(request, consumables):
+    if request.param == "paged":
+        return ListState(PagedInstances(Query(Consumable).order_by("name")))
+    return ListState(list(consumables))
+
+
+def names(state):
+    return [instance.name for instance in state.instances]
+
+
+def test_resort_after_rating_edit(state):
+    state.sort("rating", reverse=True)
+    assert names(state) == ["C", "B", "A"]
+    state.current = 2
+    for _ in range(30):
+        state, _ = ListIncrementCurrentRating(0, ["+"]).run(state)
+    assert state.instances[state.current].rating == pytest.approx(6.0)
+    state.sort("rating", reverse=True)
+    assert names(state) == ["C", "A", "B"]
+    assert state.instances[state.current].name == "A"
+    assert state.instances[1].rating == pytest.approx(6.0)
+
+
+def test_unfiltered_after_rating_edit(state):
+    state.filter("B")
+    state, _ = ListDecrementCurrentRating(0, ["-"]).run(state)
+    state.filter(None)
+    assert state.instances[1].name == "B"
+    assert state.instances[1].rating == pytest.approx(4.9)
@@ -0,0 +1,45 @@
+import argparse
+
+import pytest
+
+from consumptioncli.parsers import MainParser
+
+
+@pytest.fixture
+def parser_count(monkeypatch):
+    count = [0]
+    init = argparse.ArgumentParser.__init__
+
+    def counting_init(self, *args, **kwargs):
+        count[0] += 1
+        init(self, *args, **kwargs)
+
+    monkeypatch.setattr(argparse.ArgumentParser, "__init__", counting_init)
+    return count
+
+
+@pytest.mark.parametrize(
+    "argv, expected",
+    [
+        # Main, every child name, and the action names of the selected child
+        (["c", "n"], 1 + 10 + 9),
+        (["s", "l"], 1 + 10 + 4),
+        (["--help"], 1 + 10),
+    ],
+)
+def test_only_selected_branches_built(parser_count, argv, expected):
+    MainParser.get(argv)
+    assert parser_count[0] == expected
+
+
+def test_full_build_without_argv(parser_count):
+    MainParser.get(["c", "n"])
+    selected = parser_count[0]
+    parser_count[0] = 0
+    MainParser.get()
+    assert parser_count[0] > selected
+
+
+def test_selected_branch_parses(parser_count):
+    args = MainParser.get(["c", "n"]).parse_args(["c", "n", "--name", "Test"])
+    assert args.mode == "new"
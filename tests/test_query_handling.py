@@ -0,0 +1,132 @@
+import pytest
+
+from consumptionbackend.Consumable import Consumable
+from consumptioncli import query_handling
+from consumptioncli.query_handling import PagedInstances, Query
+
+
+@pytest.fixture
+def consumables(db, monkeypatch):
+    monkeypatch.setattr(query_handling, "PAGE_SIZE", 4)
+    return [Consumable.new(name=f"{i:02}", type="Novel") for i in range(10)]
+
+
+def delete(db, consumables):
+    db.executemany(
+        f"DELETE FROM {Consumable.DB_NAME} WHERE id = ?",
+        [[consumable.id] for consumable in consumables],
+    )
+    db.commit()
+
+
+def test_query_pages_shortened_by_deletes(db, consumables):
+    instances = PagedInstances(Query(Consumable).order_by("name"))
+    assert instances[0].name == "00"
+    delete(db, consumables[5:7])
+    instances.load(0, 10)
+    assert len(instances) == 8
+    assert [instance.name for instance in instances] == [
+        "00",
+        "01",
+        "02",
+        "03",
+        "04",
+        "07",
+        "08",
+        "09",
+    ]
+
+
+def test_id_pages_shortened_by_deletes(db, consumables):
+    ids = [consumable.id for consumable in reversed(consumables)]
+    instances = PagedInstances(Query(Consumable), ids)
+    assert instances[0].name == "09"
+    delete(db, [consumables[0], consumables[4]])
+    instances.load(0, 10)
+    assert len(instances) == 8
+    assert [instance.name for instance in instances][-3:] == ["03", "02", "01"]
+
+
+@pytest.fixture
+def rated(db):
+    # Ties, NULLs and a name the key separator appears in
+    ratings = [("b", 5), ("a:1", None), ("c", 2), ("a:2", 5), ("d", None), ("e", 8)]
+    return [Consumable.new(name=name, type="Novel", rating=r) for name, r in ratings]
+
+
+def names(instances):
+    return [instance.name for instance in instances]
+
+
+def walk(key, reverse, size=2):
+    # Every row, fetched a page at a time continuing after the last key
+    listed, start = [], None
+    while True:
+        query = Query(Consumable).order_by(key, reverse).page(size)
+        if start is not None:
+            query.after(start)
+        page = query.all()
+        listed.extend(page)
+        if len(page) < size:
+            return names(listed)
+        start = query.key_of(page[-1])
+
+
+def test_key_of_round_trips(rated):
+    query = Query(Consumable).order_by("name")
+    assert query.key_of(rated[1]) == f'"a:1":{rated[1].id}'
+    assert Query(Consumable).after(query.key_of(rated[1])).start == ("a:1", rated[1].id)
+    query = Query(Consumable).order_by("rating")
+    assert query.key_of(rated[1]) == f"null:{rated[1].id}"
+    assert query.after(f"5.5:{rated[0].id}").start == (5.5, rated[0].id)
+
+
+@pytest.mark.parametrize(
+    "key, reverse, expected",
+    [
+        ("name", False, ["a:1", "a:2", "b", "c", "d", "e"]),
+        ("name", True, ["e", "d", "c", "b", "a:2", "a:1"]),
+        # None first ascending and last descending, ties in id order
+        ("rating", False, ["a:1", "d", "c", "b", "a:2", "e"]),
+        ("rating", True, ["e", "b", "a:2", "c", "a:1", "d"]),
+    ],
+)
+@pytest.mark.parametrize("size", [1, 2, 4])
+def test_keyset_continues_listing(rated, key, reverse, expected, size):
+    assert names(Query(Consumable).order_by(key, reverse).all()) == expected
+    assert walk(key, reverse, size) == expected
+
+
+def test_keyset_continues_after_null(rated):
+    # Continuing from a NULL row, ascending reaches the values after the NULLs
+    query = Query(Consumable).order_by("rating").after(f"null:{rated[1].id}")
+    assert names(query.all()) == ["d", "c", "b", "a:2", "e"]
+    query = Query(Consumable).order_by("rating", True).after(f"null:{rated[1].id}")
+    assert names(query.all()) == ["d"]
+
+
+def test_keyset_without_order(rated):
+    query = Query(Consumable).after(f"null:{rated[3].id}")
+    assert names(query.all()) == ["d", "e"]
+
+
+def test_range_bounds(db):
+    day = 24 * 60 * 60
+    for i in range(4):
+        Consumable.new(
+            name=f"{i}",
+            type="Novel",
+            rating=i * 2.5,
+            start_date=i * day,
+            end_date=(i + 1) * day,
+        )
+
+    def matching(**ranges):
+        return names(Query(Consumable, ranges).all())
+
+    # After and min bounds are inclusive, before bounds exclusive
+    assert matching(started_after=day) == ["1", "2", "3"]
+    assert matching(started_before=day) == ["0"]
+    assert matching(ended_after=2 * day, ended_before=4 * day) == ["1", "2"]
+    assert matching(rating_min=2.5, rating_max=5) == ["1", "2"]
+    assert matching(started_after=3 * day, ended_before=4 * day) == []
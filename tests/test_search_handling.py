@@ -0,0 +1,45 @@
+import sqlite3
+from argparse import Namespace
+
+from consumptionbackend.Consumable import Consumable
+from consumptioncli.query_handling import Query
+from consumptioncli.search_handling import (
+    COLUMN_INDEXES,
+    ColumnIndex,
+    IndexHandler,
+    has_search_index,
+    words_table,
+)
+
+
+def indexes(db):
+    cur = db.execute("SELECT name FROM sqlite_master WHERE type = 'index'")
+    return {row[0] for row in cur.fetchall()}
+
+
+def test_listing_leaves_schema(db):
+    Consumable.new(name="A", type="Novel", rating=3.0)
+    before = indexes(db)
+    list(Query(Consumable, {"rating_min": 1}).order_by("rating"))
+    assert indexes(db) == before
+
+
+def test_index_command(db):
+    expected = {ColumnIndex.name(table, column) for table, column in COLUMN_INDEXES}
+    IndexHandler.handle(Namespace(drop=False))
+    assert expected <= indexes(db)
+    IndexHandler.handle(Namespace(drop=True))
+    assert expected.isdisjoint(indexes(db))
+
+
+def test_index_built_by_another_connection(db, tmp_path):
+    assert not has_search_index(Consumable)
+    # As by 'cons index' in another process while this one keeps its connection
+    other = sqlite3.connect(tmp_path / "consumption.db")
+    other.execute(f"CREATE VIRTUAL TABLE {words_table(Consumable)} USING fts5(name)")
+    other.commit()
+    assert has_search_index(Consumable)
+    other.execute(f"DROP TABLE {words_table(Consumable)}")
+    other.commit()
+    assert not has_search_index(Consumable)
+    other.close()
@@ -0,0 +1,32 @@
+import os
+import time
+
+from consumptioncli.server_handling import _client_environment
+
+
+def test_client_environment(tmp_path, monkeypatch):
+    monkeypatch.setenv("TZ", "UTC")
+    time.tzset()
+    cwd = os.getcwd()
+    request = {"argv": [], "cwd": str(tmp_path), "tz": "Asia/Tokyo"}
+    with _client_environment(request) as entered:
+        assert entered
+        assert os.getcwd() == str(tmp_path)
+        assert time.localtime(0).tm_hour == 9
+    assert os.getcwd() == cwd
+    assert os.environ["TZ"] == "UTC"
+    assert time.localtime(0).tm_hour == 0
+
+
+def test_client_environment_unset_time_zone(monkeypatch):
+    monkeypatch.setenv("TZ", "Asia/Tokyo")
+    with _client_environment({"cwd": os.getcwd(), "tz": None}):
+        assert "TZ" not in os.environ
+    assert os.environ["TZ"] == "Asia/Tokyo"
+
+
+def test_client_environment_missing_directory(tmp_path):
+    cwd = os.getcwd()
+    with _client_environment({"cwd": str(tmp_path / "missing")}) as entered:
+        assert not entered
+    assert os.getcwd() == cwd
@@ -0,0 +1,64 @@
+import pytest
+
+from consumptionbackend.Consumable import Consumable
+from consumptioncli.query_handling import Query
+from consumptioncli.stats_handling import ConsumableStats
+
+
+def new(type, rating, tags=()):
+    consumable = Consumable.new(name=type, type=type, rating=rating)
+    for tag in tags:
+        consumable.add_tag(tag)
+    return consumable
+
+
+def medians(by=None):
+    rows = ConsumableStats.rows(Query(Consumable), by)
+    return {row[0]: (row[1], row[-2], row[-1]) for row in rows}
+
+
+@pytest.mark.parametrize(
+    "ratings, median",
+    [
+        ([7], 7),
+        ([1, 9, 5], 5),
+        ([4, 1, 10, 2], 3),
+        ([None, 8, None, 2, 6], 6),
+        ([None, 8, None, 2], 5),
+    ],
+)
+def test_median(db, ratings, median):
+    for rating in ratings:
+        new("Novel", rating)
+    ((count, _, result),) = medians().values()
+    assert (count, result) == (len(ratings), median)
+
+
+def test_median_without_ratings(db):
+    new("Novel", None)
+    assert medians() == {"All": (1, None, None)}
+
+
+def test_median_per_group(db):
+    for rating in [1, 2, 10]:
+        new("Novel", rating)
+    for rating in [3, 4, None]:
+        new("Film", rating)
+    new("Game", None)
+    assert medians("type") == {
+        "FILM": (3, 3.5, 3.5),
+        "GAME": (1, None, None),
+        "NOVEL": (3, 4.33, 2),
+    }
+
+
+def test_median_per_tag(db):
+    # A consumable counts once towards each of its tags, untagged under None
+    new("Novel", 2, ["a", "b"])
+    new("Novel", 6, ["a"])
+    new("Novel", 9)
+    assert medians("tag") == {
+        None: (1, 9, 9),
+        "a": (2, 4, 4),
+        "b": (1, 2, 2),
+    }
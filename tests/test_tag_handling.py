@@ -0,0 +1,68 @@
+from argparse import ArgumentError
+
+import pytest
+
+from consumptionbackend.Consumable import Consumable
+from consumptioncli.tag_handling import tag_counts
+
+
+@pytest.fixture
+def consumables(db):
+    consumables = [Consumable.new(name=name, type="Novel") for name in "ABC"]
+    for consumable, tags in zip(consumables, [["x", "y"], ["x"], ["z"]]):
+        for tag in tags:
+            consumable.add_tag(tag)
+    return consumables
+
+
+def links(db):
+    cur = db.execute(
+        f"SELECT consumable_id, tag FROM {Consumable.DB_TAG_MAPPING_NAME} "
+        + "ORDER BY consumable_id, tag"
+    )
+    return cur.fetchall()
+
+
+def test_rename(db, cons, consumables):
+    a, b, c = consumables
+    assert cons("tag", "rename", "X", "Sci-Fi") == (
+        "Renamed 'x' to 'sci-fi' on 2 Consumable(s)."
+    )
+    assert links(db) == [
+        (a.id, "sci-fi"),
+        (a.id, "y"),
+        (b.id, "sci-fi"),
+        (c.id, "z"),
+    ]
+    assert cons("tag", "rename", "x", "w") == "No Consumables tagged 'x'."
+
+
+def test_rename_onto_tag_in_use(db, cons, consumables):
+    with pytest.raises(ArgumentError, match="combine them with cons tag merge"):
+        cons("tag", "rename", "x", "y")
+    assert len(links(db)) == 4
+
+
+def test_merge_drops_links_the_target_has(db, cons, consumables, caplog):
+    a, b, c = consumables
+    caplog.set_level("INFO")
+    # A already has y, so its x link is left by the update and deleted
+    assert cons("tag", "merge", "x", "z", "y", "--into", "y") == (
+        "Merged 2 tag(s) into 'y', 2 Consumable(s) newly tagged."
+    )
+    assert links(db) == [(a.id, "y"), (b.id, "y"), (c.id, "y")]
+    assert tag_counts() == [("y", 3)]
+    assert sorted(record.getMessage() for record in caplog.records) == [
+        f"ADD_TAG#{b.id},'y'",
+        f"ADD_TAG#{c.id},'y'",
+        f"REMOVE_TAG#{a.id},'x'",
+        f"REMOVE_TAG#{b.id},'x'",
+        f"REMOVE_TAG#{c.id},'z'",
+    ]
+
+
+def test_merge_into_itself(db, cons, consumables):
+    assert cons("tag", "merge", "y", "--into", "Y") == (
+        "Merged 0 tag(s) into 'y', 0 Consumable(s) newly tagged."
+    )
+    assert len(links(db)) == 4
@@ -0,0 +1,121 @@
+import gzip
+import json
+import sqlite3
+
+import pytest
+
+from consumptionbackend.Consumable import Consumable
+from consumptionbackend.Series import Series
+from consumptionbackend.Personnel import Personnel
+from consumptionbackend.Status import Status
+from consumptioncli.transfer_handling import ExportHandler
+
+RECORDS = [
+    {
+        "name": "Dune",
+        "type": "novel",
+        "status": "COMPLETED",
+        "rating": 9.5,
+        "start_date": "2020-01-01T00:00:00+00:00",
+        "end_date": "2020-02-01T00:00:00+00:00",
+        "series": "Dune",
+        "tags": ["Sci-Fi", "classic"],
+        "personnel": [
+            {"first_name": "Frank", "last_name": "Herbert", "role": "Author"}
+        ],
+    },
+    {
+        "name": "Dune Messiah",
+        "type": "novel",
+        "series": "Dune",
+        "tags": "sci-fi",
+        "personnel": [
+            {"first_name": "Frank", "last_name": "Herbert", "role": "Author"}
+        ],
+    },
+]
+
+
+def write_ndjson(path, records, invalid=()):
+    path.write_text("".join(json.dumps(r) + "\n" for r in [*records, *invalid]))
+    return str(path)
+
+
+def exported(path):
+    opener = gzip.open if str(path).endswith(".gz") else open
+    with opener(path, "rt", encoding="utf-8") as file:
+        return [json.loads(line) for line in file]
+
+
+def test_import_dry_run_writes_nothing(cons, capsys, tmp_path):
+    path = write_ndjson(tmp_path / "in.ndjson", RECORDS, [{"type": "novel"}])
+    output = cons("import", path, "--dry-run")
+    assert output == (
+        "Dry run: 2 record(s) valid, 1 invalid, "
+        + "1 new Series, 1 new Personnel would be created."
+    )
+    assert "Line 3: Record must have a name." in capsys.readouterr().err
+    assert Consumable.find() == []
+    assert [s.id for s in Series.find()] == [-1]
+
+
+def test_import_creates_links(cons, tmp_path):
+    output = cons("import", write_ndjson(tmp_path / "in.ndjson", RECORDS))
+    assert output.startswith(
+        "2 record(s) imported, 0 failed, 1 new Series, 1 new Personnel"
+    )
+    dune, messiah = Consumable.find()
+    assert (dune.status, dune.completions, dune.rating) == (Status.COMPLETED, 1, 9.5)
+    assert dune.start_date == 1577836800
+    assert dune.series_id == messiah.series_id != -1
+    assert sorted(dune.get_tags()) == ["classic", "sci-fi"]
+    assert messiah.get_tags() == ["sci-fi"]
+    (author,) = Personnel.find()
+    assert (author.first_name, author.last_name) == ("Frank", "Herbert")
+
+
+def test_export_round_trip(cons, tmp_path):
+    cons("import", write_ndjson(tmp_path / "in.ndjson", RECORDS))
+    for name in ["out.ndjson", "out.csv", "out.ndjson.gz", "out.csv.gz"]:
+        assert cons("export", str(tmp_path / name)).startswith(
+            "2 Consumable(s) exported"
+        )
+    records = exported(tmp_path / "out.ndjson")
+    assert exported(tmp_path / "out.ndjson.gz") == records
+    assert [r["tags"] for r in records] == [["classic", "sci-fi"], ["sci-fi"]]
+    assert records[0]["personnel"] == [
+        {
+            "first_name": "Frank",
+            "last_name": "Herbert",
+            "pseudonym": None,
+            "role": "Author",
+        }
+    ]
+    assert records[0]["start_date"] == "2020-01-01T00:00:00.000+00:00"
+    # Read back into an empty library, both formats give the same records
+    for name in ["out.ndjson", "out.csv.gz"]:
+        cons("c", "d", "--force")
+        cons("import", str(tmp_path / name))
+        cons("export", str(tmp_path / "again.ndjson"))
+        again = exported(tmp_path / "again.ndjson")
+        assert [{**r, "id": None} for r in again] == [
+            {**r, "id": None} for r in records
+        ]
+
+
+def database_path(db):
+    return db.execute("PRAGMA database_list").fetchone()[2]
+
+
+@pytest.mark.parametrize("wal", [False, True])
+def test_export_snapshot_does_not_block_writers(db, wal):
+    Consumable.new(name="A", type="Novel")
+    with ExportHandler._snapshot(wal) as snapshot:
+        writer = sqlite3.connect(database_path(db), timeout=0.1)
+        writer.execute(
+            f"INSERT INTO {Consumable.DB_NAME} (name, type) VALUES ('B', 'NOVEL')"
+        )
+        writer.commit()
+        writer.close()
+        names = snapshot.execute(f"SELECT name FROM {Consumable.DB_NAME}").fetchall()
+    assert names == [("A",)]